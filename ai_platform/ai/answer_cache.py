@@ -0,0 +1,96 @@
+# ai/answer_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Savol uchun mos bilim topilmagan (fallback javob) holatini keshlash belgisi
+MISS = object()
+
+class AnswerCache:
+    """(domain, normallashtirilgan savol) bo'yicha TTL va LRU bilan chegaralangan javoblar keshi
+
+    Har bir domainning avlod (generation) hisoblagichi bor: invalidate(domain)
+    uni oshiradi va eski yozuvlar keyingi murojaatda tashlab yuboriladi.
+    put() hisoblash boshlangandagi avlodni oladi, shuning uchun invalidatsiya
+    bilan poyga holatida eskirgan javob keshga yozilmaydi.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, float, int]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # Metrikalar
+        self.hits = 0
+        self.miss_marker_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def generation(self, domain: str) -> int:
+        """Domainning joriy avlodi (put() ga uzatiladi)"""
+        return self._generations.get(domain, 0)
+
+    def get(self, domain: str, key: Hashable) -> Optional[Any]:
+        """Keshlangan qiymat (yoki MISS belgisi); topilmasa None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((domain, key))
+            if entry is not None:
+                value, expires_at, generation = entry
+                if generation != self._generations.get(domain, 0):
+                    del self._entries[(domain, key)]
+                elif expires_at <= now:
+                    del self._entries[(domain, key)]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end((domain, key))
+                    self.hits += 1
+                    if value is MISS:
+                        self.miss_marker_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, domain: str, key: Hashable, value: Any, generation: int):
+        """Qiymatni keshga yozish (avlod o'zgargan bo'lsa yozilmaydi)"""
+        with self._lock:
+            if generation != self._generations.get(domain, 0):
+                return
+
+            self._entries[(domain, key)] = (value, time.monotonic() + self.ttl, generation)
+            self._entries.move_to_end((domain, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, domain: str):
+        """Domain bo'yicha barcha javoblarni eskirgan deb belgilash (O(1))"""
+        with self._lock:
+            self._generations[domain] = self._generations.get(domain, 0) + 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Kesh hajmi va samaradorlik metrikalari"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "miss_marker_hits": self.miss_marker_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
@@ -1,23 +1,53 @@
 # ai/domain_knowledge.py
+import gzip
 import json
+import re
 import sqlite3
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterator, List, Optional, Any
 from datetime import datetime
 import logging
+import os
+import uuid
 from pathlib import Path
 
+from ai.knowledge_io import EMPTY_DOMAIN, iter_knowledge_file, iter_ndjson_chunks
+from config.settings import settings
+from database.sqlite_pool import SQLiteConnectionPool
+from database.usage_counter import UsageCounterBuffer
+
 logger = logging.getLogger(__name__)
 
+FTS_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def fts_match_query(query: str) -> str:
+    """Foydalanuvchi so'rovini xavfsiz FTS5 MATCH ifodasiga aylantirish"""
+    # Har bir so'z qo'shtirnoqqa olinadi (FTS5 operatorlari sifatida talqin qilinmaydi);
+    # barcha so'zlar talab qilinadi (LIKE kabi), tartiblashni bm25() bajaradi
+    return " AND ".join(f'"{token}"' for token in FTS_TOKEN_PATTERN.findall(query.lower()))
+
 class DomainKnowledgeManager:
-    def __init__(self, db_path: str = "domain_knowledge.db"):
+    def __init__(self, db_path: str = "domain_knowledge.db", pool: Optional[SQLiteConnectionPool] = None):
         self.db_path = db_path
+        # Har bir oqim uchun doimiy ulanish (WAL, sozlangan pragmalar, statement keshi)
+        self.pool = pool or SQLiteConnectionPool(
+            db_path,
+            pragmas=settings.SQLITE_PRAGMAS,
+            cached_statements=settings.SQLITE_CACHED_STATEMENTS
+        )
+        # Foydalanish hisoblagichlari xotirada yig'ilib, paketlab yoziladi
+        self.usage = UsageCounterBuffer(
+            self.pool,
+            flush_interval=settings.USAGE_FLUSH_INTERVAL,
+            max_pending=settings.USAGE_MAX_PENDING_ITEMS
+        )
         self.domains = {}
+        self.fts_enabled = False
         self.setup_database()
         self.load_domains()
     
     def setup_database(self):
         """Ma'lumotlar bazasini ishga tushirish"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.pool.connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -58,17 +88,204 @@ class DomainKnowledgeManager:
             )
         ''')
         
+        # Bilimlar o'zgarish hisoblagichi (indeks snapshotlarini bekor qilish uchun)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS store_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        cursor.execute(
+            "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('store_id', ?)",
+            (uuid.uuid4().hex,)
+        )
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS knowledge_versions (
+                domain_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (domain_id) REFERENCES domains (id)
+            )
+        ''')
+        
+        # Trigger ichida INSERT ishlatilmaydi: tashqi INSERT OR ... uning
+        # konflikt siyosatini almashtirib, hisoblagichni nolga qaytarishi mumkin
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_domain_version_insert
+            AFTER INSERT ON domains
+            BEGIN
+                INSERT OR IGNORE INTO knowledge_versions (domain_id, version) VALUES (NEW.id, 0);
+            END
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO knowledge_versions (domain_id, version)
+            SELECT id, 0 FROM domains
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_knowledge_version_insert
+            AFTER INSERT ON knowledge_items
+            BEGIN
+                UPDATE knowledge_versions SET version = version + 1 WHERE domain_id = NEW.domain_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_knowledge_version_delete
+            AFTER DELETE ON knowledge_items
+            BEGIN
+                UPDATE knowledge_versions SET version = version + 1 WHERE domain_id = OLD.domain_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_knowledge_version_update
+            AFTER UPDATE OF domain_id, question ON knowledge_items
+            BEGIN
+                UPDATE knowledge_versions SET version = version + 1
+                WHERE domain_id IN (OLD.domain_id, NEW.domain_id);
+            END
+        ''')
+        
+        # Domain statistikasi triggerlar orqali yangilanadi (get_domain_stats jadvalni skanerlamaydi)
+        stats_exist = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'domain_stats'"
+        ).fetchone()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS domain_stats (
+                domain_id INTEGER PRIMARY KEY,
+                knowledge_count INTEGER NOT NULL DEFAULT 0,
+                total_usage INTEGER NOT NULL DEFAULT 0,
+                last_used TIMESTAMP,
+                FOREIGN KEY (domain_id) REFERENCES domains (id)
+            )
+        ''')
+        if not stats_exist:
+            # Migratsiya: mavjud bilimlardan bir marta hisoblanadi
+            cursor.execute('''
+                INSERT INTO domain_stats (domain_id, knowledge_count, total_usage, last_used)
+                SELECT d.id, COUNT(k.id), COALESCE(SUM(k.usage_count), 0), MAX(k.last_used)
+                FROM domains d
+                LEFT JOIN knowledge_items k ON d.id = k.domain_id
+                GROUP BY d.id
+            ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_domain_stats_domain_insert
+            AFTER INSERT ON domains
+            BEGIN
+                INSERT OR IGNORE INTO domain_stats (domain_id) VALUES (NEW.id);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_domain_stats_insert
+            AFTER INSERT ON knowledge_items
+            BEGIN
+                UPDATE domain_stats SET
+                    knowledge_count = knowledge_count + 1,
+                    total_usage = total_usage + NEW.usage_count,
+                    last_used = CASE WHEN last_used IS NULL OR NEW.last_used > last_used
+                                     THEN NEW.last_used ELSE last_used END
+                WHERE domain_id = NEW.domain_id;
+            END
+        ''')
+        # O'chirishda last_used qaytarilmaydi - u domain dagi oxirgi faollik vaqti
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_domain_stats_delete
+            AFTER DELETE ON knowledge_items
+            BEGIN
+                UPDATE domain_stats SET
+                    knowledge_count = knowledge_count - 1,
+                    total_usage = total_usage - OLD.usage_count
+                WHERE domain_id = OLD.domain_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_domain_stats_update
+            AFTER UPDATE OF domain_id, usage_count, last_used ON knowledge_items
+            BEGIN
+                UPDATE domain_stats SET
+                    knowledge_count = knowledge_count - 1,
+                    total_usage = total_usage - OLD.usage_count
+                WHERE domain_id = OLD.domain_id;
+                UPDATE domain_stats SET
+                    knowledge_count = knowledge_count + 1,
+                    total_usage = total_usage + NEW.usage_count,
+                    last_used = CASE WHEN last_used IS NULL OR NEW.last_used > last_used
+                                     THEN NEW.last_used ELSE last_used END
+                WHERE domain_id = NEW.domain_id;
+            END
+        ''')
+        
         # Indexlar
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_domain_question ON knowledge_items(domain_id, question)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_keywords ON knowledge_items(keywords)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_count ON knowledge_items(usage_count DESC)')
         
         conn.commit()
-        conn.close()
+        self.fts_enabled = self.setup_fts(cursor)
+        cursor.close()
         
         # Standart domainlarni yuklash
         self.load_default_domains()
     
+    def setup_fts(self, cursor) -> bool:
+        """knowledge_items uchun FTS5 to'liq matnli indeksi (triggerlar bilan sinxronlanadi)"""
+        conn = cursor.connection
+        try:
+            exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_fts'"
+            ).fetchone()
+            
+            # External content jadvali: matn knowledge_items da, FTS faqat indeksni saqlaydi
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+                    question, answer, keywords,
+                    content='knowledge_items', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_knowledge_fts_insert
+                AFTER INSERT ON knowledge_items
+                BEGIN
+                    INSERT INTO knowledge_fts (rowid, question, answer, keywords)
+                    VALUES (NEW.id, NEW.question, NEW.answer, NEW.keywords);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_knowledge_fts_delete
+                AFTER DELETE ON knowledge_items
+                BEGIN
+                    INSERT INTO knowledge_fts (knowledge_fts, rowid, question, answer, keywords)
+                    VALUES ('delete', OLD.id, OLD.question, OLD.answer, OLD.keywords);
+                END
+            ''')
+            # usage_count/last_used yangilanishlari indeksga tegmaydi
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_knowledge_fts_update
+                AFTER UPDATE OF question, answer, keywords ON knowledge_items
+                BEGIN
+                    INSERT INTO knowledge_fts (knowledge_fts, rowid, question, answer, keywords)
+                    VALUES ('delete', OLD.id, OLD.question, OLD.answer, OLD.keywords);
+                    INSERT INTO knowledge_fts (rowid, question, answer, keywords)
+                    VALUES (NEW.id, NEW.question, NEW.answer, NEW.keywords);
+                END
+            ''')
+            
+            # Migratsiya: mavjud bazada indeks bir marta to'liq quriladi
+            if not exists:
+                # rank ustuni: savol javobdan, kalit so'zlar esa javobdan muhimroq
+                cursor.execute(
+                    "INSERT INTO knowledge_fts (knowledge_fts, rank) VALUES ('rank', 'bm25(3.0, 1.0, 2.0)')"
+                )
+                cursor.execute("INSERT INTO knowledge_fts (knowledge_fts) VALUES ('rebuild')")
+                logger.info("Built FTS5 index for existing knowledge items")
+            
+            conn.commit()
+            return True
+        except sqlite3.OperationalError as e:
+            # SQLite FTS5 siz yig'ilgan bo'lsa LIKE qidiruvi ishlatiladi
+            logger.warning(f"FTS5 unavailable, falling back to LIKE search: {e}")
+            conn.rollback()
+            return False
+    
     def load_default_domains(self):
         """Standart domainlarni yuklash"""
         default_domains = {
@@ -136,7 +353,7 @@ class DomainKnowledgeManager:
     
     def add_domain(self, domain_name: str, description: str = "") -> bool:
         """Yangi domain qo'shish"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.pool.connection()
         cursor = conn.cursor()
         
         try:
@@ -148,13 +365,14 @@ class DomainKnowledgeManager:
             return cursor.rowcount > 0
         except sqlite3.Error as e:
             logger.error(f"Error adding domain {domain_name}: {e}")
+            conn.rollback()
             return False
         finally:
-            conn.close()
+            cursor.close()
     
-    def add_knowledge(self, domain_name: str, question: str, answer: str, keywords: str = "") -> bool:
-        """Yangi bilim qo'shish"""
-        conn = sqlite3.connect(self.db_path)
+    def add_knowledge(self, domain_name: str, question: str, answer: str, keywords: str = "") -> Optional[int]:
+        """Yangi bilim qo'shish (bilim id si; xato bo'lsa None)"""
+        conn = self.pool.connection()
         cursor = conn.cursor()
         
         try:
@@ -164,35 +382,46 @@ class DomainKnowledgeManager:
             
             if not domain_result:
                 logger.error(f"Domain not found: {domain_name}")
-                return False
+                return None
             
             domain_id = domain_result[0]
             
-            # Bilim qo'shish
+            # Bilim qo'shish (mavjud savolning id va usage_count qiymati saqlanadi)
             cursor.execute('''
-                INSERT OR REPLACE INTO knowledge_items 
+                INSERT INTO knowledge_items 
                 (domain_id, question, answer, keywords, last_used) 
                 VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(domain_id, question) DO UPDATE SET
+                    answer = excluded.answer,
+                    keywords = excluded.keywords,
+                    last_used = excluded.last_used
             ''', (domain_id, question, answer, keywords, datetime.now()))
+            # Yangilangan qatorda lastrowid ishonchli emas - id unikal kalit bo'yicha olinadi
+            cursor.execute(
+                "SELECT id FROM knowledge_items WHERE domain_id = ? AND question = ?",
+                (domain_id, question)
+            )
+            item_id = cursor.fetchone()[0]
             
             conn.commit()
             logger.info(f"Knowledge added to domain {domain_name}: {question[:50]}...")
-            return True
+            return item_id
             
         except sqlite3.Error as e:
             logger.error(f"Error adding knowledge: {e}")
-            return False
+            conn.rollback()
+            return None
         finally:
-            conn.close()
+            cursor.close()
     
     def get_knowledge(self, domain_name: str) -> List[Dict[str, Any]]:
         """Domain bilimlarini olish"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.pool.connection()
         cursor = conn.cursor()
         
         try:
             cursor.execute('''
-                SELECT k.question, k.answer, k.keywords, k.confidence, k.usage_count
+                SELECT k.id, k.question, k.answer, k.keywords, k.confidence, k.usage_count
                 FROM knowledge_items k
                 JOIN domains d ON k.domain_id = d.id
                 WHERE d.name = ?
@@ -202,8 +431,9 @@ class DomainKnowledgeManager:
             results = cursor.fetchall()
             knowledge_list = []
             
-            for question, answer, keywords, confidence, usage_count in results:
+            for item_id, question, answer, keywords, confidence, usage_count in results:
                 knowledge_list.append({
+                    "id": item_id,
                     "question": question,
                     "answer": answer,
                     "keywords": keywords,
@@ -217,31 +447,128 @@ class DomainKnowledgeManager:
             logger.error(f"Error getting knowledge for {domain_name}: {e}")
             return []
         finally:
-            conn.close()
+            cursor.close()
+    
+    def get_knowledge_version(self, domain_name: str) -> str:
+        """Domain bilimlarining o'zgarish hisoblagichi (snapshot versiyasi sifatida)"""
+        conn = self.pool.connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                SELECT m.value, COALESCE(v.version, 0)
+                FROM store_meta m
+                LEFT JOIN domains d ON d.name = ?
+                LEFT JOIN knowledge_versions v ON v.domain_id = d.id
+                WHERE m.key = 'store_id'
+            ''', (domain_name,))
+            
+            store_id, version = cursor.fetchone()
+            return f"{store_id}:{version}"
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error getting knowledge version for {domain_name}: {e}")
+            return ""
+        finally:
+            cursor.close()
+    
+    def record_usage(self, item_id: int):
+        """Bilimdan foydalanishni qayd etish (hisoblagich buferi orqali, so'rov yo'lida yozuv yo'q)"""
+        self.usage.record(item_id)
     
     def increment_usage(self, domain_name: str, question: str):
         """Foydalanish sonini oshirish"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.pool.connection()
         cursor = conn.cursor()
         
         try:
             cursor.execute('''
-                UPDATE knowledge_items 
-                SET usage_count = usage_count + 1, last_used = ?
-                WHERE question = ? AND domain_id IN (
-                    SELECT id FROM domains WHERE name = ?
-                )
-            ''', (datetime.now(), question, domain_name))
-            
-            conn.commit()
+                SELECT k.id FROM knowledge_items k
+                JOIN domains d ON k.domain_id = d.id
+                WHERE d.name = ? AND k.question = ?
+            ''', (domain_name, question))
+            result = cursor.fetchone()
+            if result:
+                self.usage.record(result[0])
         except sqlite3.Error as e:
             logger.error(f"Error incrementing usage: {e}")
         finally:
-            conn.close()
+            cursor.close()
     
-    def search_knowledge(self, query: str, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+    def search_knowledge(self, query: str, domain: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """Bilimlarni qidirish"""
-        conn = sqlite3.connect(self.db_path)
+        if self.fts_enabled:
+            return self.search_knowledge_fts(query, domain, limit)
+        return self.search_knowledge_like(query, domain, limit)
+    
+    def search_knowledge_fts(self, query: str, domain: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """FTS5 indeksi orqali bm25() bo'yicha tartiblangan qidiruv
+
+        score - natijalar ichidagi eng yuqori bm25 ga bo'lingan baho (0..1],
+        xom bm25 qiymati esa bm25 maydonida qaytariladi.
+        """
+        match = fts_match_query(query)
+        if not match:
+            return []
+        
+        conn = self.pool.connection()
+        cursor = conn.cursor()
+        
+        try:
+            if domain:
+                cursor.execute('''
+                    SELECT k.question, k.answer, k.keywords, k.confidence, d.name as domain_name,
+                           knowledge_fts.rank
+                    FROM knowledge_fts
+                    JOIN knowledge_items k ON k.id = knowledge_fts.rowid
+                    JOIN domains d ON k.domain_id = d.id
+                    WHERE knowledge_fts MATCH ? AND d.name = ?
+                    ORDER BY knowledge_fts.rank
+                    LIMIT ?
+                ''', (match, domain, limit))
+            else:
+                # Filtr bo'lmasa top-k ni FTS5 ning o'zi tanlaydi, keyin faqat k ta qator bog'lanadi
+                cursor.execute('''
+                    SELECT k.question, k.answer, k.keywords, k.confidence, d.name as domain_name,
+                           f.rank
+                    FROM (
+                        SELECT rowid, rank FROM knowledge_fts
+                        WHERE knowledge_fts MATCH ?
+                        ORDER BY rank
+                        LIMIT ?
+                    ) f
+                    JOIN knowledge_items k ON k.id = f.rowid
+                    JOIN domains d ON k.domain_id = d.id
+                    ORDER BY f.rank
+                ''', (match, limit))
+            
+            rows = cursor.fetchall()
+            # bm25() manfiy qiymat qaytaradi: kichikroq = mosroq; natijalar rank bo'yicha tartiblangan
+            best = -rows[0][5] if rows else 0.0
+            search_results = []
+            for question, answer, keywords, confidence, domain_name, rank in rows:
+                search_results.append({
+                    "question": question,
+                    "answer": answer,
+                    "keywords": keywords,
+                    "confidence": confidence,
+                    "domain": domain_name,
+                    "score": -rank / best if best > 0 else 0.0,
+                    "bm25": -rank,
+                    "engine": "fts5"
+                })
+            
+            return search_results
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error searching knowledge: {e}")
+            return []
+        finally:
+            cursor.close()
+    
+    def search_knowledge_like(self, query: str, domain: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """LIKE '%query%' bo'yicha qidirish (FTS5 mavjud bo'lmaganda)"""
+        conn = self.pool.connection()
         cursor = conn.cursor()
         
         try:
@@ -254,8 +581,8 @@ class DomainKnowledgeManager:
                         k.question LIKE ? OR k.answer LIKE ? OR k.keywords LIKE ?
                     )
                     ORDER BY k.usage_count DESC, k.confidence DESC
-                    LIMIT 10
-                ''', (domain, f'%{query}%', f'%{query}%', f'%{query}%'))
+                    LIMIT ?
+                ''', (domain, f'%{query}%', f'%{query}%', f'%{query}%', limit))
             else:
                 cursor.execute('''
                     SELECT k.question, k.answer, k.keywords, k.confidence, d.name as domain_name
@@ -263,8 +590,8 @@ class DomainKnowledgeManager:
                     JOIN domains d ON k.domain_id = d.id
                     WHERE k.question LIKE ? OR k.answer LIKE ? OR k.keywords LIKE ?
                     ORDER BY k.usage_count DESC, k.confidence DESC
-                    LIMIT 10
-                ''', (f'%{query}%', f'%{query}%', f'%{query}%'))
+                    LIMIT ?
+                ''', (f'%{query}%', f'%{query}%', f'%{query}%', limit))
             
             results = cursor.fetchall()
             search_results = []
@@ -275,7 +602,8 @@ class DomainKnowledgeManager:
                     "answer": answer,
                     "keywords": keywords,
                     "confidence": confidence,
-                    "domain": domain_name
+                    "domain": domain_name,
+                    "engine": "like"
                 })
             
             return search_results
@@ -284,19 +612,18 @@ class DomainKnowledgeManager:
             logger.error(f"Error searching knowledge: {e}")
             return []
         finally:
-            conn.close()
+            cursor.close()
     
     def get_domain_stats(self) -> Dict[str, Any]:
-        """Domain statistikasini olish"""
-        conn = sqlite3.connect(self.db_path)
+        """Domain statistikasini olish (triggerlar yuritadigan domain_stats jadvalidan)"""
+        conn = self.pool.connection()
         cursor = conn.cursor()
         
         try:
             cursor.execute('''
-                SELECT d.name, COUNT(k.id), SUM(k.usage_count), MAX(k.last_used)
+                SELECT d.name, s.knowledge_count, s.total_usage, s.last_used
                 FROM domains d
-                LEFT JOIN knowledge_items k ON d.id = k.domain_id
-                GROUP BY d.name
+                LEFT JOIN domain_stats s ON d.id = s.domain_id
             ''')
             
             results = cursor.fetchall()
@@ -314,12 +641,60 @@ class DomainKnowledgeManager:
         except sqlite3.Error as e:
             logger.error(f"Error getting domain stats: {e}")
             return {}
+        finally:
+            cursor.close()
+    
+    def iter_knowledge_records(self, domain: Optional[str] = None, fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Bilimlarni alohida ulanishdagi kursor orqali ketma-ket o'qish (xotiraga to'planmaydi)"""
+        # WAL rejimida bitta SELECT boshidan oxirigacha izchil holatni ko'radi
+        conn = self.pool.open_dedicated()
+        try:
+            if domain:
+                cursor = conn.execute('''
+                    SELECT d.name, k.question, k.answer, k.keywords, k.confidence, k.usage_count
+                    FROM knowledge_items k
+                    JOIN domains d ON k.domain_id = d.id
+                    WHERE d.name = ?
+                ''', (domain,))
+            else:
+                # CROSS JOIN: knowledge_items rowid tartibida skanerlanadi, saralash kerak emas
+                cursor = conn.execute('''
+                    SELECT d.name, k.question, k.answer, k.keywords, k.confidence, k.usage_count
+                    FROM knowledge_items k
+                    CROSS JOIN domains d ON k.domain_id = d.id
+                    ORDER BY k.id
+                ''')
+            
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for domain_name, question, answer, keywords, confidence, usage_count in rows:
+                    yield {
+                        "domain": domain_name,
+                        "question": question,
+                        "answer": answer,
+                        "keywords": keywords,
+                        "confidence": confidence,
+                        "usage_count": usage_count
+                    }
         finally:
             conn.close()
     
-    def export_knowledge(self, file_path: str):
-        """Bilimlarni eksport qilish"""
+    def iter_knowledge_ndjson(self, domain: Optional[str] = None, compress: bool = False) -> Iterator[bytes]:
+        """Bilimlarni NDJSON (ixtiyoriy gzip) baytlari bo'laklari sifatida oqimli eksport"""
+        return iter_ndjson_chunks(self.iter_knowledge_records(domain), compress=compress)
+    
+    def export_knowledge(self, file_path: str, format: str = "json", compress: bool = False):
+        """Bilimlarni eksport qilish ("ndjson" - oqimli, xotiraga to'planmaydi)"""
         try:
+            if format == "ndjson":
+                with open(file_path, 'wb') as f:
+                    for chunk in self.iter_knowledge_ndjson(compress=compress):
+                        f.write(chunk)
+                logger.info(f"Knowledge exported to {file_path}")
+                return
+            
             export_data = {}
             stats = self.get_domain_stats()
             
@@ -335,30 +710,92 @@ class DomainKnowledgeManager:
         except Exception as e:
             logger.error(f"Error exporting knowledge: {e}")
     
-    def import_knowledge(self, file_path: str):
-        """Bilimlarni import qilish"""
+    def import_knowledge(self, file_path: str, batch_size: Optional[int] = None,
+                         progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Bilimlarni oqimli import qilish (domain id lar bir marta, executemany, katta tranzaksiyalar)"""
+        batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        conn = self.pool.connection()
+        cursor = conn.cursor()
+        
+        domain_ids = {}
+        progress = {
+            "items": 0,
+            "skipped": 0,
+            "domains": [],
+            "bytes_read": 0,
+            "total_bytes": os.path.getsize(file_path)
+        }
+        batch = []
+        imported_at = datetime.now()
+        
+        def flush(bytes_read: int):
+            # Mavjud savollar add_knowledge dagi kabi yangilanadi (id va usage_count saqlanadi)
+            cursor.executemany('''
+                INSERT INTO knowledge_items 
+                (domain_id, question, answer, keywords, last_used) 
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(domain_id, question) DO UPDATE SET
+                    answer = excluded.answer,
+                    keywords = excluded.keywords,
+                    last_used = excluded.last_used
+            ''', batch)
+            conn.commit()
+            progress["items"] += len(batch)
+            progress["bytes_read"] = bytes_read
+            batch.clear()
+            if progress_callback:
+                progress_callback(dict(progress))
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                import_data = json.load(f)
-            
-            for domain_name, knowledge_list in import_data.items():
-                self.add_domain(domain_name)
-                for item in knowledge_list:
-                    self.add_knowledge(
-                        domain_name,
-                        item["question"],
-                        item["answer"],
-                        item.get("keywords", "")
-                    )
+            with open(file_path, 'rb') as f:
+                stream = gzip.GzipFile(fileobj=f) if file_path.endswith(".gz") else f
+                for domain_name, item in iter_knowledge_file(stream, file_path):
+                    if domain_name not in domain_ids:
+                        cursor.execute("INSERT OR IGNORE INTO domains (name) VALUES (?)", (domain_name,))
+                        cursor.execute("SELECT id FROM domains WHERE name = ?", (domain_name,))
+                        domain_ids[domain_name] = cursor.fetchone()[0]
+                        progress["domains"].append(domain_name)
+                    
+                    if item is EMPTY_DOMAIN:
+                        continue
+                    
+                    # Savoli yoki javobi yo'q (null) yozuvlar butun importni to'xtatmaydi - sanab o'tkaziladi
+                    try:
+                        question, answer = item.get("question"), item.get("answer")
+                    except AttributeError:
+                        question = answer = None
+                    if question is None or answer is None:
+                        progress["skipped"] += 1
+                        continue
+                    
+                    batch.append((
+                        domain_ids[domain_name],
+                        question,
+                        answer,
+                        item.get("keywords", ""),
+                        imported_at
+                    ))
+                    
+                    if len(batch) >= batch_size:
+                        flush(f.tell())
+                
+                flush(f.tell())
             
-            logger.info(f"Knowledge imported from {file_path}")
+            logger.info(f"Knowledge imported from {file_path}: {progress['items']} items, "
+                        f"{len(progress['domains'])} domains, {progress['skipped']} skipped")
+            return progress
             
-        except Exception as e:
+        except (OSError, ValueError, sqlite3.Error) as e:
+            # Oldingi partiyalar allaqachon commit qilingan, faqat joriy partiya bekor qilinadi
             logger.error(f"Error importing knowledge: {e}")
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
     
     def load_domains(self):
         """Domainlarni memoryga yuklash"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.pool.connection()
         cursor = conn.cursor()
         
         try:
@@ -386,4 +823,4 @@ class DomainKnowledgeManager:
         except sqlite3.Error as e:
             logger.error(f"Error loading domains: {e}")
         finally:
-            conn.close()
\ No newline at end of file
+            cursor.close()
\ No newline at end of file
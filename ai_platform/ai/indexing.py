@@ -0,0 +1,487 @@
+# ai/indexing.py
+import copy
+import itertools
+import math
+import numpy as np
+import scipy.sparse as sp
+from collections import Counter
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Qurilgan (yoki snapshotdan yuklangan) indekslar nasl raqami
+_lineages = itertools.count(1)
+
+class KnowledgeIndex:
+    """Domain qidiruv indekslari uchun umumiy asos
+
+    Indeks bilimlar ro'yxatini (items) o'z tartibida saqlaydi; best_match()
+    qaytargan indeks shu ro'yxatdagi o'ringa mos keladi.
+
+    E'lon qilingan indeks o'zgartirilmaydi: appended() va replaced() yangi
+    nusxa qaytaradi (katta matritsalar bo'linadi, faqat kichik o'zgaruvchan
+    holat nusxalanadi), shuning uchun o'quvchilar qulfsiz ishlaydi.
+    append() faqat hali e'lon qilinmagan indeksni to'ldirish uchun.
+    """
+
+    engine = None
+    vectorizer = None
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        # Faqat yozuvchi (eng oxirgi nusxada) ishlatadi, shuning uchun nusxalar o'rtasida bo'linadi
+        self.question_positions = {item["question"]: i for i, item in enumerate(items)}
+        self.fitted_docs = len(items)
+        # Bir xil qurilishdan kelib chiqqan nusxalar umumiy nasl raqamiga ega
+        self.lineage = next(_lineages)
+        # NLPProcessor e'lon qilganda beriladi
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def pending(self) -> int:
+        """Oxirgi qurilishdan keyin qo'shilgan hujjatlar soni"""
+        return len(self.items) - self.fitted_docs
+
+    def find_question(self, question: str) -> Optional[int]:
+        """Savolning indeksdagi o'rnini topish"""
+        return self.question_positions.get(question)
+
+    def _register(self, item: Dict[str, Any]):
+        """Qo'shilgan bilimni ro'yxatga yozish"""
+        self.question_positions[item["question"]] = len(self.items)
+        self.items.append(item)
+
+    def append(self, item: Dict[str, Any], processed_question: str):
+        """Hujjatni joyida qo'shish (faqat e'lon qilinmagan indeks uchun)"""
+        raise NotImplementedError
+
+    def copy(self) -> "KnowledgeIndex":
+        """O'zgartirish uchun nusxa: matritsalar bo'linadi, bilimlar ro'yxati nusxalanadi"""
+        clone = copy.copy(self)
+        clone.items = list(self.items)
+        clone.generation = 0
+        return clone
+
+    def appended(self, item: Dict[str, Any], processed_question: str) -> "KnowledgeIndex":
+        """Hujjat qo'shilgan yangi indeks (joriy indeks o'zgarmaydi)"""
+        clone = self.copy()
+        clone.append(item, processed_question)
+        return clone
+
+    def replaced(self, position: int, item: Dict[str, Any]) -> "KnowledgeIndex":
+        """Bilim yozuvi almashtirilgan yangi indeks (savol, demak vektor, o'zgarmaydi)"""
+        clone = self.copy()
+        clone.items[position] = item
+        return clone
+
+    def to_state(self) -> Dict[str, Any]:
+        """Indeksni (bilimlarsiz) saqlash uchun massivlar lug'ati"""
+        raise NotImplementedError
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], items: List[Dict[str, Any]]) -> "KnowledgeIndex":
+        """to_state() natijasidan indeksni tiklash"""
+        raise NotImplementedError
+
+    def encode_queries(self, processed_queries: List[str]):
+        """So'rovlarni indeks ko'rinishiga keltirish (vektorlash)"""
+        raise NotImplementedError
+
+    def score_queries(self, encoded_queries):
+        """Vektorlangan so'rovlar x hujjatlar o'xshashlik matritsasi (CSR, qiymatlar 0..1)"""
+        raise NotImplementedError
+
+    def batch_scores(self, processed_queries: List[str]):
+        """So'rovlar x hujjatlar o'xshashlik matritsasi (CSR, qiymatlar 0..1)"""
+        return self.score_queries(self.encode_queries(processed_queries))
+
+    def scores(self, processed_query: str):
+        """Bitta so'rov uchun o'xshashliklar (1 x N sparse)"""
+        return self.batch_scores([processed_query])
+
+    def best_match(self, processed_query: str) -> Tuple[int, float]:
+        """Eng o'xshash hujjat indeksi va o'xshashlik qiymati"""
+        return self.best_encoded_match(self.encode_queries([processed_query]))
+
+    def best_encoded_match(self, encoded_query) -> Tuple[int, float]:
+        """encode_queries() natijasi (bitta so'rov) uchun eng o'xshash hujjat"""
+        scores = self.score_queries(encoded_query)
+        if scores.nnz == 0:
+            return -1, 0.0
+
+        best_pos = int(np.argmax(scores.data))
+        return int(scores.indices[best_pos]), float(scores.data[best_pos])
+
+    def search(self, processed_query: str, k: int) -> List[Tuple[int, float]]:
+        """Eng yaxshi k ta (hujjat indeksi, baho) - faqat noldan farqli baholar orasidan"""
+        return self.batch_top_k([processed_query], k)[0]
+
+    def batch_top_k(self, processed_queries: List[str], k: int) -> List[List[Tuple[int, float]]]:
+        """Har bir so'rov uchun eng yaxshi k ta (hujjat indeksi, baho) juftligi"""
+        scores = self.batch_scores(processed_queries)
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            results.append(top_k(scores.indices[start:end], scores.data[start:end], k))
+        return results
+
+class TfidfIndex(KnowledgeIndex):
+    """Domain uchun oldindan hisoblangan TF-IDF indeksi
+
+    Savollar korpusi bir marta vektorlanadi va term x hujjat ko'rinishidagi
+    CSR matritsada saqlanadi (har bir hujjat L2 bo'yicha normallashtirilgan),
+    shuning uchun so'rov narxi bitta transform va bitta sparse ko'paytmadan iborat.
+
+    Yangi hujjatlar qayta fit qilinmasdan, mavjud lug'at va IDF bilan
+    vektorlanib alohida "delta" matritsaga qo'shiladi; hujjat chastotalari
+    esa onlayn yangilanib boriladi va drift() orqali qayta qurish kerakligi aniqlanadi.
+    """
+
+    engine = "tfidf"
+
+    def __init__(self, vectorizer: TfidfVectorizer, matrix, items: List[Dict[str, Any]]):
+        super().__init__(items)
+        self.vectorizer = vectorizer
+        self.matrix = matrix  # (terms x documents) CSR
+
+        # Onlayn hujjat chastotasi statistikasi
+        self.n_docs = self.fitted_docs
+        self.doc_freq = np.diff(matrix.indptr).astype(np.int64)
+        self.fitted_idf = self._idf(self.doc_freq, self.n_docs)
+        self.appended_tokens = 0
+        self.oov_tokens = 0
+
+        # Fit qilinmasdan qo'shilgan hujjatlar (documents x terms)
+        self.delta = sp.csr_matrix((0, matrix.shape[0]), dtype=matrix.dtype)
+
+    @classmethod
+    def build(cls, items: List[Dict[str, Any]], processed_questions: List[str],
+              max_features: int = 1000) -> "TfidfIndex":
+        """Qayta ishlangan savollardan indeks qurish"""
+        vectorizer = TfidfVectorizer(max_features=max_features)
+        doc_matrix = vectorizer.fit_transform(processed_questions)
+        return cls(vectorizer, doc_matrix.T.tocsr(), list(items))
+
+    def to_state(self) -> Dict[str, Any]:
+        """Lug'at, IDF vektori va CSR matritsa"""
+        return {
+            "vocabulary": self.vectorizer.vocabulary_,
+            "idf": self.vectorizer.idf_,
+            "max_features": self.vectorizer.max_features,
+            "data": self.matrix.data,
+            "indices": self.matrix.indices,
+            "indptr": self.matrix.indptr,
+            "shape": self.matrix.shape,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], items: List[Dict[str, Any]]) -> "TfidfIndex":
+        """Saqlangan holatdan qayta fit qilmasdan tiklash"""
+        vectorizer = TfidfVectorizer(max_features=state["max_features"])
+        vectorizer.vocabulary_ = state["vocabulary"]
+        vectorizer.idf_ = state["idf"]
+        matrix = sp.csr_matrix(
+            (state["data"], state["indices"], state["indptr"]), shape=state["shape"], copy=False
+        )
+        return cls(vectorizer, matrix, items)
+
+    @staticmethod
+    def _idf(doc_freq: np.ndarray, n_docs: int) -> np.ndarray:
+        """sklearn bilan bir xil (smooth_idf=True) IDF formulasi"""
+        return np.log((1 + n_docs) / (1 + doc_freq)) + 1
+
+    def copy(self) -> "TfidfIndex":
+        # delta har safar yangi matritsa bilan almashtiriladi, doc_freq esa joyida o'zgaradi
+        clone = super().copy()
+        clone.doc_freq = self.doc_freq.copy()
+        return clone
+
+    def append(self, item: Dict[str, Any], processed_question: str):
+        """Hujjatni qayta fit qilmasdan indeksga qo'shish"""
+        row = self.vectorizer.transform([processed_question])
+        self.delta = sp.vstack([self.delta, row], format='csr')
+        self._register(item)
+
+        # Hujjat chastotalarini yangilash
+        self.n_docs += 1
+        self.doc_freq[row.indices] += 1
+        tokens = processed_question.split()
+        vocabulary = self.vectorizer.vocabulary_
+        self.appended_tokens += len(tokens)
+        self.oov_tokens += sum(1 for token in tokens if token not in vocabulary)
+
+    def drift(self) -> float:
+        """Fit qilingan statistikadan chetlanish darajasi (0 - chetlanish yo'q)"""
+        if not self.pending:
+            return 0.0
+
+        current_idf = self._idf(self.doc_freq, self.n_docs)
+        idf_drift = float(np.mean(np.abs(current_idf - self.fitted_idf)) / np.mean(self.fitted_idf))
+
+        oov_share = self.oov_tokens / self.appended_tokens if self.appended_tokens else 0.0
+        oov_drift = oov_share * self.pending / self.n_docs
+
+        return max(idf_drift, oov_drift)
+
+    def encode_queries(self, processed_queries: List[str]):
+        """TF-IDF so'rov vektorlari (Q x terms, L2 normallashgan)"""
+        return self.vectorizer.transform(processed_queries)
+
+    def score_queries(self, query_vecs):
+        """So'rovlar va barcha hujjatlar orasidagi cosine o'xshashlik (Q x N sparse)"""
+        # Faqat so'rov termlari qatnashgan satrlar (postinglar) ko'paytiriladi
+        scores = query_vecs @ self.matrix
+        if self.pending:
+            scores = sp.hstack([scores, (self.delta @ query_vecs.T).T], format='csr')
+        return scores.tocsr()
+
+class BM25Index(KnowledgeIndex):
+    """Inverted indeks (term -> postinglar) ustida BM25 qidiruvi
+
+    Postinglar term x hujjat CSR matritsada saqlanadi: har bir satr termga
+    ega hujjatlar ro'yxati, qiymatlar esa oldindan hisoblangan BM25 tf
+    komponenti (tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))).
+    So'rovda faqat so'rov termlarining postinglari o'qiladi; IDF esa joriy
+    hujjat chastotalaridan so'rov vaqtida hisoblanadi, shuning uchun
+    qo'shilgan hujjatlar qayta qurishsiz darhol hisobga olinadi.
+    """
+
+    engine = "bm25"
+
+    def __init__(self, vocabulary: Dict[str, int], matrix, doc_len: np.ndarray,
+                 items: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        super().__init__(items)
+        # Lug'at nusxalar o'rtasida bo'linadi va faqat to'ldiriladi; har bir nusxa
+        # o'zining n_terms chegarasidan keyingi (keyinroq qo'shilgan) termlarni ko'rmaydi
+        self.vocabulary = vocabulary
+        self.n_terms = len(vocabulary)
+        self.matrix = matrix  # (terms x documents) CSR, BM25 tf og'irliklari
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+
+        self.doc_freq = np.diff(matrix.indptr).astype(np.int64)
+        self.total_len = float(doc_len.sum())
+        self.fitted_avgdl = self.total_len / len(doc_len) if len(doc_len) else 0.0
+
+        # Qurilishdan keyin qo'shilgan hujjatlar postinglari: term_id -> ([doc], [tf])
+        self.delta_postings = {}
+        self.delta_len = []
+
+    @classmethod
+    def build(cls, items: List[Dict[str, Any]], processed_questions: List[str],
+              k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Qayta ishlangan savollardan inverted indeks qurish"""
+        counter = CountVectorizer(analyzer=str.split, dtype=np.float32)
+        try:
+            doc_matrix = counter.fit_transform(processed_questions)
+            vocabulary = dict(counter.vocabulary_)
+        except ValueError:
+            # Bo'sh lug'at (masalan, faqat stop so'zlar)
+            doc_matrix = sp.csr_matrix((len(processed_questions), 0), dtype=np.float32)
+            vocabulary = {}
+
+        doc_len = np.asarray(doc_matrix.sum(axis=1), dtype=np.float32).ravel()
+        avgdl = doc_len.mean() if len(doc_len) and doc_len.sum() else 1.0
+
+        # tf ni BM25 to'yinish formulasi bilan og'irlikka aylantirish
+        row_len = np.repeat(doc_len, np.diff(doc_matrix.indptr))
+        tfs = doc_matrix.data
+        doc_matrix.data = tfs * (k1 + 1) / (tfs + k1 * (1 - b + b * row_len / avgdl))
+
+        return cls(vocabulary, doc_matrix.T.tocsr(), doc_len, list(items), k1=k1, b=b)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Lug'at, postinglar (CSR) va hujjat uzunliklari"""
+        return {
+            "vocabulary": self.vocabulary,
+            "data": self.matrix.data,
+            "indices": self.matrix.indices,
+            "indptr": self.matrix.indptr,
+            "shape": self.matrix.shape,
+            "doc_len": self.doc_len,
+            "k1": self.k1,
+            "b": self.b,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], items: List[Dict[str, Any]]) -> "BM25Index":
+        """Saqlangan holatdan qayta qurmasdan tiklash"""
+        matrix = sp.csr_matrix(
+            (state["data"], state["indices"], state["indptr"]), shape=state["shape"], copy=False
+        )
+        return cls(dict(state["vocabulary"]), matrix, state["doc_len"], items,
+                   k1=state["k1"], b=state["b"])
+
+    def copy(self) -> "BM25Index":
+        clone = super().copy()
+        clone.delta_postings = dict(self.delta_postings)
+        clone.delta_len = list(self.delta_len)
+        return clone
+
+    def append(self, item: Dict[str, Any], processed_question: str):
+        """Hujjatni postinglarga darhol qo'shish"""
+        doc_id = len(self.items)
+        tokens = processed_question.split()
+
+        for term, tf in Counter(tokens).items():
+            term_id = self.vocabulary.setdefault(term, len(self.vocabulary))
+            # Posting ro'yxatlari joyida o'zgartirilmaydi - ular oldingi nusxalar bilan bo'lingan
+            docs, tfs = self.delta_postings.get(term_id, ([], []))
+            self.delta_postings[term_id] = (docs + [doc_id], tfs + [tf])
+
+        self.n_terms = len(self.vocabulary)
+        self.delta_len.append(len(tokens))
+        self.total_len += len(tokens)
+        self._register(item)
+
+    def drift(self) -> float:
+        """Qurilishdan keyingi o'zgarish: delta ulushi yoki avgdl siljishi"""
+        if not self.pending:
+            return 0.0
+
+        avgdl = self.total_len / len(self.items)
+        avgdl_drift = abs(avgdl - self.fitted_avgdl) / self.fitted_avgdl if self.fitted_avgdl else 1.0
+        return max(self.pending / len(self.items), avgdl_drift)
+
+    def _idf(self, term_id: int, n_docs: int) -> float:
+        """Joriy hujjat chastotasi bo'yicha BM25 IDF"""
+        doc_freq = self.doc_freq[term_id] if term_id < len(self.doc_freq) else 0
+        if term_id in self.delta_postings:
+            doc_freq += len(self.delta_postings[term_id][0])
+        return math.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _query_weights(self, processed_query: str, n_docs: int,
+                       avgdl: float) -> Tuple[Dict[int, float], float]:
+        """So'rov termlari og'irligi (qtf * idf) va so'rovga teng hujjatning bahosi"""
+        query_terms = {}
+        for term, qtf in Counter(processed_query.split()).items():
+            term_id = self.vocabulary.get(term)
+            if term_id is not None and term_id < self.n_terms:
+                query_terms[term_id] = qtf
+
+        query_norm = self.k1 * (1 - self.b + self.b * sum(query_terms.values()) / avgdl)
+        weights = {}
+        max_score = 0.0
+        for term_id, qtf in query_terms.items():
+            weight = qtf * self._idf(term_id, n_docs)
+            weights[term_id] = weight
+            max_score += weight * qtf * (self.k1 + 1) / (qtf + query_norm)
+        return weights, max_score
+
+    def _delta_scores(self, weights: Dict[int, float], avgdl: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Qayta qurilmagan hujjatlar uchun BM25 bahosi (lokal hujjat indekslari bilan)"""
+        docs_parts, score_parts = [], []
+        for term_id, weight in weights.items():
+            if term_id not in self.delta_postings:
+                continue
+            docs, tfs = self.delta_postings[term_id]
+            docs = np.asarray(docs) - self.fitted_docs
+            tfs = np.asarray(tfs, dtype=np.float64)
+            lengths = np.asarray(self.delta_len, dtype=np.float64)[docs]
+            norm = self.k1 * (1 - self.b + self.b * lengths / avgdl)
+            docs_parts.append(docs)
+            score_parts.append(weight * tfs * (self.k1 + 1) / (tfs + norm))
+
+        if not docs_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        docs, inverse = np.unique(np.concatenate(docs_parts), return_inverse=True)
+        return docs, np.bincount(inverse, weights=np.concatenate(score_parts))
+
+    def encode_queries(self, processed_queries: List[str]):
+        """So'rov termlari og'irliklari va har bir so'rovning maksimal bahosi
+
+        (weights, max_scores, n_docs, avgdl) - hujjatlar soni va o'rtacha
+        uzunlik shu indeks nusxasidan olinadi.
+        """
+        n_docs = len(self.items)
+        if not self.total_len:
+            return [], np.zeros(len(processed_queries)), n_docs, 0.0
+        avgdl = self.total_len / n_docs
+
+        weights = []
+        max_scores = np.zeros(len(processed_queries))
+        for row, processed_query in enumerate(processed_queries):
+            query_weights, max_scores[row] = self._query_weights(processed_query, n_docs, avgdl)
+            weights.append(query_weights)
+        return weights, max_scores, n_docs, avgdl
+
+    def score_queries(self, encoded_queries):
+        """So'rovlar x hujjatlar normallashgan BM25 bahosi (Q x N sparse)
+
+        Baho so'rovning o'ziga teng hujjat olishi mumkin bo'lgan bahoga
+        bo'linadi, shuning uchun natija 0..1 oralig'ida va cosine bilan bir xil
+        threshold ishlatiladi.
+        """
+        weights, max_scores, n_docs, avgdl = encoded_queries
+        n_queries = len(max_scores)
+        if not avgdl:
+            return sp.csr_matrix((n_queries, n_docs))
+        n_base_terms = self.matrix.shape[0]
+
+        base_terms, base_weights, base_indptr = [], [], [0]
+        delta_rows, delta_docs, delta_scores = [], [], []
+        for row, query_weights in enumerate(weights):
+            for term_id, weight in query_weights.items():
+                if term_id < n_base_terms:
+                    base_terms.append(term_id)
+                    base_weights.append(weight)
+            base_indptr.append(len(base_terms))
+
+            if self.pending:
+                docs, scores = self._delta_scores(query_weights, avgdl)
+                delta_rows.append(np.full(len(docs), row))
+                delta_docs.append(docs)
+                delta_scores.append(scores)
+
+        # Asosiy postinglar: so'rovlar x (term x hujjat) - faqat so'rov termlari satrlari o'qiladi
+        query_matrix = sp.csr_matrix(
+            (base_weights, base_terms, base_indptr),
+            shape=(n_queries, n_base_terms), dtype=self.matrix.dtype
+        )
+        scores = query_matrix @ self.matrix
+
+        if self.pending:
+            delta = sp.csr_matrix(
+                (np.concatenate(delta_scores), (np.concatenate(delta_rows), np.concatenate(delta_docs))),
+                shape=(n_queries, self.pending)
+            )
+            scores = sp.hstack([scores, delta], format='csr')
+
+        # Har bir satrni so'rovning maksimal bahosiga bo'lish
+        inverse_max = np.divide(1.0, max_scores, out=np.zeros(n_queries), where=max_scores > 0)
+        scores = scores.tocsr()
+        scores.data *= np.repeat(inverse_max, np.diff(scores.indptr)).astype(scores.dtype)
+        np.minimum(scores.data, 1.0, out=scores.data)
+        return scores
+
+def top_k(docs: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """Eng yuqori k ta baho (argpartition bilan, kamayish tartibida)"""
+    if k <= 0 or not len(scores):
+        return []
+
+    if len(scores) > k:
+        # To'liq saralash o'rniga O(n) qisman tanlash
+        selected = np.argpartition(-scores, k - 1)[:k]
+        docs, scores = docs[selected], scores[selected]
+
+    order = np.argsort(-scores, kind='stable')
+    return [(int(docs[i]), float(scores[i])) for i in order]
+
+INDEX_TYPES = {
+    TfidfIndex.engine: TfidfIndex,
+    BM25Index.engine: BM25Index,
+}
+
+def create_index(engine: str, items: List[Dict[str, Any]], processed_questions: List[str],
+                 **options) -> KnowledgeIndex:
+    """Berilgan qidiruv mexanizmi uchun indeks qurish"""
+    if engine not in INDEX_TYPES:
+        raise ValueError(f"Unknown retrieval engine: {engine}")
+    return INDEX_TYPES[engine].build(items, processed_questions, **options)
@@ -0,0 +1,161 @@
+# ai/knowledge_io.py
+import codecs
+import json
+import zlib
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Tuple
+
+READ_CHUNK_SIZE = 1 << 20  # 1 MB
+WRITE_CHUNK_SIZE = 64 * 1024
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+# Bilimlari bo'sh ro'yxat bo'lgan domain belgisi (domain import qilinadi, bilim qo'shilmaydi)
+EMPTY_DOMAIN = object()
+
+class StreamingJSONReader:
+    """JSON matnni bo'laklab o'qish - butun fayl xotiraga yuklanmaydi
+    
+    Tuzilma belgilari ({, [, :, ,) qo'lda o'qiladi, alohida qiymatlar esa
+    json.JSONDecoder.raw_decode bilan buferdan ajratib olinadi.
+    """
+    
+    WHITESPACE = " \t\r\n"
+    
+    def __init__(self, stream: BinaryIO, chunk_size: int = READ_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        # utf-8-sig: fayl boshidagi BOM tashlab yuboriladi
+        self.text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+    
+    def _fill(self) -> bool:
+        """Buferga keyingi bo'lakni qo'shish (o'qilgan qism tashlab yuboriladi)"""
+        if self.eof:
+            return False
+        
+        data = self.stream.read(self.chunk_size)
+        self.eof = not data
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(data, final=self.eof)
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Keyingi bo'sh bo'lmagan belgi (fayl oxirida bo'sh satr)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+    
+    def consume(self, char: str) -> bool:
+        """Keyingi belgi char bo'lsa, uni o'tkazib yuborish"""
+        if self.peek() != char:
+            return False
+        self.pos += 1
+        return True
+    
+    def expect(self, char: str):
+        """Keyingi belgi char bo'lishi shart"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid JSON: expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+    
+    def value(self) -> Any:
+        """Keyingi to'liq JSON qiymatini o'qish"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Qiymat bufer chegarasida uzilgan bo'lishi mumkin
+                if not self._fill():
+                    raise ValueError(f"Invalid JSON: {e.msg}") from e
+                continue
+            
+            # Bufer oxiridagi son keyingi bo'lakda davom etishi mumkin
+            if end == len(self.buffer) and isinstance(value, (int, float)) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+def iter_json_knowledge(stream: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """{"domain": [item, ...], ...} ko'rinishidagi eksport faylidan (domain, item) juftliklari
+
+    Bo'sh ro'yxatli domain uchun (domain, EMPTY_DOMAIN) qaytariladi.
+    """
+    reader = StreamingJSONReader(stream, chunk_size)
+    reader.expect("{")
+    if reader.consume("}"):
+        return
+    
+    while True:
+        domain_name = reader.value()
+        if not isinstance(domain_name, str):
+            raise ValueError("Invalid JSON: domain name must be a string")
+        reader.expect(":")
+        reader.expect("[")
+        
+        if reader.consume("]"):
+            yield domain_name, EMPTY_DOMAIN
+        else:
+            while True:
+                yield domain_name, reader.value()
+                if not reader.consume(","):
+                    break
+            reader.expect("]")
+        
+        if not reader.consume(","):
+            break
+    reader.expect("}")
+
+def iter_ndjson_knowledge(stream: BinaryIO) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """NDJSON eksport faylidan (domain, item) juftliklari (har bir qatorda "domain" maydoni)"""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            domain_name = item.pop("domain")
+        except (ValueError, KeyError, AttributeError, TypeError) as e:
+            raise ValueError(f"Invalid NDJSON record on line {line_number}: {e}") from e
+        yield domain_name, item
+
+def iter_knowledge_file(stream: BinaryIO, file_path: str) -> Iterator[Tuple[str, Any]]:
+    """Fayl kengaytmasiga qarab JSON yoki NDJSON o'quvchini tanlash (.gz qo'shimchasi e'tiborga olinmaydi)"""
+    name = file_path[:-3] if file_path.endswith(".gz") else file_path
+    if name.endswith(NDJSON_SUFFIXES):
+        return iter_ndjson_knowledge(stream)
+    return iter_json_knowledge(stream)
+
+def iter_ndjson_chunks(records: Iterable[Dict[str, Any]], compress: bool = False,
+                       chunk_size: int = WRITE_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yozuvlarni NDJSON baytlari bo'laklariga aylantirish (ixtiyoriy gzip)"""
+    # wbits=31: gzip sarlavhasi bilan oqimli siqish
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    lines = []
+    size = 0
+    
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+    
+    for record in records:
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            chunk = emit(b"".join(lines))
+            lines.clear()
+            size = 0
+            if chunk:
+                yield chunk
+    
+    chunk = emit(b"".join(lines))
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
@@ -1,96 +1,393 @@
 # ai/nlp_processor.py
 import re
-import nltk
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import heapq
+import functools
 import joblib
-from typing import List, Dict, Tuple
+import threading
+import time
+from typing import Callable, List, Dict, Optional, Tuple
 import logging
 
+from ai.answer_cache import MISS, AnswerCache
+from ai.indexing import create_index
+from ai.snapshots import IndexSnapshotStore, content_version
+from config.settings import settings
+from monitoring.metrics import stage_metrics
+
 logger = logging.getLogger(__name__)
 
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]')
+
 class NLPProcessor:
+    CONFIDENCE_THRESHOLD = 0.3
+    
     def __init__(self):
+        # E'lon qilingan holat: domain lug'atlari o'zgartirilmaydi, yozuvchi ularni
+        # yangi nusxa bilan almashtiradi - o'quvchilar qulfsiz bitta havolani oladi
         self.vectorizers = {}
         self.knowledge_base = {}
-        self.setup_nltk()
+        self.indexes = {}
+        self.generation = 0
+        # Faqat yozuvchilarni (qo'shish, qayta yuklash, compaction) ketma-ket qiladi
+        self._index_lock = threading.RLock()
+        self._compactions = {}
+        self.snapshots = IndexSnapshotStore(settings.INDEX_SNAPSHOT_DIR) if settings.INDEX_SNAPSHOTS_ENABLED else None
+        # Normallashtirilgan matnlar uchun chegaralangan, thread-safe LRU kesh
+        self._preprocess_cached = functools.lru_cache(maxsize=settings.PREPROCESS_CACHE_SIZE)(self._preprocess)
+        # NLTK birinchi marta matn qayta ishlanganda yuklanadi
+        self._stop_words = None
+        # find_best_answer natijalari keshi (ANSWER_CACHE_SIZE=0 bo'lsa o'chirilgan)
+        self.answer_cache = (
+            AnswerCache(settings.ANSWER_CACHE_SIZE, settings.ANSWER_CACHE_TTL)
+            if settings.ANSWER_CACHE_SIZE > 0 else None
+        )
+        # Berilgan javob uchun bilim id si bilan chaqiriladi (masalan, DomainKnowledgeManager.record_usage)
+        self.usage_recorder: Optional[Callable[[int], None]] = None
     
     def setup_nltk(self):
         """NLTK ni sozlash"""
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
+        import nltk
         
         try:
             nltk.data.find('corpora/stopwords')
         except LookupError:
             nltk.download('stopwords')
         
-        self.stop_words = set(nltk.corpus.stopwords.words('english'))
+        self._stop_words = set(nltk.corpus.stopwords.words('english'))
+    
+    @property
+    def stop_words(self) -> set:
+        """Stop so'zlar (kerak bo'lganda NLTK dan yuklanadi)"""
+        if self._stop_words is None:
+            self.setup_nltk()
+        return self._stop_words
     
     def preprocess_text(self, text: str) -> str:
-        """Matnni qayta ishlash"""
+        """Matnni qayta ishlash (takroriy matnlar keshdan olinadi)"""
         if not text:
             return ""
         
-        text = text.lower()
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        tokens = nltk.word_tokenize(text)
-        tokens = [token for token in tokens if token not in self.stop_words]
+        return self._preprocess_cached(text)
+    
+    def _preprocess(self, text: str) -> str:
+        """Matnni normallashtirish: kichik harf, faqat harflar, stop so'zlarsiz"""
+        text = NON_ALPHA_PATTERN.sub('', text.lower())
+        # Matnda faqat harf va bo'shliq qoldi - Punkt tokenizer o'rniga oddiy split yetarli
+        stop_words = self.stop_words
+        tokens = [token for token in text.split() if token not in stop_words]
         return ' '.join(tokens)
     
-    def load_domain_knowledge(self, domain_knowledge: Dict):
-        """Domain bilimlarini yuklash"""
-        self.knowledge_base = domain_knowledge
+    def preprocess_cache_info(self) -> Dict[str, int]:
+        """Preprocessing keshi statistikasi"""
+        info = self._preprocess_cached.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize
+        }
+    
+    def answer_cache_info(self) -> Optional[Dict]:
+        """Javoblar keshi statistikasi (kesh o'chirilgan bo'lsa None)"""
+        return self.answer_cache.stats() if self.answer_cache is not None else None
+    
+    def load_domain_knowledge(self, domain_knowledge: Dict, versions: Optional[Dict[str, str]] = None):
+        """Domain bilimlarini yuklash
+
+        Indekslar chetda quriladi va barcha berilgan domainlar bitta
+        almashtirish bilan e'lon qilinadi; boshqa domainlar o'zgarmaydi.
+        versions - bilimlar bazasining domain bo'yicha o'zgarish hisoblagichi;
+        berilmasa, snapshot versiyasi savollar matnidan hisoblanadi.
+        """
+        # Har bir domain uchun indeks yaratish (yoki snapshotdan yuklash)
+        indexes = {
+            domain: self._prepare_index(domain, list(knowledge_list), (versions or {}).get(domain))
+            for domain, knowledge_list in domain_knowledge.items()
+        }
+        
+        with self._index_lock:
+            self._publish(indexes)
+    
+    def build_index(self, domain: str, version: Optional[str] = None):
+        """Domain indeksini joriy bilimlardan qayta qurib, e'lon qilish"""
+        index = self._prepare_index(domain, list(self.knowledge_base.get(domain, [])), version)
+        with self._index_lock:
+            self._publish({domain: index})
+    
+    def _prepare_index(self, domain: str, knowledge_list: List[Dict], version: Optional[str] = None):
+        """Domain indeksini snapshotdan yuklash yoki korpusni qayta ishlab qurish (bo'sh domain uchun None)"""
+        if not knowledge_list:
+            return None
+        
+        engine = self.get_engine(domain)
+        options = settings.RETRIEVAL_ENGINE_OPTIONS.get(engine, {})
+        
+        index = None
+        if self.snapshots is not None:
+            version = version or content_version(knowledge_list)
+            index = self.snapshots.load(domain, version, engine, knowledge_list, options)
+        
+        if index is None:
+            index = self._create_index(domain, knowledge_list)
+            if self.snapshots is not None:
+                self.snapshots.save(domain, index, version, options)
+        return index
+    
+    def get_engine(self, domain: str) -> str:
+        """Domain uchun tanlangan qidiruv mexanizmi (tfidf yoki bm25)"""
+        return settings.DOMAIN_RETRIEVAL_ENGINES.get(domain, settings.RETRIEVAL_ENGINE)
+    
+    def _create_index(self, domain: str, knowledge_list: List[Dict]):
+        """Bilimlar ro'yxatidan domain indeksini qurish"""
+        engine = self.get_engine(domain)
+        # Korpus keshni chetlab o'tadi, aks holda mashhur so'rovlar keshdan siqib chiqariladi
+        processed_questions = [self._preprocess(item["question"]) for item in knowledge_list]
+        options = settings.RETRIEVAL_ENGINE_OPTIONS.get(engine, {})
+        return create_index(engine, knowledge_list, processed_questions, **options)
+    
+    def _publish(self, indexes: Dict):
+        """Yangi indekslarni (None - bo'sh domain) atomar havola almashtirish bilan faol qilish
+
+        _index_lock ostida chaqiriladi. Indeks, vectorizer va bilimlar
+        lug'atlari nusxalanib yangilanadi va keyin almashtiriladi, shuning
+        uchun o'quvchi hech qachon yarim yangilangan holatni ko'rmaydi.
+        """
+        published = dict(self.indexes)
+        vectorizers = dict(self.vectorizers)
+        knowledge_base = dict(self.knowledge_base)
         
-        # Har bir domain uchun vectorizer yaratish
-        for domain, knowledge_list in domain_knowledge.items():
-            questions = [item["question"] for item in knowledge_list]
-            processed_questions = [self.preprocess_text(q) for q in questions]
+        for domain, index in indexes.items():
+            if index is None:
+                published.pop(domain, None)
+                vectorizers.pop(domain, None)
+                knowledge_base[domain] = []
+                continue
+            
+            self.generation += 1
+            index.generation = self.generation
+            published[domain] = index
+            if index.vectorizer is not None:
+                vectorizers[domain] = index.vectorizer
+            else:
+                vectorizers.pop(domain, None)
+            # Indeksning o'z ro'yxati - e'lon qilingandan keyin o'zgartirilmaydi
+            knowledge_base[domain] = index.items
+        
+        # O'quvchi avval indeksni oladi; bilimlar lug'ati faqat indeks yo'q bo'lganda o'qiladi
+        self.indexes = published
+        self.vectorizers = vectorizers
+        self.knowledge_base = knowledge_base
+        
+        for domain in indexes:
+            self.invalidate_answers(domain)
+    
+    def index_info(self) -> Dict:
+        """E'lon qilingan indekslar avlodlari va hajmi (/health uchun)"""
+        indexes = self.indexes
+        return {
+            "generation": self.generation,
+            "domains": {
+                domain: {
+                    "generation": index.generation,
+                    "engine": index.engine,
+                    "items": len(index),
+                    "pending": index.pending
+                }
+                for domain, index in indexes.items()
+            }
+        }
+    
+    def invalidate_answers(self, domain: str):
+        """Domain bilimlari o'zgarganda keshlangan javoblarni bekor qilish"""
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate(domain)
+    
+    def compact_index(self, domain: str):
+        """Indeksni to'liq qayta fit qilish (delta hujjatlarni asosiy matritsaga birlashtirish)"""
+        source = self.indexes.get(domain)
+        if source is None:
+            return
+        
+        knowledge_list = list(source.items)
+        index = self._create_index(domain, knowledge_list)
+        
+        with self._index_lock:
+            current = self.indexes.get(domain)
+            if current is None or current.lineage != source.lineage:
+                # Domain shu vaqt ichida butunlay qayta yuklangan
+                return
+            
+            # Qayta qurish davomida yangilangan javoblar (savollar, demak vektorlar, o'zgarmagan)
+            index.items[:len(knowledge_list)] = current.items[:len(knowledge_list)]
+            # Qayta qurish davomida qo'shilgan bilimlar
+            for item in current.items[len(knowledge_list):]:
+                index.append(item, self.preprocess_text(item["question"]))
+            
+            self._publish({domain: index})
+        
+        logger.info(f"Index compacted for domain {domain}: {len(index)} items")
+    
+    def schedule_compaction(self, domain: str):
+        """Indeksni fon oqimida qayta qurishni rejalashtirish"""
+        with self._index_lock:
+            if domain in self._compactions:
+                return
             
-            vectorizer = TfidfVectorizer(max_features=1000)
-            vectorizer.fit(processed_questions)
-            self.vectorizers[domain] = vectorizer
+            thread = threading.Thread(target=self._run_compaction, args=(domain,), daemon=True)
+            self._compactions[domain] = thread
+        
+        thread.start()
+    
+    def _run_compaction(self, domain: str):
+        try:
+            self.compact_index(domain)
+        except Exception as e:
+            logger.error(f"Error compacting index for {domain}: {e}")
+        finally:
+            with self._index_lock:
+                self._compactions.pop(domain, None)
     
     def find_best_answer(self, question: str, domain: str = "general") -> Tuple[str, float]:
         """Eng yaxshi javobni topish"""
-        if domain not in self.knowledge_base:
-            return "I don't have knowledge about this domain yet.", 0.0
-        
-        processed_question = self.preprocess_text(question)
-        knowledge_list = self.knowledge_base[domain]
+        best_item, answer, similarity = self.find_best_match(question, domain)
+        if best_item is not None:
+            self.record_usage(best_item)
+        return answer, similarity
+    
+    def find_best_match(self, question: str, domain: str = "general") -> Tuple[Optional[Dict], str, float]:
+        """Eng mos bilim, javob va o'xshashlik (bilim topilmasa - None va fallback javob)
+
+        Foydalanish hisoblagichiga yozmaydi: natijani bir nechta so'rovga
+        ulashadigan chaqiruvchi (masalan, so'rovlarni birlashtirish) har bir
+        so'rov uchun record_usage() ni o'zi chaqiradi.
+        """
+        cache = self.answer_cache
+        # Kesh avlodi indeksdan oldin olinadi - keyin e'lon qilingan indeks eski javobni keshga yozdirmaydi
+        generation = cache.generation(domain) if cache is not None else 0
         
-        if not knowledge_list:
-            return "No knowledge available for this domain.", 0.0
+        # Indeks bir marta olinadi: bilimlar ro'yxati va matritsalar shu nusxaga tegishli
+        index = self.indexes.get(domain)
+        if index is None:
+            return None, self._missing_index_response(domain), 0.0
         
-        # TF-IDF vektorlari
-        questions = [item["question"] for item in knowledge_list]
-        processed_questions = [self.preprocess_text(q) for q in questions]
+        start = time.perf_counter()
+        processed_question = self.preprocess_text(question)
+        stage_metrics.observe("preprocess", domain, time.perf_counter() - start)
         
-        vectorizer = self.vectorizers.get(domain)
-        if vectorizer is None:
-            return "Domain model not trained yet.", 0.0
+        if cache is not None:
+            cached = cache.get(domain, processed_question)
+            if cached is MISS:
+                return None, self._fallback_response(question, domain), 0.0
+            if cached is not None:
+                best_item, best_similarity = cached
+                return best_item, best_item["answer"], best_similarity
         
         try:
-            # Similarity hisoblash
-            question_vec = vectorizer.transform([processed_question])
-            knowledge_vecs = vectorizer.transform(processed_questions)
-            
-            similarities = cosine_similarity(question_vec, knowledge_vecs)
-            best_match_idx = np.argmax(similarities)
-            best_similarity = similarities[0][best_match_idx]
+            # Similarity hisoblash (oldindan qurilgan indeks ustida)
+            start = time.perf_counter()
+            encoded_question = index.encode_queries([processed_question])
+            vectorised = time.perf_counter()
+            best_match_idx, best_similarity = index.best_encoded_match(encoded_question)
+            stage_metrics.observe("vectorise", domain, vectorised - start)
+            stage_metrics.observe("similarity", domain, time.perf_counter() - vectorised)
             
-            if best_similarity > 0.3:  # Threshold
-                best_answer = knowledge_list[best_match_idx]["answer"]
-                return best_answer, float(best_similarity)
+            if best_similarity > self.CONFIDENCE_THRESHOLD:
+                best_item = index.items[best_match_idx]
+                if cache is not None:
+                    cache.put(domain, processed_question, (best_item, float(best_similarity)), generation)
+                return best_item, best_item["answer"], float(best_similarity)
             else:
-                return self.get_fallback_response(question), 0.0
+                if cache is not None:
+                    # Noma'lum savollar ham keshlanadi - fallback javob har safar tasodifiy tanlanadi
+                    cache.put(domain, processed_question, MISS, generation)
+                return None, self._fallback_response(question, domain), 0.0
                 
         except Exception as e:
             logger.error(f"Error in similarity calculation: {e}")
-            return "I encountered an error processing your question.", 0.0
+            return None, "I encountered an error processing your question.", 0.0
+    
+    def find_best_answers(self, questions: List[str], domain: str = "general",
+                          top_k: int = 1) -> List[List[Tuple[str, float]]]:
+        """Ko'p savollar uchun eng yaxshi top_k javobni bitta vektorlangan o'tishda topish"""
+        if not questions:
+            return []
+
+        index = self.indexes.get(domain)
+        if index is None:
+            return [[(self._missing_index_response(domain), 0.0)] for _ in questions]
+        
+        processed_questions = [self.preprocess_text(question) for question in questions]
+        
+        try:
+            # Barcha savollar x korpus - bitta sparse ko'paytma
+            matches = index.batch_top_k(processed_questions, top_k)
+        except Exception as e:
+            logger.error(f"Error in batch similarity calculation: {e}")
+            return [[("I encountered an error processing your question.", 0.0)] for _ in questions]
+        
+        results = []
+        for question, question_matches in zip(questions, matches):
+            answers = [
+                (index.items[idx]["answer"], score)
+                for idx, score in question_matches
+                if score > self.CONFIDENCE_THRESHOLD
+            ]
+            if answers:
+                self.record_usage(index.items[question_matches[0][0]])
+            results.append(answers or [(self.get_fallback_response(question), 0.0)])
+        
+        return results
+    
+    def _missing_index_response(self, domain: str) -> str:
+        """Domain indeksi e'lon qilinmaganda qaytariladigan javob"""
+        knowledge_list = self.knowledge_base.get(domain)
+        if knowledge_list is None:
+            return "I don't have knowledge about this domain yet."
+        if not knowledge_list:
+            return "No knowledge available for this domain."
+        return "Domain model not trained yet."
+    
+    def find_top_answers(self, question: str, domain: Optional[str] = None,
+                         top_k: int = 10, min_score: float = 0.0) -> List[Dict]:
+        """Savolga eng mos top_k bilimni baholari bilan qaytarish (domain berilmasa - barchasidan)
+
+        Baholar barcha indekslarda 0..1 oralig'ida; min_score dan past natijalar
+        tashlanadi, har bir natija uni bergan qidiruv mexanizmi (engine) bilan belgilanadi.
+        """
+        domains = [domain] if domain else list(self.indexes.keys())
+        processed_question = self.preprocess_text(question)
+        
+        results = []
+        for domain_name in domains:
+            index = self.indexes.get(domain_name)
+            if index is None:
+                continue
+            
+            try:
+                matches = index.search(processed_question, top_k)
+            except Exception as e:
+                logger.error(f"Error in similarity calculation: {e}")
+                continue
+            
+            for idx, score in matches:
+                if score >= min_score:
+                    results.append(dict(index.items[idx], domain=domain_name, score=score, engine=index.engine))
+        
+        if len(domains) > 1:
+            results = heapq.nlargest(top_k, results, key=lambda result: result["score"])
+        return results
+    
+    def record_usage(self, item: Dict):
+        """Berilgan javobni usage_recorder ga uzatish (bazadan yuklanmagan bilimlarda id yo'q)"""
+        if self.usage_recorder is not None and "id" in item:
+            self.usage_recorder(item["id"])
+    
+    def _fallback_response(self, question: str, domain: str) -> str:
+        """Fallback javob (bosqich vaqti metrikaga yoziladi)"""
+        start = time.perf_counter()
+        response = self.get_fallback_response(question)
+        stage_metrics.observe("fallback", domain, time.perf_counter() - start)
+        return response
     
     def get_fallback_response(self, question: str) -> str:
         """Standart javoblar"""
@@ -105,21 +402,39 @@ class NLPProcessor:
         import random
         return random.choice(fallback_responses)
     
-    def add_knowledge(self, domain: str, question: str, answer: str, keywords: str = ""):
-        """Yangi bilim qo'shish"""
-        if domain not in self.knowledge_base:
-            self.knowledge_base[domain] = []
-        
-        self.knowledge_base[domain].append({
+    def add_knowledge(self, domain: str, question: str, answer: str, keywords: str = "",
+                      item_id: Optional[int] = None):
+        """Yangi bilim qo'shish (item_id - bazadagi id, foydalanish hisoblagichi uchun)"""
+        item = {
             "question": question,
             "answer": answer,
             "keywords": keywords
-        })
+        }
+        if item_id is not None:
+            item["id"] = item_id
+        processed_question = self.preprocess_text(question)
         
-        # Vectorizer ni qayta train qilish
-        questions = [item["question"] for item in self.knowledge_base[domain]]
-        processed_questions = [self.preprocess_text(q) for q in questions]
+        with self._index_lock:
+            index = self.indexes.get(domain)
+            position = index.find_question(question) if index is not None else None
+            if position is not None:
+                # Savol allaqachon mavjud - vektor o'zgarmaydi, faqat javob yangilangan nusxa e'lon qilinadi
+                self._publish({domain: index.replaced(position, {**index.items[position], **item})})
+                return
+            
+            if index is None or not settings.INCREMENTAL_INDEXING:
+                # Indeksni qayta qurish
+                knowledge_list = list(self.knowledge_base.get(domain, [])) + [item]
+                self._publish({domain: self._prepare_index(domain, knowledge_list)})
+                return
+            
+            # Qayta fit qilmasdan indeksga qo'shish (yangi nusxada)
+            index = index.appended(item, processed_question)
+            self._publish({domain: index})
+            needs_compaction = (
+                index.pending >= settings.INDEX_MAX_PENDING_ITEMS or
+                index.drift() > settings.INDEX_DRIFT_THRESHOLD
+            )
         
-        vectorizer = TfidfVectorizer(max_features=1000)
-        vectorizer.fit(processed_questions)
-        self.vectorizers[domain] = vectorizer
\ No newline at end of file
+        if needs_compaction:
+            self.schedule_compaction(domain)
@@ -0,0 +1,121 @@
+# ai/snapshots.py
+import hashlib
+import os
+import re
+import joblib
+import numpy as np
+import sklearn
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+from ai.indexing import INDEX_TYPES, KnowledgeIndex
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+def item_ids(items: List[Dict[str, Any]]) -> List[int]:
+    """Bilimlar identifikatori (bazadan kelmagan bo'lsa - ro'yxatdagi o'rni)"""
+    return [item.get("id", position) for position, item in enumerate(items)]
+
+def content_version(items: List[Dict[str, Any]]) -> str:
+    """O'zgarish hisoblagichi bo'lmagan bilimlar uchun savollar bo'yicha versiya"""
+    digest = hashlib.sha1()
+    for item in items:
+        digest.update(item["question"].encode('utf-8'))
+        digest.update(b'\0')
+    return f"content:{digest.hexdigest()}"
+
+def version_source(version: str) -> str:
+    """Versiya qaysi manbaga tegishli: "content" yoki DomainKnowledgeManager bazasining store_id si"""
+    return version.partition(":")[0]
+
+class IndexSnapshotStore:
+    """Domain indekslarining diskdagi versiyalangan snapshotlari
+
+    Har bir (manba, domain) uchun bitta fayl: lug'at, IDF/uzunliklar, CSR matritsa
+    massivlari va bilim identifikatorlari. Fayl mmap_mode='r' bilan
+    ochiladi, shuning uchun katta matritsalar xotiraga nusxalanmaydi.
+    Snapshot faqat versiya (bilimlar bazasi o'zgarish hisoblagichi),
+    qidiruv mexanizmi va uning sozlamalari mos kelsa ishlatiladi. Manba
+    versiyadan olinadi, shuning uchun sozlamalardagi va bazadagi bir xil
+    nomli domainlar bir-birining snapshotini almashtirmaydi.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def path(self, domain: str, version: str) -> Path:
+        """Domain snapshot fayli yo'li (versiya manbasi bo'yicha alohida)"""
+        source = version_source(version)
+        safe_name = re.sub(r'[^A-Za-z0-9_-]', '_', domain)
+        safe_source = re.sub(r'[^A-Za-z0-9_-]', '_', source)[:16]
+        suffix = hashlib.sha1(f"{source}\0{domain}".encode('utf-8')).hexdigest()[:8]
+        return self.directory / f"{safe_name}-{safe_source}-{suffix}.joblib"
+
+    def save(self, domain: str, index: KnowledgeIndex, version: str,
+             options: Optional[Dict[str, Any]] = None) -> bool:
+        """Indeksni snapshot fayliga yozish (atomar almashtirish bilan)"""
+        if index.pending:
+            logger.warning(f"Index for {domain} has unmerged items, snapshot skipped")
+            return False
+
+        state = index.to_state()
+        state.update({
+            "format": SNAPSHOT_FORMAT,
+            "sklearn": sklearn.__version__,
+            "engine": index.engine,
+            "options": dict(options or {}),
+            "version": version,
+            "item_ids": np.asarray(item_ids(index.items), dtype=np.int64),
+        })
+
+        path = self.path(domain, version)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            joblib.dump(state, tmp_path)
+            os.replace(tmp_path, path)
+            logger.info(f"Index snapshot saved for {domain}: {path}")
+            return True
+        except OSError as e:
+            logger.error(f"Error saving index snapshot for {domain}: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return False
+
+    def load(self, domain: str, version: str, engine: str, items: List[Dict[str, Any]],
+             options: Optional[Dict[str, Any]] = None) -> Optional[KnowledgeIndex]:
+        """Mos snapshot bo'lsa, indeksni memory-map orqali yuklash"""
+        path = self.path(domain, version)
+        if not path.exists():
+            return None
+
+        try:
+            state = joblib.load(path, mmap_mode='r')
+        except Exception as e:
+            logger.warning(f"Unreadable index snapshot {path}: {e}")
+            return None
+
+        if (state.get("format") != SNAPSHOT_FORMAT or
+                state.get("sklearn") != sklearn.__version__ or
+                state.get("engine") != engine or
+                state.get("options") != dict(options or {}) or
+                state.get("version") != version):
+            logger.info(f"Index snapshot for {domain} is stale")
+            return None
+
+        # Bilimlarni snapshotdagi tartibga keltirish
+        items_by_id = dict(zip(item_ids(items), items))
+        if len(items_by_id) != len(state["item_ids"]):
+            return None
+
+        ordered_items = []
+        for item_id in state["item_ids"].tolist():
+            item = items_by_id.get(item_id)
+            if item is None:
+                return None
+            ordered_items.append(item)
+
+        return INDEX_TYPES[engine].from_state(state, ordered_items)
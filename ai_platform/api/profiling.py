@@ -0,0 +1,41 @@
+# api/profiling.py
+import hmac
+
+from starlette.datastructures import Headers
+
+from monitoring.profiler import RequestProfiler
+
+PROFILE_HEADER = "x-profile"
+TOKEN_HEADER = "x-profile-token"
+ADMIN_PATH = "/admin/profile"
+
+def authorized(token: str, expected: str) -> bool:
+    """Token tekshiruvi (sozlamada token bo'lmasa - hech qanday qiymat qabul qilinmaydi)"""
+    return bool(expected) and hmac.compare_digest(token.encode(), expected.encode())
+
+class ProfilingMiddleware:
+    """Tanlangan HTTP so'rovlarni RequestProfiler bilan profillovchi ASGI middleware
+
+    So'rov PROFILING_TOKEN qiymatidagi X-Profile sarlavhasi yoki
+    profiler.arm() rejasi bo'yicha tanlanadi. /admin/profile so'rovlari
+    rejadagi hisobga kirmaydi. Faqat PROFILING_ENABLED bo'lsa o'rnatiladi.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler, token: str = ""):
+        self.app = app
+        self.profiler = profiler
+        self.token = token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(ADMIN_PATH):
+            await self.app(scope, receive, send)
+            return
+
+        header = Headers(scope=scope).get(PROFILE_HEADER)
+        selected = authorized(header, self.token) if header is not None else self.profiler.should_profile()
+        if not selected:
+            await self.app(scope, receive, send)
+            return
+
+        with self.profiler.profiling():
+            await self.app(scope, receive, send)
@@ -0,0 +1,70 @@
+# api/request_coalescer.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+def question_key(domain: str, question: str) -> Tuple[str, str]:
+    """Birlashtirish kaliti: kichik harf va bo'shliqlar siqilgan savol
+
+    Event loop da hisoblanadi, shuning uchun arzon bo'lishi kerak - to'liq
+    preprocess_text (lemmatizatsiya, NLTK ni yuklash) qidiruv ichida bajariladi.
+    """
+    return domain, " ".join(question.lower().split())
+
+class RequestCoalescer:
+    """Bir vaqtdagi bir xil so'rovlarni bitta hisoblashga birlashtirish (single-flight)
+
+    Kalit bo'yicha hisoblash bajarilayotgan bo'lsa, yangi so'rov uni qayta
+    boshlamaydi - o'sha vazifa natijasini (yoki xatosini) kutadi. Hisoblash
+    alohida asyncio vazifasi sifatida ishlaydi va asyncio.shield bilan
+    kutiladi, shuning uchun birinchi so'rov bekor qilinsa (mijoz uzilsa),
+    qolganlari natijasiz qolmaydi. Vazifa tugashi bilan kalit o'chiriladi:
+    natijalar keshlanmaydi.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+        # Metrikalar
+        self.executed = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+        self._waiters: Dict[Hashable, int] = {}
+
+    async def run(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """await func(*args) natijasi; shu kalit bilan bajarilayotgan hisoblash bo'lsa - unga qo'shilish"""
+        task = self._in_flight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            waiters = self._waiters[key] = self._waiters.get(key, 1) + 1
+            self.max_waiters = max(self.max_waiters, waiters)
+        else:
+            task = asyncio.ensure_future(func(*args))
+            self._in_flight[key] = task
+            self._waiters[key] = 1
+            self.executed += 1
+            self.max_waiters = max(self.max_waiters, 1)
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            self._waiters.pop(key, None)
+        # Barcha kutuvchilar bekor qilingan bo'lsa ham xato jurnalga "olinmagan" deb tushmasin
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Coalesced request failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Birlashtirilgan so'rovlar metrikalari"""
+        requests = self.executed + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "coalesce_rate": round(self.coalesced / requests, 4) if requests else 0.0,
+            "max_waiters": self.max_waiters
+        }
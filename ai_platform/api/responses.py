@@ -0,0 +1,33 @@
+# api/responses.py
+import time
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from monitoring.metrics import stage_metrics
+
+class ModelResponse(JSONResponse):
+    """Endpointning response_model i bo'yicha oldindan serializatsiya qilingan JSON javob
+
+    Endpoint Response qaytarsa, FastAPI response_model tekshiruvi va qayta
+    serializatsiyasini o'tkazib yuboradi. Shuning uchun endpoint bu javobni
+    faqat response_model ning o'zidan quradi: maydonlar model yaratilganda
+    pydantic tomonidan tekshiriladi va model_dump_json bilan bir marta
+    serializatsiya qilinadi (vaqti "serialise" bosqichi sifatida yoziladi).
+    Endpoint response_model va response_class=ModelResponse ni e'lon qiladi -
+    JSONResponse bo'lgani uchun OpenAPI sxemasi saqlanadi.
+    """
+
+    def __init__(self, content: Any, domain: str = "all", status_code: int = 200, **kwargs):
+        self.domain = domain
+        super().__init__(content, status_code=status_code, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if not isinstance(content, BaseModel):
+            return super().render(content)
+
+        start = time.perf_counter()
+        body = content.model_dump_json().encode("utf-8")
+        stage_metrics.observe("serialise", self.domain, time.perf_counter() - start)
+        return body
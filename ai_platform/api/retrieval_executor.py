@@ -0,0 +1,204 @@
+# api/retrieval_executor.py
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+
+# Jarayon rejimidagi har bir worker ning o'z NLPProcessor nusxasi
+_worker_processor = None
+# Worker qo'llagan oxirgi bilim qo'shilishi avlodi (RetrievalExecutor.add_knowledge)
+_worker_generation = 0
+
+def init_worker(domain_knowledge: Dict, versions: Optional[Dict[str, str]] = None):
+    """Worker jarayonida bilimlarni yuklash (snapshotlar bo'lsa mmap orqali)"""
+    global _worker_processor, _worker_generation
+    from ai.nlp_processor import NLPProcessor
+
+    _worker_processor = NLPProcessor()
+    _worker_processor.load_domain_knowledge(domain_knowledge, versions)
+    _worker_generation = 0
+
+def run_in_worker(updates: List[Tuple], func: Callable, *args: Any):
+    """Hali qo'llanmagan bilim qo'shilishlarini qo'llab, func(*args) ni bajarish
+
+    (pid, avlod, natija) qaytariladi - ota jarayon keyingi vazifalarga
+    faqat workerlar hali ko'rmagan qo'shilishlarni biriktiradi.
+    """
+    global _worker_generation
+    for generation, domain, question, answer, keywords in updates:
+        if generation > _worker_generation:
+            # Inkremental qo'shish - indeks qayta qurilmaydi
+            _worker_processor.add_knowledge(domain, question, answer, keywords)
+            _worker_generation = generation
+    return os.getpid(), _worker_generation, func(*args)
+
+def worker_find_best_match(question: str, domain: str):
+    return _worker_processor.find_best_match(question, domain)
+
+def worker_find_best_answers(questions, domain: str, top_k: int):
+    return _worker_processor.find_best_answers(questions, domain, top_k)
+
+class RetrievalExecutor:
+    """CPU og'ir qidiruvni event loop dan tashqarida, cheklangan parallellik bilan bajarish
+
+    mode: "inline" (event loop ichida, oldingi xatti-harakat), "thread" yoki
+    "process". Semafor bir vaqtda bajariladigan qidiruvlar sonini
+    max_concurrency bilan cheklaydi - ortiqcha so'rovlar event loop ni
+    band qilmasdan navbatda kutadi. Jarayon rejimida add_knowledge orqali
+    qo'shilgan bilimlar workerlarga keyingi vazifalari bilan yetkaziladi;
+    barcha workerlar qo'llagan qo'shilishlar logdan o'chiriladi.
+    """
+
+    def __init__(self, mode: str = THREAD, max_workers: int = 4, max_concurrency: Optional[int] = None,
+                 initializer: Optional[Callable] = None, initargs: tuple = ()):
+        if mode not in (INLINE, THREAD, PROCESS):
+            raise ValueError(f"Unknown retrieval executor mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self.initializer = initializer
+        self.initargs = initargs
+
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        # Semafor ishlatilayotgan event loop ga bog'lanadi (loop almashsa qayta yaratiladi)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+        # Jarayon workerlariga yetkaziladigan bilim qo'shilishlari: (avlod, domain, savol, javob, kalit so'zlar)
+        self._updates: List[Tuple] = []
+        self._generation = 0  # oxirgi berilgan avlod
+        self._trimmed = 0  # logdan o'chirilgan (barcha workerlar qo'llagan) oxirgi avlod
+        self._updates_lock = threading.Lock()
+        self._worker_generations: Dict[int, int] = {}  # pid -> qo'llangan avlod
+
+        # Metrikalar
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.mode == PROCESS:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        initializer=self.initializer,
+                        initargs=self.initargs
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="retrieval"
+                    )
+            return self._executor
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """func(*args) ni pool da bajarish (inline rejimida - to'g'ridan-to'g'ri)"""
+        if self.mode == INLINE:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+
+        self.waiting += 1
+        async with self._semaphore:
+            self.waiting -= 1
+            self.in_flight += 1
+            try:
+                if self.mode == PROCESS:
+                    result = await self._run_in_process(loop, func, args)
+                else:
+                    result = await loop.run_in_executor(self._get_executor(), functools.partial(func, *args))
+                self.completed += 1
+                return result
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+    async def _run_in_process(self, loop, func: Callable, args: tuple) -> Any:
+        """Vazifani worker ga u hali ko'rmagan bilim qo'shilishlari bilan yuborish"""
+        executor = self._get_executor()
+        pending = self._pending_updates()
+        pid, generation, result = await loop.run_in_executor(
+            executor, functools.partial(run_in_worker, pending, func, *args)
+        )
+        if executor is self._executor:
+            with self._updates_lock:
+                self._worker_generations[pid] = max(generation, self._worker_generations.get(pid, 0))
+                self._trim_updates()
+        return result
+
+    def _pending_updates(self) -> List[Tuple]:
+        """Eng orqada qolgan worker qo'llamagan qo'shilishlar (vazifa istalgan workerga tushishi mumkin)"""
+        with self._updates_lock:
+            if len(self._worker_generations) < self.max_workers:
+                # Hali vazifa olmagan worker boshlang'ich bilimlar bilan ishga tushadi
+                return list(self._updates)
+            applied = min(self._worker_generations.values())
+            return self._updates[max(applied - self._trimmed, 0):]
+
+    def _trim_updates(self):
+        """Barcha workerlar qo'llagan qo'shilishlarni logdan o'chirish (_updates_lock ostida)"""
+        if len(self._worker_generations) < self.max_workers:
+            return
+        applied = min(self._worker_generations.values())
+        if applied > self._trimmed:
+            del self._updates[:applied - self._trimmed]
+            self._trimmed = applied
+
+    def add_knowledge(self, domain: str, question: str, answer: str, keywords: str = ""):
+        """Qo'shilgan bilimni jarayon workerlariga yetkazish (pool qayta ishga tushirilmaydi)"""
+        with self._updates_lock:
+            self._generation += 1
+            self._updates.append((self._generation, domain, question, answer, keywords))
+
+    def restart(self, initargs: tuple):
+        """Worker jarayonlarini yangi bilimlar bilan qayta ishga tushirish (jarayon rejimi uchun)
+
+        initargs barcha oldingi qo'shilishlarni o'z ichiga olishi kerak -
+        qo'llangan qo'shilishlar logda saqlanmaydi.
+        """
+        with self._updates_lock:
+            self.initargs = initargs
+            self._updates = []
+            self._trimmed = self._generation
+            self._worker_generations = {}
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # Bajarilayotgan vazifalar eski pool da tugaydi
+            executor.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "knowledge_updates": len(self._updates)
+        }
@@ -1,13 +1,23 @@
 # api/routes.py
-from fastapi import APIRouter, HTTPException, Depends, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+import heapq
+import itertools
+import os
 import time
 import uuid
+from datetime import datetime, timedelta
 
 from ai.nlp_processor import NLPProcessor
 from ai.domain_knowledge import DomainKnowledgeManager
 from database.models import DatabaseManager
+from database.conversation_log import ConversationLogWriter
+from monitoring.metrics import CONTENT_TYPE, stage_metrics
+from api.responses import ModelResponse
+from api.request_coalescer import RequestCoalescer, question_key
+from api.retrieval_executor import PROCESS, THREAD, RetrievalExecutor
 from config.settings import settings
 
 # Router yaratish
@@ -29,7 +39,13 @@ class DomainInfo(BaseModel):
 class SearchRequest(BaseModel):
     query: str
     domain: Optional[str] = None
-    limit: Optional[int] = 10
+    limit: Optional[int] = Field(10, ge=1, le=1000)
+
+class SearchResult(KnowledgeItem):
+    domain: Optional[str] = None
+    score: float = 0.0  # 0..1 (fts5 uchun natijalar ichidagi eng yuqori bm25 ga nisbatan)
+    engine: Optional[str] = None  # natijani bergan qidiruv mexanizmi (tfidf, bm25, fts5, like)
+    bm25: Optional[float] = None  # fts5: normallashtirilmagan bm25 bahosi
 
 class VoiceRequest(BaseModel):
     audio_data: str  # Base64 encoded audio
@@ -43,20 +59,81 @@ class VoiceResponse(BaseModel):
 
 # Global instances
 db_manager = DatabaseManager(settings.DATABASE_URL)
+conversation_log = ConversationLogWriter(
+    db_manager,
+    max_queue_size=settings.CONVERSATION_LOG_QUEUE_SIZE,
+    batch_size=settings.CONVERSATION_LOG_BATCH_SIZE,
+    flush_interval=settings.CONVERSATION_LOG_FLUSH_INTERVAL,
+    drop_policy=settings.CONVERSATION_LOG_DROP_POLICY
+)
 domain_manager = DomainKnowledgeManager()
 ai_processor = NLPProcessor()
+ai_processor.usage_recorder = domain_manager.record_usage
+# Bu yerdagi processor bazadan yuklanadi va o'zgaradi - jarayon workerlari eskirib qoladi, shuning uchun oqimlar
+retrieval = RetrievalExecutor(
+    THREAD if settings.RETRIEVAL_EXECUTOR == PROCESS else settings.RETRIEVAL_EXECUTOR,
+    max_workers=settings.RETRIEVAL_WORKERS,
+    max_concurrency=settings.RETRIEVAL_MAX_CONCURRENCY
+)
+# Bir vaqtdagi bir xil (domain, savol) so'rovlari bitta qidiruvni bo'lishadi
+coalescer = RequestCoalescer() if settings.REQUEST_COALESCING else None
+
+# Fon rejimidagi import vazifalari (job_id -> holat)
+import_jobs: Dict[str, Dict[str, Any]] = {}
+
+def load_processor_domains(domain_names):
+    """Domain bilimlarini bazadan AI processorga yuklash (mos snapshotlar qayta ishlatiladi)"""
+    domains_data = {}
+    versions = {}
+    for domain_name in domain_names:
+        domains_data[domain_name] = domain_manager.get_knowledge(domain_name)
+        versions[domain_name] = domain_manager.get_knowledge_version(domain_name)
+    
+    ai_processor.load_domain_knowledge(domains_data, versions)
+
+async def find_best_answer(question: str, domain: str):
+    """Eng yaxshi javob: qidiruv retrieval pool da, bir xil parallel so'rovlar birlashtirilib"""
+    if coalescer is None:
+        best_item, answer, confidence = await retrieval.run(ai_processor.find_best_match, question, domain)
+    else:
+        key = question_key(domain, question)
+        best_item, answer, confidence = await coalescer.run(
+            key, retrieval.run, ai_processor.find_best_match, question, domain
+        )
+    
+    # Birlashtirilgan har bir so'rov foydalanish hisoblagichiga alohida yoziladi
+    if best_item is not None:
+        ai_processor.record_usage(best_item)
+    return answer, confidence
+
+def merge_search_results(index_results: List[Dict], db_results: List[Dict], limit: int) -> List[Dict]:
+    """Indeks va bazadagi matn qidiruvi natijalarini birlashtirish
+
+    Bir xil (domain, savol) bir marta, yuqoriroq baho bilan qoladi; natijalar
+    baho bo'yicha (0..1) tartiblanadi.
+    """
+    merged = {}
+    for result in itertools.chain(index_results, db_results):
+        key = (result.get("domain"), result["question"])
+        if key not in merged or result.get("score", 0.0) > merged[key].get("score", 0.0):
+            merged[key] = result
+    return heapq.nlargest(limit, merged.values(), key=lambda result: result.get("score", 0.0))
 
 # Domain bilimlarini yuklash
 @router.on_event("startup")
 async def startup_event():
-    """Startup da domain bilimlarini yuklash"""
-    domains_data = {}
-    for domain_name in settings.DOMAIN_KNOWLEDGE.keys():
-        knowledge = domain_manager.get_knowledge(domain_name)
-        domains_data[domain_name] = knowledge
-    
-    ai_processor.load_domain_knowledge(domains_data)
+    """Startup da bazadagi barcha domain bilimlarini yuklash (/search ularning hammasini indeks bo'yicha baholaydi)"""
+    load_processor_domains(domain_manager.get_domain_stats().keys())
     print("Domain knowledge loaded successfully")
+    conversation_log.start()
+    domain_manager.usage.start()
+
+@router.on_event("shutdown")
+async def shutdown_event():
+    """Navbatdagi suhbatlar va foydalanish hisoblagichlarini yozib, fon yozuvchilarini to'xtatish"""
+    conversation_log.stop()
+    domain_manager.usage.stop()
+    retrieval.shutdown()
 
 # Domain boshqaruvi
 @router.get("/domains", response_model=List[DomainInfo])
@@ -108,19 +185,22 @@ async def get_domain_knowledge(domain_name: str, limit: int = Query(50, ge=1, le
 @router.post("/domains/{domain_name}/knowledge")
 async def add_knowledge_item(domain_name: str, item: KnowledgeItem):
     """Domainga yangi bilim qo'shish"""
-    success = domain_manager.add_knowledge(
+    item_id = domain_manager.add_knowledge(
         domain_name, 
         item.question, 
         item.answer, 
         item.keywords
     )
     
-    if not success:
+    if item_id is None:
         raise HTTPException(status_code=400, detail="Failed to add knowledge item")
     
-    # AI processorni yangilash
-    knowledge = domain_manager.get_knowledge(domain_name)
-    ai_processor.load_domain_knowledge({domain_name: knowledge})
+    # AI processorni yangilash: indeks bazadagi to'liq domaindan qurilgan bo'lsa - inkremental qo'shish,
+    # aks holda (startup da yuklanmagan domain) domain bazadan to'liq yuklanadi, yangi bilim ham ichida
+    if domain_name in ai_processor.indexes:
+        ai_processor.add_knowledge(domain_name, item.question, item.answer, item.keywords, item_id)
+    else:
+        load_processor_domains([domain_name])
     
     return {"message": "Knowledge item added successfully"}
 
@@ -132,11 +212,15 @@ async def delete_knowledge_item(domain_name: str, question: str):
     return {"message": "Delete functionality to be implemented"}
 
 # Qidiruv
-@router.post("/search", response_model=List[KnowledgeItem])
+@router.post("/search", response_model=List[SearchResult])
 async def search_knowledge(request: SearchRequest):
-    """Bilimlarni qidirish"""
-    results = domain_manager.search_knowledge(request.query, request.domain)
-    return results
+    """Bilimlarni qidirish: yuklangan domainlar indeksi va bazadagi FTS5 (yoki LIKE) natijalari birlashtirilib"""
+    limit = request.limit or 10
+    index_results = await retrieval.run(
+        ai_processor.find_top_answers, request.query, request.domain, limit, settings.SEARCH_MIN_SCORE
+    )
+    db_results = domain_manager.search_knowledge(request.query, request.domain, limit)
+    return merge_search_results(index_results, db_results, limit)
 
 # Statistikalar
 @router.get("/stats/domains")
@@ -147,31 +231,11 @@ async def get_domain_statistics():
 
 @router.get("/stats/usage")
 async def get_usage_statistics(days: int = Query(7, ge=1, le=365)):
-    """Foydalanish statistikasi"""
-    conn = db_manager.get_session()
-    try:
-        # Oxirgi kunlar uchun chat statistikasi
-        result = conn.execute('''
-            SELECT domain, COUNT(*) as count, AVG(response_time) as avg_time
-            FROM conversations 
-            WHERE created_at >= datetime('now', ?)
-            GROUP BY domain
-        ''', (f'-{days} days',))
-        
-        stats = []
-        for domain, count, avg_time in result:
-            stats.append({
-                "domain": domain,
-                "request_count": count,
-                "average_response_time": avg_time or 0.0
-            })
-        
-        return stats
-    finally:
-        conn.close()
+    """Foydalanish statistikasi (soatlik/kunlik rollup lardan)"""
+    return db_manager.get_usage_stats(datetime.utcnow() - timedelta(days=days))
 
 # Ovozli API
-@router.post("/voice/chat", response_model=VoiceResponse)
+@router.post("/voice/chat", response_model=VoiceResponse, response_class=ModelResponse)
 async def voice_chat_endpoint(request: VoiceRequest):
     """Ovozli chat endpoint"""
     start_time = time.time()
@@ -187,12 +251,13 @@ async def voice_chat_endpoint(request: VoiceRequest):
         audio_text = "Hello, this is a voice message"
         
         # AI dan javob olish
-        answer, confidence = ai_processor.find_best_answer(audio_text, request.domain)
+        answer, confidence = await find_best_answer(audio_text, request.domain)
         
         response_time = time.time() - start_time
         
-        # Database ga saqlash
-        db_manager.add_conversation(
+        # Database ga saqlash (fon rejimida, paketlab)
+        stage_start = time.perf_counter()
+        conversation_log.log(
             user_id=1,  # Default user
             session_id=session_id,
             question=audio_text,
@@ -200,44 +265,86 @@ async def voice_chat_endpoint(request: VoiceRequest):
             domain=request.domain,
             response_time=response_time
         )
+        stage_metrics.observe("db_write", request.domain, time.perf_counter() - stage_start)
         
-        return VoiceResponse(
+        response = ModelResponse(VoiceResponse(
             text=audio_text,
             answer=answer,
             response_time=response_time,
             session_id=session_id
-        )
+        ), request.domain)
+        stage_metrics.observe("request", request.domain, time.time() - start_time)
+        
+        return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Voice processing error: {str(e)}")
 
 # Eksport/Import
 @router.post("/export")
-async def export_knowledge(file_path: str = "knowledge_export.json"):
+async def export_knowledge(file_path: str = "knowledge_export.json",
+                           format: str = Query("json", pattern="^(json|ndjson)$"),
+                           compress: bool = False):
     """Bilimlarni eksport qilish"""
     try:
-        domain_manager.export_knowledge(file_path)
+        domain_manager.export_knowledge(file_path, format=format, compress=compress)
         return {"message": f"Knowledge exported to {file_path}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
-@router.post("/import")
-async def import_knowledge(file_path: str):
-    """Bilimlarni import qilish"""
+@router.get("/export/stream")
+async def export_knowledge_stream(domain: Optional[str] = None, compress: bool = False):
+    """Bilimlarni NDJSON (ixtiyoriy gzip) sifatida chunked javobda oqimli eksport qilish"""
+    filename = "knowledge_export.ndjson.gz" if compress else "knowledge_export.ndjson"
+    return StreamingResponse(
+        domain_manager.iter_knowledge_ndjson(domain, compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def run_import_job(job_id: str, file_path: str):
+    """Importni bajarib, oxirida import qilingan domainlar indeksini bir marta qayta qurish"""
+    job = import_jobs[job_id]
+    job["status"] = "running"
+    job["started_at"] = time.time()
     try:
-        domain_manager.import_knowledge(file_path)
+        result = domain_manager.import_knowledge(file_path, progress_callback=job.update)
+        job.update(result)
         
         # AI processorni yangilash
-        domains_data = {}
-        for domain_name in domain_manager.domains.keys():
-            knowledge = domain_manager.get_knowledge(domain_name)
-            domains_data[domain_name] = knowledge
-        
-        ai_processor.load_domain_knowledge(domains_data)
-        
-        return {"message": f"Knowledge imported from {file_path}"}
+        job["status"] = "indexing"
+        load_processor_domains(result["domains"])
+        job["status"] = "completed"
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        job["finished_at"] = time.time()
+
+@router.post("/import", status_code=202)
+async def import_knowledge(file_path: str, background_tasks: BackgroundTasks):
+    """Bilimlarni import qilish (fon rejimida; holati /import/{job_id} orqali)"""
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
+    
+    job_id = str(uuid.uuid4())
+    import_jobs[job_id] = {
+        "job_id": job_id,
+        "file_path": file_path,
+        "status": "pending",
+        "created_at": time.time()
+    }
+    background_tasks.add_task(run_import_job, job_id, file_path)
+    
+    return {"job_id": job_id, "status": "pending"}
+
+@router.get("/import/{job_id}")
+async def get_import_status(job_id: str):
+    """Import vazifasi holati va jarayoni"""
+    job = import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 # Health check va system info
 @router.get("/health")
@@ -247,9 +354,21 @@ async def health_check():
         "status": "healthy",
         "timestamp": time.time(),
         "domains_loaded": len(ai_processor.knowledge_base),
-        "total_knowledge_items": sum(len(items) for items in ai_processor.knowledge_base.values())
+        "total_knowledge_items": sum(len(items) for items in ai_processor.knowledge_base.values()),
+        "indexes": ai_processor.index_info(),
+        "preprocess_cache": ai_processor.preprocess_cache_info(),
+        "answer_cache": ai_processor.answer_cache_info(),
+        "retrieval": retrieval.stats(),
+        "request_coalescing": coalescer.stats() if coalescer is not None else None,
+        "conversation_log": conversation_log.stats(),
+        "usage_counters": domain_manager.usage.stats()
     }
 
+@router.get("/metrics")
+async def metrics():
+    """Bosqichlar kechikishi gistogrammalari (Prometheus matn formati)"""
+    return Response(content=stage_metrics.render(), media_type=CONTENT_TYPE)
+
 @router.get("/system/info")
 async def system_info():
     """Tizim ma'lumotlari"""
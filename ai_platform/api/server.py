@@ -1,16 +1,25 @@
 # api/server.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
-import uvicorn
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
 import time
 import uuid
+import logging
 
 from ai.nlp_processor import NLPProcessor
 from database.models import DatabaseManager
+from database.conversation_log import ConversationLogWriter
+from monitoring.metrics import CONTENT_TYPE, stage_metrics
+from monitoring.profiler import request_profiler
+from api.profiling import ADMIN_PATH, ProfilingMiddleware, authorized
+from api.request_coalescer import RequestCoalescer, question_key
+from api.responses import ModelResponse
+from api.retrieval_executor import PROCESS, RetrievalExecutor, init_worker, worker_find_best_match, worker_find_best_answers
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
+
 class ChatRequest(BaseModel):
     question: str
     domain: str = "general"
@@ -23,6 +32,24 @@ class ChatResponse(BaseModel):
     confidence: float
     domain: str
 
+class BatchChatRequest(BaseModel):
+    questions: List[str]
+    domain: str = "general"
+    top_k: int = Field(1, ge=1, le=100)
+
+class AnswerItem(BaseModel):
+    answer: str
+    confidence: float
+
+class BatchChatResult(BaseModel):
+    question: str
+    answers: List[AnswerItem]
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatResult]
+    response_time: float
+    domain: str
+
 class AIPlatformAPI:
     def __init__(self):
         self.app = FastAPI(
@@ -33,9 +60,27 @@ class AIPlatformAPI:
         
         # Komponentlarni yuklash
         self.db = DatabaseManager(settings.DATABASE_URL)
+        self.conversation_log = ConversationLogWriter(
+            self.db,
+            max_queue_size=settings.CONVERSATION_LOG_QUEUE_SIZE,
+            batch_size=settings.CONVERSATION_LOG_BATCH_SIZE,
+            flush_interval=settings.CONVERSATION_LOG_FLUSH_INTERVAL,
+            drop_policy=settings.CONVERSATION_LOG_DROP_POLICY
+        )
         self.ai_processor = NLPProcessor()
         self.ai_processor.load_domain_knowledge(settings.DOMAIN_KNOWLEDGE)
         
+        # Qidiruv event loop dan tashqarida bajariladi (inline/thread/process)
+        self.retrieval = RetrievalExecutor(
+            settings.RETRIEVAL_EXECUTOR,
+            max_workers=settings.RETRIEVAL_WORKERS,
+            max_concurrency=settings.RETRIEVAL_MAX_CONCURRENCY,
+            initializer=init_worker,
+            initargs=(self.ai_processor.knowledge_base,)
+        )
+        # Bir vaqtdagi bir xil (domain, savol) so'rovlari bitta qidiruvni bo'lishadi
+        self.coalescer = RequestCoalescer() if settings.REQUEST_COALESCING else None
+        
         # Middleware sozlash
         self.setup_middleware()
         # Route'larni sozlash
@@ -50,10 +95,33 @@ class AIPlatformAPI:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        if self.profiling_enabled():
+            # O'chirilgan holatda middleware o'rnatilmaydi - so'rov yo'liga hech qanday qo'shimcha narx yo'q
+            self.app.add_middleware(ProfilingMiddleware, profiler=request_profiler, token=settings.PROFILING_TOKEN)
+    
+    def profiling_enabled(self) -> bool:
+        """Profiler faqat token bilan yoqiladi - aks holda har qanday mijoz X-Profile yubora oladi"""
+        if not settings.PROFILING_ENABLED:
+            return False
+        if not settings.PROFILING_TOKEN:
+            logger.error("PROFILING_ENABLED is set without PROFILING_TOKEN: request profiling is not installed")
+            return False
+        return True
     
     def setup_routes(self):
         """Route'larni sozlash"""
         
+        @self.app.on_event("startup")
+        async def startup_event():
+            self.conversation_log.start()
+        
+        @self.app.on_event("shutdown")
+        async def shutdown_event():
+            # Navbatdagi barcha suhbatlar yozib bo'linadi
+            self.conversation_log.stop()
+            self.retrieval.shutdown()
+            request_profiler.stop()
+        
         @self.app.get("/")
         async def root():
             return {
@@ -62,23 +130,21 @@ class AIPlatformAPI:
                 "status": "running"
             }
         
-        @self.app.post("/api/chat", response_model=ChatResponse)
+        @self.app.post("/api/chat", response_model=ChatResponse, response_class=ModelResponse)
         async def chat_endpoint(request: ChatRequest):
             start_time = time.time()
             
             # Session ID yaratish
             session_id = request.session_id or str(uuid.uuid4())
             
-            # AI dan javob olish
-            answer, confidence = self.ai_processor.find_best_answer(
-                request.question, 
-                request.domain
-            )
+            # AI dan javob olish (event loop bloklanmaydi)
+            answer, confidence = await self.find_best_answer(request.question, request.domain)
             
             response_time = time.time() - start_time
             
-            # Database ga saqlash
-            self.db.add_conversation(
+            # Database ga saqlash (fon rejimida, paketlab)
+            stage_start = time.perf_counter()
+            self.conversation_log.log(
                 user_id=1,  # Default user
                 session_id=session_id,
                 question=request.question,
@@ -86,13 +152,43 @@ class AIPlatformAPI:
                 domain=request.domain,
                 response_time=response_time
             )
+            stage_metrics.observe("db_write", request.domain, time.perf_counter() - stage_start)
             
-            return ChatResponse(
+            # Javob ChatResponse dan shu yerda serializatsiya qilinadi - bosqich vaqti o'lchanadi
+            response = ModelResponse(ChatResponse(
                 answer=answer,
                 session_id=session_id,
                 response_time=response_time,
                 confidence=confidence,
                 domain=request.domain
+            ), request.domain)
+            stage_metrics.observe("request", request.domain, time.time() - start_time)
+            
+            return response
+        
+        @self.app.post("/api/chat/batch", response_model=BatchChatResponse)
+        async def chat_batch_endpoint(request: BatchChatRequest):
+            """Ko'p savollarga bitta vektorlangan o'tishda javob berish (offline baholash uchun)"""
+            start_time = time.time()
+            
+            batch_answers = await self.find_best_answers(
+                request.questions,
+                request.domain,
+                request.top_k
+            )
+            
+            results = [
+                BatchChatResult(
+                    question=question,
+                    answers=[AnswerItem(answer=answer, confidence=confidence) for answer, confidence in answers]
+                )
+                for question, answers in zip(request.questions, batch_answers)
+            ]
+            
+            return BatchChatResponse(
+                results=results,
+                response_time=time.time() - start_time,
+                domain=request.domain
             )
         
         @self.app.get("/api/domains")
@@ -102,15 +198,115 @@ class AIPlatformAPI:
                 "total_domains": len(settings.DOMAIN_KNOWLEDGE)
             }
         
+        @self.app.get("/api/health")
+        async def health_check():
+            return {
+                "status": "healthy",
+                "timestamp": time.time(),
+                "domains_loaded": len(self.ai_processor.knowledge_base),
+                "indexes": self.ai_processor.index_info(),
+                "answer_cache": self.ai_processor.answer_cache_info(),
+                "retrieval": self.retrieval.stats(),
+                "request_coalescing": self.coalescer.stats() if self.coalescer is not None else None,
+                "conversation_log": self.conversation_log.stats()
+            }
+        
+        @self.app.get("/metrics")
+        async def metrics():
+            """Bosqichlar kechikishi gistogrammalari (Prometheus matn formati)"""
+            return Response(content=stage_metrics.render(), media_type=CONTENT_TYPE)
+        
         @self.app.post("/api/knowledge/{domain}")
         async def add_knowledge(domain: str, question: str, answer: str, keywords: str = ""):
             self.ai_processor.add_knowledge(domain, question, answer, keywords)
+            if self.retrieval.mode == PROCESS:
+                # Bilim workerlarga keyingi vazifasi bilan yetkaziladi va ularda inkremental qo'shiladi
+                self.retrieval.add_knowledge(domain, question, answer, keywords)
             return {"message": "Knowledge added successfully", "domain": domain}
+        
+        if self.profiling_enabled():
+            self.setup_profiling_routes()
     
-    def run(self, host: str = None, port: int = None):
-        """Serverni ishga tushirish"""
+    def setup_profiling_routes(self):
+        """Profiler boshqaruvi: rejalashtirish, collapsed stacklarni olish va tozalash"""
+        
+        def check_token(token: str):
+            if not authorized(token, settings.PROFILING_TOKEN):
+                raise HTTPException(status_code=403, detail="Invalid profiling token")
+        
+        @self.app.post(ADMIN_PATH)
+        async def arm_profiler(requests: int = Query(10, ge=1, le=100000), sample_every: int = Query(1, ge=1),
+                               reset: bool = True, x_profile_token: str = Header("")):
+            """Keyingi so'rovlardan har sample_every tadan bittasini, jami requests tasini profillash"""
+            check_token(x_profile_token)
+            if reset:
+                request_profiler.reset()
+            request_profiler.arm(requests, sample_every)
+            return request_profiler.stats()
+        
+        @self.app.get(ADMIN_PATH)
+        async def get_profile(x_profile_token: str = Header("")):
+            """Collapsed stacklar (flamegraph.pl / speedscope formati)
+
+            Namunaga tushmagan so'rovlar soni sarlavhada - bo'sh profil jim qolmaydi.
+            """
+            check_token(x_profile_token)
+            stats = request_profiler.stats()
+            return Response(content=request_profiler.collapsed(), media_type="text/plain",
+                            headers={"Content-Disposition": 'attachment; filename="profile.collapsed"',
+                                     "X-Profile-Requests": str(stats["profiled_requests"]),
+                                     "X-Profile-Unsampled-Requests": str(stats["unsampled_requests"]),
+                                     "X-Profile-Samples": str(stats["samples"])})
+        
+        @self.app.get(f"{ADMIN_PATH}/status")
+        async def profile_status(x_profile_token: str = Header("")):
+            check_token(x_profile_token)
+            return request_profiler.stats()
+        
+        @self.app.delete(ADMIN_PATH)
+        async def reset_profile(x_profile_token: str = Header("")):
+            """Rejani bekor qilish va yig'ilgan stacklarni tozalash"""
+            check_token(x_profile_token)
+            request_profiler.disarm()
+            request_profiler.reset()
+            return request_profiler.stats()
+    
+    async def find_best_answer(self, question: str, domain: str):
+        """Eng yaxshi javob: qidiruv retrieval pool da, bir xil parallel so'rovlar birlashtirilib"""
+        if self.coalescer is None:
+            best_item, answer, confidence = await self.find_best_match(question, domain)
+        else:
+            key = question_key(domain, question)
+            best_item, answer, confidence = await self.coalescer.run(key, self.find_best_match, question, domain)
+        
+        # Birlashtirilgan har bir so'rov foydalanish hisoblagichiga alohida yoziladi
+        if best_item is not None:
+            self.ai_processor.record_usage(best_item)
+        return answer, confidence
+    
+    async def find_best_match(self, question: str, domain: str):
+        """find_best_match ni sozlangan retrieval pool da bajarish"""
+        if self.retrieval.mode == PROCESS:
+            return await self.retrieval.run(worker_find_best_match, question, domain)
+        return await self.retrieval.run(self.ai_processor.find_best_match, question, domain)
+    
+    async def find_best_answers(self, questions: List[str], domain: str, top_k: int):
+        if self.retrieval.mode == PROCESS:
+            return await self.retrieval.run(worker_find_best_answers, questions, domain, top_k)
+        return await self.retrieval.run(self.ai_processor.find_best_answers, questions, domain, top_k)
+    
+    def run(self, host: str = None, port: int = None, workers: int = None):
+        """Serverni ishga tushirish (workers > 1 bo'lsa - bir nechta jarayon)"""
+        import uvicorn
+        
         host = host or settings.API_HOST
         port = port or settings.API_PORT
+        workers = workers or settings.API_WORKERS
+        
+        if workers > 1:
+            # Bu instance baza sxemasi va indeks snapshotlarini allaqachon yaratgan; workerlar ularni mmap qiladi
+            serve_workers(host, port, workers, prepare=False)
+            return
         
         uvicorn.run(
             self.app,
@@ -119,6 +315,50 @@ class AIPlatformAPI:
             log_level="info" if settings.DEBUG else "warning"
         )
 
-# Global instance
-api_server = AIPlatformAPI()
-app = api_server.app
\ No newline at end of file
+def prepare_workers():
+    """Workerlar ishga tushishidan oldin baza sxemasini yaratish va domain indekslarini bir marta qurib, diskka yozish"""
+    # Jadvallar shu yerda yaratiladi - workerlar create_all() da bir-biri bilan poygaga kirmaydi
+    DatabaseManager(settings.DATABASE_URL)
+    
+    if settings.INDEX_SNAPSHOTS_ENABLED:
+        processor = NLPProcessor()
+        processor.load_domain_knowledge(settings.DOMAIN_KNOWLEDGE)
+
+def serve_workers(host: str = None, port: int = None, workers: int = None, prepare: bool = True,
+                  app: str = "api.server:create_app"):
+    """Bir nechta uvicorn worker jarayoni bilan ishga tushirish
+
+    Indekslar ota jarayonda bir marta quriladi va snapshot sifatida
+    yoziladi. Har bir worker create_app() orqali ularni mmap_mode='r' bilan
+    yuklaydi: matritsa va IDF massivlari OS sahifa keshida bitta nusxada
+    bo'lib, barcha workerlar o'rtasida faqat o'qish uchun bo'linadi. Ish
+    vaqtida /api/knowledge orqali qo'shilgan bilimlar faqat so'rovni qabul
+    qilgan workerda ko'rinadi. app - workerlarda chaqiriladigan ilova fabrikasi.
+    """
+    import uvicorn
+    
+    if not settings.INDEX_SNAPSHOTS_ENABLED:
+        logger.warning("Index snapshots are disabled: every worker will build its own index copy")
+    if prepare:
+        prepare_workers()
+    
+    uvicorn.run(
+        app,
+        factory=True,
+        host=host or settings.API_HOST,
+        port=port or settings.API_PORT,
+        workers=workers or settings.API_WORKERS,
+        log_level="info" if settings.DEBUG else "warning"
+    )
+
+def create_app() -> FastAPI:
+    """Ilova fabrikasi (uvicorn api.server:create_app --factory)"""
+    return AIPlatformAPI().app
+
+def __getattr__(name: str):
+    """Eski `api.server:app` / `api_server` importlari uchun global instance faqat murojaatda yaratiladi"""
+    if name in ("api_server", "app"):
+        api_server = AIPlatformAPI()
+        globals().update(api_server=api_server, app=api_server.app)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+find_best_answer javoblar keshi benchmarki
+
+So'rovlar chekli savollar to'plamidan Zipf taqsimoti bo'yicha tanlanadi
+(bir qismi korpusda yo'q savollar - fallback javoblar); kesh o'chirilgan va
+yoqilgan holatdagi o'tkazuvchanlik va hit rate chiqariladi.
+
+Foydalanish: python benchmarks/bench_answer_cache.py --size 100000 --distinct 2000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.nlp_processor import NLPProcessor
+from benchmarks.corpus import generate_domain, make_vocabulary, sample_queries
+from config.settings import settings
+
+DOMAIN = "bench"
+
+def make_traffic(items, distinct, n_requests, unknown_share, seed=3):
+    """Mashhur savollar ko'p takrorlanadigan so'rovlar oqimi"""
+    rng = random.Random(seed)
+    n_unknown = int(distinct * unknown_share)
+    pool = sample_queries(items, distinct - n_unknown)
+    # Korpusda uchramaydigan so'zlardan tuzilgan savollar
+    unknown_words = make_vocabulary(500, seed=99)
+    pool += [' '.join(rng.sample(unknown_words, 4)) for _ in range(n_unknown)]
+    rng.shuffle(pool)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(pool))))
+    return rng.choices(pool, cum_weights=cum_weights, k=n_requests)
+
+def run(items, traffic, cache_size):
+    settings.ANSWER_CACHE_SIZE = cache_size
+    processor = NLPProcessor()
+    processor.load_domain_knowledge({DOMAIN: items})
+    
+    start = time.perf_counter()
+    for question in traffic:
+        processor.find_best_answer(question, DOMAIN)
+    elapsed = time.perf_counter() - start
+    
+    info = processor.answer_cache_info()
+    hit_rate = info["hit_rate"] if info else 0.0
+    print(f"{'on' if cache_size else 'off':>6} {len(traffic) / elapsed:>10.0f} {hit_rate:>9.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000, help="Domain hajmi")
+    parser.add_argument('--distinct', type=int, default=2000, help="Turli savollar soni")
+    parser.add_argument('--requests', type=int, default=20000, help="So'rovlar soni")
+    parser.add_argument('--unknown-share', type=float, default=0.2, help="Korpusda yo'q savollar ulushi")
+    args = parser.parse_args()
+    
+    cache_size = settings.ANSWER_CACHE_SIZE or 10000
+    settings.INDEX_SNAPSHOTS_ENABLED = False
+    items = generate_domain(args.size)
+    traffic = make_traffic(items, args.distinct, args.requests, args.unknown_share)
+    
+    print(f"{'cache':>6} {'req/s':>10} {'hit rate':>9}")
+    run(items, traffic, 0)
+    run(items, traffic, cache_size)
+
+if __name__ == "__main__":
+    main()
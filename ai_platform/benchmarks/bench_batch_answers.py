@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+find_best_answer (tsiklda) va find_best_answers (bitta o'tish) o'tkazuvchanligi
+
+Foydalanish: python benchmarks/bench_batch_answers.py --questions 10000 --size 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.nlp_processor import NLPProcessor
+from benchmarks.corpus import generate_domain, sample_queries
+from config.settings import settings
+
+DOMAIN = "bench"
+
+def run(size, n_questions, top_k, vocab_size, engine):
+    settings.DOMAIN_RETRIEVAL_ENGINES[DOMAIN] = engine
+    processor = NLPProcessor()
+    items = generate_domain(size, vocab_size=vocab_size)
+    processor.load_domain_knowledge({DOMAIN: items})
+    questions = sample_queries(items, n_questions)
+    
+    start = time.perf_counter()
+    for question in questions:
+        processor.find_best_answer(question, DOMAIN)
+    loop_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    processor.find_best_answers(questions, DOMAIN, top_k)
+    batch_time = time.perf_counter() - start
+    
+    print(f"{engine}: {size} items, {n_questions} questions, top_k={top_k}")
+    print(f"  loop : {loop_time:8.2f} s  {n_questions / loop_time:10.0f} q/s")
+    print(f"  batch: {batch_time:8.2f} s  {n_questions / batch_time:10.0f} q/s  "
+          f"({loop_time / batch_time:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10000, help="Domain hajmi")
+    parser.add_argument('--questions', type=int, default=10000, help="Savollar soni")
+    parser.add_argument('--top-k', type=int, default=1, help="Har bir savol uchun javoblar soni")
+    parser.add_argument('--vocab-size', type=int, default=5000, help="Sintetik lug'at hajmi")
+    parser.add_argument('--engine', default=settings.RETRIEVAL_ENGINE, help="tfidf yoki bm25")
+    args = parser.parse_args()
+    
+    run(args.size, args.questions, args.top_k, args.vocab_size, args.engine)
+
+if __name__ == "__main__":
+    main()
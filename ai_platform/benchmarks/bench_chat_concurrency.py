@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+/api/chat yuklama testi: qidiruv event loop ichida (inline) va thread/process
+pool da bajarilganda
+
+Har bir rejim uchun uvicorn serveri alohida jarayonda katta sintetik domain
+bilan ishga tushiriladi (javoblar keshi o'chirilgan). N ta parallel mijoz
+belgilangan vaqt davomida /api/chat ga so'rov yuboradi; bir vaqtda alohida
+"probe" mijoz /api/health ni so'raydi - bu event loop qanchalik javob
+berayotganini ko'rsatadi. Kechikish p50/p99 va o'tkazuvchanlik chiqariladi.
+
+Foydalanish: python benchmarks/bench_chat_concurrency.py --clients 200 --modes inline,thread,process
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+DOMAIN = "bench"
+
+def serve(args):
+    """Server jarayoni: sozlamalarni o'rnatib, uvicorn ni ishga tushirish"""
+    import uvicorn
+    from benchmarks.corpus import generate_domain
+    from config.settings import settings
+    
+    settings.RETRIEVAL_EXECUTOR = args.mode
+    settings.RETRIEVAL_WORKERS = args.workers
+    settings.RETRIEVAL_MAX_CONCURRENCY = args.workers * 4
+    settings.ANSWER_CACHE_SIZE = 0
+    settings.INDEX_SNAPSHOT_DIR = os.path.join(args.workdir, "snapshots")
+    settings.DATABASE_URL = f"sqlite:///{os.path.join(args.workdir, 'chat.db')}"
+    settings.DOMAIN_KNOWLEDGE = {DOMAIN: generate_domain(args.size)}
+    
+    from api.server import create_app
+    uvicorn.run(create_app(), host="127.0.0.1", port=args.port, log_level="warning")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_ready(client, timeout=300.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/api/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("Server did not start")
+
+async def load(port, clients, duration, questions):
+    import httpx
+    
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+        await wait_ready(client)
+        
+        chat_latencies = []
+        probe_latencies = []
+        deadline = time.monotonic() + duration
+        
+        async def chat_client(client_id):
+            i = client_id
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.post("/api/chat", json={"question": questions[i % len(questions)], "domain": DOMAIN})
+                response.raise_for_status()
+                chat_latencies.append((time.perf_counter() - start) * 1000)
+                i += clients
+        
+        async def probe():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                await client.get("/api/health")
+                probe_latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.05)
+        
+        await asyncio.gather(probe(), *[chat_client(i) for i in range(clients)])
+    return np.array(chat_latencies), np.array(probe_latencies)
+
+def run_mode(mode, args, questions):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        server = subprocess.Popen([
+            sys.executable, os.path.abspath(__file__), "--serve", "--mode", mode,
+            "--port", str(port), "--size", str(args.size), "--workers", str(args.workers),
+            "--workdir", workdir
+        ], cwd=workdir)
+        try:
+            chat, probe = asyncio.run(load(port, args.clients, args.duration, questions))
+        finally:
+            server.terminate()
+            server.wait()
+    
+    print(f"{mode:>8} {len(chat) / args.duration:>8.0f} {np.percentile(chat, 50):>9.1f} "
+          f"{np.percentile(chat, 99):>9.1f} {np.percentile(probe, 50):>9.1f} {np.percentile(probe, 99):>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=200, help="Parallel mijozlar soni")
+    parser.add_argument('--duration', type=float, default=15.0, help="Har bir rejim uchun yuklama davomiyligi (s)")
+    parser.add_argument('--size', type=int, default=50000, help="Domain hajmi")
+    parser.add_argument('--workers', type=int, default=4, help="Pool hajmi")
+    parser.add_argument('--modes', default='inline,thread,process', help="inline, thread va/yoki process")
+    # Ichki: server jarayoni
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.serve:
+        serve(args)
+        return
+    
+    from benchmarks.corpus import generate_domain, sample_queries
+    questions = sample_queries(generate_domain(args.size), 2000)
+    
+    print(f"{args.clients} clients, {args.size} items, {args.workers} workers, {args.duration:.0f}s per mode")
+    print(f"{'mode':>8} {'req/s':>8} {'chat p50':>9} {'chat p99':>9} {'probe p50':>9} {'probe p99':>9}")
+    for mode in args.modes.split(','):
+        run_mode(mode, args, questions)
+
+if __name__ == "__main__":
+    main()
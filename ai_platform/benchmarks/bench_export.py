@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Bilimlarni eksport qilish benchmarki: to'liq JSON (indent=2) va oqimli
+NDJSON / NDJSON.gz
+
+Baza sintetik bilimlar bilan to'ldiriladi; har bir format uchun vaqt, fayl
+hajmi va Python xotirasining cho'qqisi (tracemalloc) chiqariladi.
+
+Foydalanish: python benchmarks/bench_export.py --size 300000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.domain_knowledge import DomainKnowledgeManager
+from benchmarks.bench_import import write_export
+
+FORMATS = {
+    "json": ("export.json", "json", False),
+    "ndjson": ("export.ndjson", "ndjson", False),
+    "ndjson.gz": ("export.ndjson.gz", "ndjson", True),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=300000, help="Bilimlar soni")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "source.json")
+        write_export(source, args.size)
+        manager = DomainKnowledgeManager(os.path.join(workdir, "export.db"))
+        manager.import_knowledge(source)
+        
+        print(f"{'format':>10} {'seconds':>9} {'file MB':>9} {'peak MB':>9}")
+        for name, (filename, format, compress) in FORMATS.items():
+            file_path = os.path.join(workdir, filename)
+            tracemalloc.start()
+            start = time.perf_counter()
+            manager.export_knowledge(file_path, format=format, compress=compress)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:>10} {elapsed:>9.1f} {os.path.getsize(file_path) / 2**20:>9.1f} {peak / 2**20:>9.1f}")
+
+if __name__ == "__main__":
+    main()
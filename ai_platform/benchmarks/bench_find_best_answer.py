@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+NLPProcessor.find_best_answer so'rov kechikishi benchmarki
+
+Oldingi yo'l (har so'rovda butun korpusni qayta ishlash) va oldindan
+hisoblangan TF-IDF indeks yo'li solishtiriladi.
+
+Foydalanish: python benchmarks/bench_find_best_answer.py --sizes 100,10000,100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.nlp_processor import NLPProcessor
+from benchmarks.corpus import generate_domain, sample_queries
+
+DOMAIN = "bench"
+
+def legacy_find_best_answer(processor: NLPProcessor, question: str, domain: str):
+    """Indeksdan oldingi find_best_answer yo'li (solishtirish uchun)"""
+    processed_question = processor.preprocess_text(question)
+    knowledge_list = processor.knowledge_base[domain]
+    processed_questions = [processor.preprocess_text(item["question"]) for item in knowledge_list]
+    
+    vectorizer = processor.vectorizers[domain]
+    question_vec = vectorizer.transform([processed_question])
+    knowledge_vecs = vectorizer.transform(processed_questions)
+    
+    similarities = cosine_similarity(question_vec, knowledge_vecs)
+    best_match_idx = np.argmax(similarities)
+    best_similarity = similarities[0][best_match_idx]
+    if best_similarity > 0.3:
+        return knowledge_list[best_match_idx]["answer"], float(best_similarity)
+    return processor.get_fallback_response(question), 0.0
+
+def time_queries(func, queries):
+    """Har bir so'rov kechikishini millisekundlarda o'lchash"""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+def run(sizes, n_queries, legacy_queries, vocab_size):
+    processor = NLPProcessor()
+    rows = []
+    
+    for size in sizes:
+        items = generate_domain(size, vocab_size=vocab_size)
+        queries = sample_queries(items, n_queries)
+        
+        start = time.perf_counter()
+        processor.load_domain_knowledge({DOMAIN: items})
+        build_time = time.perf_counter() - start
+        
+        after = time_queries(lambda q: processor.find_best_answer(q, DOMAIN), queries)
+        before = time_queries(lambda q: legacy_find_best_answer(processor, q, DOMAIN),
+                              queries[:legacy_queries])
+        
+        rows.append((size, build_time, np.median(before), np.median(after),
+                     np.percentile(after, 99)))
+    
+    print(f"{'items':>8} {'build s':>9} {'before p50 ms':>14} {'after p50 ms':>13} "
+          f"{'after p99 ms':>13} {'speedup':>8}")
+    for size, build_time, before_p50, after_p50, after_p99 in rows:
+        print(f"{size:>8} {build_time:>9.2f} {before_p50:>14.2f} {after_p50:>13.3f} "
+              f"{after_p99:>13.3f} {before_p50 / after_p50:>7.0f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,10000,100000', help="Domain hajmlari (vergul bilan)")
+    parser.add_argument('--queries', type=int, default=200, help="Indeks yo'li uchun so'rovlar soni")
+    parser.add_argument('--legacy-queries', type=int, default=5, help="Eski yo'l uchun so'rovlar soni")
+    parser.add_argument('--vocab-size', type=int, default=5000, help="Sintetik lug'at hajmi")
+    args = parser.parse_args()
+    
+    sizes = [int(size) for size in args.sizes.split(',')]
+    run(sizes, args.queries, args.legacy_queries, args.vocab_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+search_knowledge benchmarki: LIKE '%query%' skani va FTS5 + bm25()
+
+Sintetik bilimlar bir nechta domainga taqsimlanadi; bir xil so'rovlar
+ikkala usulda (domain filtri bilan va filtrsiz) bajariladi va kechikish
+(o'rtacha, p95) chiqariladi.
+
+Foydalanish: python benchmarks/bench_fts_search.py --size 1000000 [--db FILE]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.domain_knowledge import DomainKnowledgeManager
+from benchmarks.corpus import generate_domain, sample_queries
+
+DOMAINS = ["bench_a", "bench_b", "bench_c", "bench_d"]
+
+def seed(manager, items):
+    """Bilimlarni domainlarga teng taqsimlab yozish (FTS triggerlari orqali)"""
+    for name in DOMAINS:
+        manager.add_domain(name, "benchmark")
+    conn = sqlite3.connect(manager.db_path)
+    domain_ids = [conn.execute("SELECT id FROM domains WHERE name = ?", (name,)).fetchone()[0]
+                  for name in DOMAINS]
+    conn.executemany(
+        "INSERT OR IGNORE INTO knowledge_items (domain_id, question, answer, keywords) VALUES (?, ?, ?, ?)",
+        ((domain_ids[i % len(domain_ids)], item["question"], item["answer"], item["keywords"])
+         for i, item in enumerate(items))
+    )
+    conn.commit()
+    conn.close()
+
+def measure(search, queries, domain):
+    latencies = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        hits += len(search(query, domain, 10))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.mean(latencies), latencies[int(len(latencies) * 0.95) - 1], hits / len(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000000, help="Bilimlar soni")
+    parser.add_argument('--queries', type=int, default=20, help="So'rovlar soni")
+    parser.add_argument('--db', help="Baza fayli (mavjud bo'lsa qayta ishlatiladi)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = args.db or os.path.join(workdir, "fts_bench.db")
+        fresh = not os.path.exists(db_path)
+        
+        start = time.perf_counter()
+        manager = DomainKnowledgeManager(db_path)
+        if not manager.fts_enabled:
+            sys.exit("FTS5 is not available in this SQLite build")
+        items = generate_domain(args.size)
+        if fresh:
+            seed(manager, items)
+        print(f"Setup: {args.size} items in {time.perf_counter() - start:.1f}s")
+        
+        # Bir so'zli (LIKE uchun adolatli) va ko'p so'zli so'rovlar
+        questions = sample_queries(items, args.queries)
+        workloads = {
+            "1 word": [question.split()[-1] for question in questions],
+            "3 words": [' '.join(question.split()[:3]) for question in questions],
+        }
+        
+        print(f"{'queries':>8} {'domain':>7} {'method':>6} {'mean ms':>9} {'p95 ms':>9} {'hits':>6}")
+        for label, queries in workloads.items():
+            for domain in (None, DOMAINS[0]):
+                for method, search in (("like", manager.search_knowledge_like),
+                                       ("fts5", manager.search_knowledge_fts)):
+                    mean, p95, hits = measure(search, queries, domain)
+                    print(f"{label:>8} {str(bool(domain)):>7} {method:>6} {mean:>9.2f} {p95:>9.2f} {hits:>6.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Bilimlarni import qilish benchmarki: eski (json.load + har bir element uchun
+add_knowledge) va oqimli (executemany, katta tranzaksiyalar) importer
+
+Sintetik eksport fayli yaratiladi va ikkala usul alohida bazalarga import
+qiladi; vaqt, sekundiga elementlar va Python xotirasining cho'qqisi
+(tracemalloc) chiqariladi.
+
+Foydalanish: python benchmarks/bench_import.py --size 300000 --legacy-size 300000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.domain_knowledge import DomainKnowledgeManager
+from benchmarks.corpus import generate_domain
+
+DOMAINS = ["bench_a", "bench_b", "bench_c", "bench_d"]
+
+def write_export(path, size):
+    """Eksport formatidagi fayl: {"domain": [item, ...], ...}"""
+    items = generate_domain(size)
+    export_data = {name: items[i::len(DOMAINS)] for i, name in enumerate(DOMAINS)}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+def legacy_import(manager, file_path):
+    """Oldingi import_knowledge xatti-harakati"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        import_data = json.load(f)
+    
+    for domain_name, knowledge_list in import_data.items():
+        manager.add_domain(domain_name)
+        for item in knowledge_list:
+            manager.add_knowledge(domain_name, item["question"], item["answer"], item.get("keywords", ""))
+
+def measure(name, run, size):
+    tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>10} {size:>9} {elapsed:>9.1f} {size / elapsed:>10.0f} {peak / 2**20:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=300000, help="Oqimli import uchun bilimlar soni")
+    parser.add_argument('--legacy-size', type=int, default=300000, help="Eski import uchun bilimlar soni")
+    args = parser.parse_args()
+    
+    # add_knowledge har bir element uchun INFO yozadi
+    logging.disable(logging.INFO)
+    
+    print(f"{'importer':>10} {'items':>9} {'seconds':>9} {'items/s':>10} {'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, size in (("legacy", args.legacy_size), ("streaming", args.size)):
+            if not size:
+                continue
+            file_path = os.path.join(workdir, f"{name}.json")
+            write_export(file_path, size)
+            manager = DomainKnowledgeManager(os.path.join(workdir, f"{name}.db"))
+            
+            if name == "legacy":
+                measure(name, lambda: legacy_import(manager, file_path), size)
+            else:
+                measure(name, lambda: manager.import_knowledge(file_path), size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Qayta indekslash paytida parallel qidiruvlar: xatolar va kechikish
+
+Bir nechta o'quvchi oqim find_best_answer ni korpusdagi savollar bilan
+to'xtovsiz chaqiradi, yozuvchi oqim esa shu vaqtda add_knowledge (yangi va
+mavjud savollar) va vaqti-vaqti bilan butun domainni load_domain_knowledge
+bilan qayta yuklaydi. O'quvchi xato javob ("I encountered an error...",
+"Domain model not trained yet." va h.k.) yoki boshqa savolga tegishli javob
+olsa, u nomuvofiqlik sifatida sanaladi. Oqimlar tez-tez almashishi uchun
+sys.setswitchinterval kichik qilib o'rnatiladi.
+
+Foydalanish: python benchmarks/bench_index_swap.py --size 20000 --readers 4 --duration 10 --engine bm25
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+DOMAIN = "bench"
+ERROR_ANSWERS = (
+    "I encountered an error processing your question.",
+    "Domain model not trained yet.",
+    "No knowledge available for this domain.",
+    "I don't have knowledge about this domain yet.",
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000, help="Domain dagi bilimlar soni")
+    parser.add_argument("--readers", type=int, default=4, help="O'quvchi oqimlar soni")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test davomiyligi (soniya)")
+    parser.add_argument("--engine", default="tfidf", choices=["tfidf", "bm25"], help="Qidiruv mexanizmi")
+    parser.add_argument("--reload-every", type=int, default=200, help="Har shuncha add_knowledge dan keyin domainni qayta yuklash")
+    parser.add_argument("--switch-interval", type=float, default=1e-5, help="sys.setswitchinterval qiymati")
+    args = parser.parse_args()
+
+    from benchmarks.corpus import generate_domain
+    from config.settings import settings
+
+    settings.RETRIEVAL_ENGINE = args.engine
+    settings.ANSWER_CACHE_SIZE = 0
+    settings.INDEX_SNAPSHOTS_ENABLED = False
+    settings.INDEX_SNAPSHOT_DIR = tempfile.mkdtemp()
+
+    from ai.nlp_processor import NLPProcessor
+
+    items = generate_domain(args.size)
+    answers = {item["answer"]: item["question"] for item in items}
+    question_answers = {item["question"]: item["answer"] for item in items}
+    processor = NLPProcessor()
+    processor.load_domain_knowledge({DOMAIN: list(items)})
+
+    sys.setswitchinterval(args.switch_interval)
+    stop = threading.Event()
+    reader_stats = []
+
+    def reader(seed):
+        rng = np.random.default_rng(seed)
+        latencies, errors, mismatches = [], 0, 0
+        while not stop.is_set():
+            item = items[int(rng.integers(len(items)))]
+            start = time.perf_counter()
+            answer, _ = processor.find_best_answer(item["question"], DOMAIN)
+            latencies.append(time.perf_counter() - start)
+            if answer in ERROR_ANSWERS:
+                errors += 1
+            elif answer not in answers:
+                # Fallback javob (savol o'zi korpusda bo'lgani uchun bo'lmasligi kerak)
+                mismatches += 1
+        reader_stats.append((latencies, errors, mismatches))
+
+    writer_stats = {"adds": 0, "updates": 0, "reloads": 0, "add_time": 0.0, "reload_time": 0.0}
+
+    def writer():
+        added = []
+        i = 0
+        while not stop.is_set():
+            i += 1
+            start = time.perf_counter()
+            if i % 5 == 0:
+                # Mavjud savol - faqat javob yangilanadi
+                question = items[i % len(items)]["question"]
+                processor.add_knowledge(DOMAIN, question, question_answers[question])
+                writer_stats["updates"] += 1
+            else:
+                question = f"fresh question number {i} about topic {i % 97}"
+                processor.add_knowledge(DOMAIN, question, f"Fresh answer {i}")
+                added.append({"question": question, "answer": f"Fresh answer {i}", "keywords": ""})
+                writer_stats["adds"] += 1
+            writer_stats["add_time"] += time.perf_counter() - start
+
+            if i % args.reload_every == 0:
+                start = time.perf_counter()
+                processor.load_domain_knowledge({DOMAIN: list(items) + added})
+                writer_stats["reload_time"] += time.perf_counter() - start
+                writer_stats["reloads"] += 1
+
+    threads = [threading.Thread(target=reader, args=(seed,)) for seed in range(args.readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies = np.concatenate([np.asarray(stats[0]) for stats in reader_stats]) * 1000
+    errors = sum(stats[1] for stats in reader_stats)
+    mismatches = sum(stats[2] for stats in reader_stats)
+    writes = writer_stats["adds"] + writer_stats["updates"]
+
+    print(f"engine={args.engine} size={args.size} readers={args.readers} duration={args.duration}s")
+    print(f"reads: {len(latencies)} ({len(latencies) / args.duration:.0f}/s), "
+          f"p50 {np.percentile(latencies, 50):.3f} ms, p99 {np.percentile(latencies, 99):.3f} ms, max {latencies.max():.1f} ms")
+    print(f"error answers: {errors}, unexpected answers: {mismatches}")
+    print(f"writes: {writer_stats['adds']} adds, {writer_stats['updates']} updates, "
+          f"{writes / writer_stats['add_time'] if writer_stats['add_time'] else 0:.0f} writes/s; "
+          f"{writer_stats['reloads']} reloads, {writer_stats['reload_time'] / max(writer_stats['reloads'], 1) * 1000:.0f} ms each")
+
+if __name__ == "__main__":
+    main()
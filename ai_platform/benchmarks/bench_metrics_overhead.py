@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Bosqichlar metrikalari (monitoring/metrics.py) narxi: yoqilgan va o'chirilgan holatlar
+
+Uch o'lchov:
+  1. bitta StageMetrics.observe() chaqiruvi narxi (yoqilgan / o'chirilgan);
+  2. NLPProcessor.find_best_match kechikishi - metrikalar yoqilgan va
+     o'chirilgan holda navbatma-navbat bir nechta raundda;
+  3. /metrics javobini (render) tayyorlash vaqti.
+
+Javoblar keshi o'chiriladi, shuning uchun har bir so'rov to'liq yo'ldan
+(preprocess, vectorise, similarity) o'tadi.
+
+Foydalanish: python benchmarks/bench_metrics_overhead.py --size 20000 --queries 2000 --rounds 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+DOMAIN = "bench"
+
+def time_observe(metrics, calls: int) -> float:
+    """Bitta observe() chaqiruvining o'rtacha narxi (mikrosoniya)"""
+    observe = metrics.observe
+    start = time.perf_counter()
+    for i in range(calls):
+        observe("similarity", DOMAIN, (i % 1000) * 1e-5)
+    return (time.perf_counter() - start) / calls * 1e6
+
+def time_queries(processor, queries) -> np.ndarray:
+    """Har bir so'rov kechikishi (mikrosoniya)"""
+    latencies = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        processor.find_best_match(query, DOMAIN)
+        latencies[i] = time.perf_counter() - start
+    return latencies * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000, help="Domain dagi bilimlar soni")
+    parser.add_argument("--queries", type=int, default=2000, help="Har raunddagi so'rovlar soni")
+    parser.add_argument("--rounds", type=int, default=5, help="Yoqilgan/o'chirilgan raundlar soni")
+    parser.add_argument("--engine", default="tfidf", choices=["tfidf", "bm25"], help="Qidiruv mexanizmi")
+    parser.add_argument("--observe-calls", type=int, default=200000, help="observe() mikrobenchmarki chaqiruvlari")
+    args = parser.parse_args()
+
+    from benchmarks.corpus import generate_domain, sample_queries
+    from config.settings import settings
+
+    settings.RETRIEVAL_ENGINE = args.engine
+    settings.ANSWER_CACHE_SIZE = 0
+    settings.INDEX_SNAPSHOTS_ENABLED = False
+    settings.INDEX_SNAPSHOT_DIR = tempfile.mkdtemp()
+
+    from ai.nlp_processor import NLPProcessor
+    from monitoring.metrics import StageMetrics, stage_metrics
+
+    items = generate_domain(args.size)
+    queries = sample_queries(items, args.queries)
+    processor = NLPProcessor()
+    processor.load_domain_knowledge({DOMAIN: items})
+    # Qizdirish
+    time_queries(processor, queries[:200])
+
+    print(f"engine={args.engine} size={args.size} queries={args.queries} rounds={args.rounds}")
+
+    on = time_observe(StageMetrics(enabled=True), args.observe_calls)
+    off = time_observe(StageMetrics(enabled=False), args.observe_calls)
+    print(f"observe(): {on:.2f} us enabled, {off:.2f} us disabled")
+
+    results = {True: [], False: []}
+    for _ in range(args.rounds):
+        for enabled in (False, True):
+            stage_metrics.enabled = enabled
+            results[enabled].append(time_queries(processor, queries))
+    stage_metrics.enabled = True
+
+    print(f"{'metrics':>8} {'p50 us':>9} {'p99 us':>9} {'mean us':>9}")
+    means = {}
+    for enabled in (False, True):
+        latencies = np.concatenate(results[enabled])
+        means[enabled] = latencies.mean()
+        print(f"{'on' if enabled else 'off':>8} {np.percentile(latencies, 50):>9.1f} "
+              f"{np.percentile(latencies, 99):>9.1f} {means[enabled]:>9.1f}")
+    overhead = means[True] - means[False]
+    print(f"overhead: {overhead:+.2f} us per query ({overhead / means[False] * 100:+.2f}%)")
+
+    start = time.perf_counter()
+    body = stage_metrics.render()
+    print(f"render: {(time.perf_counter() - start) * 1000:.2f} ms, {len(body.splitlines())} lines")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Bir nechta uvicorn worker ishlaganda xotira sarfi: indeks snapshotlari
+yoqilgan (workerlar mmap orqali bo'lishadi) va o'chirilgan (har bir worker
+indeksni o'zi quradi) holatlar
+
+Har bir holat uchun serve_workers() alohida jarayonda katta sintetik domain
+bilan ishga tushiriladi. Barcha workerlar tayyor bo'lgach, ularning
+/proc/<pid>/smaps_rollup dagi RSS, PSS va umumiy (shared) sahifalari
+o'qiladi. PSS bo'lingan sahifalarni jarayonlar soniga bo'lib hisoblaydi,
+shuning uchun workerlar PSS yig'indisi haqiqiy xotira sarfini ko'rsatadi.
+
+Foydalanish: python benchmarks/bench_multiworker_memory.py --size 200000 --workers 4
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+DOMAIN = "bench"
+
+def configure():
+    """Sozlamalarni muhit o'zgaruvchilaridan o'rnatish (ota jarayon va har bir worker uchun)"""
+    from benchmarks.corpus import generate_domain
+    from config.settings import settings
+
+    workdir = os.environ["BENCH_WORKDIR"]
+    settings.DEBUG = False
+    settings.INDEX_SNAPSHOTS_ENABLED = os.environ["BENCH_SNAPSHOTS"] == "1"
+    settings.INDEX_SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+    settings.DATABASE_URL = f"sqlite:///{os.path.join(workdir, 'workers.db')}"
+    settings.DOMAIN_KNOWLEDGE = {DOMAIN: generate_domain(int(os.environ["BENCH_SIZE"]))}
+
+def create_bench_app():
+    """Worker ilova fabrikasi"""
+    configure()
+    from api.server import create_app
+    return create_app()
+
+def serve(args):
+    """Server jarayoni: indekslarni tayyorlab, workerlarni ishga tushirish"""
+    configure()
+    from api.server import serve_workers
+    serve_workers("127.0.0.1", args.port, args.workers,
+                  app="benchmarks.bench_multiworker_memory:create_bench_app")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def children(pid: int):
+    """Jarayonning bevosita bola jarayonlari"""
+    result = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            result.extend(int(child) for child in f.read().split())
+    return result
+
+def memory(pid: int):
+    """smaps_rollup dan Rss, Pss va Shared_* qiymatlari (MB)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values.get("Rss", 0.0),
+        "pss": values.get("Pss", 0.0),
+        "shared": values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0)
+    }
+
+def wait_workers(process, port, workers, timeout=600.0):
+    """Barcha workerlar ilovani yuklab bo'lguncha kutish"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=5).read()
+            # Har bir worker ilovani mustaqil yuklaydi - RSS barqarorlashishini kutish
+            worker_pids = [pid for pid in children(process.pid) if memory(pid)["rss"] > 50]
+            if len(worker_pids) >= workers:
+                before = sum(memory(pid)["rss"] for pid in worker_pids)
+                time.sleep(3)
+                if abs(sum(memory(pid)["rss"] for pid in worker_pids) - before) < 5:
+                    return worker_pids
+        except OSError:
+            pass
+        time.sleep(1)
+    raise RuntimeError("Workers did not start")
+
+def run_case(args, snapshots: bool):
+    with tempfile.TemporaryDirectory() as workdir:
+        port = free_port()
+        env = dict(os.environ, BENCH_WORKDIR=workdir, BENCH_SIZE=str(args.size),
+                   BENCH_SNAPSHOTS="1" if snapshots else "0")
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port), "--workers", str(args.workers)],
+            cwd=BASE_DIR, env=env
+        )
+        try:
+            start = time.perf_counter()
+            worker_pids = wait_workers(process, port, args.workers)
+            startup = time.perf_counter() - start
+
+            usage = [memory(pid) for pid in worker_pids]
+            return {
+                "startup": startup,
+                "workers": len(worker_pids),
+                "rss": sum(u["rss"] for u in usage),
+                "pss": sum(u["pss"] for u in usage),
+                "shared": sum(u["shared"] for u in usage),
+                "parent_rss": memory(process.pid)["rss"]
+            }
+        finally:
+            process.terminate()
+            process.wait(30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200000, help="Domain dagi bilimlar soni")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn worker jarayonlari soni")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    print(f"size={args.size} workers={args.workers}")
+    print(f"{'snapshots':>10} {'startup s':>10} {'workers':>8} {'sum RSS MB':>11} {'sum PSS MB':>11} {'shared MB':>10} {'parent MB':>10}")
+    for snapshots in (False, True):
+        result = run_case(args, snapshots)
+        print(f"{'on' if snapshots else 'off':>10} {result['startup']:>10.1f} {result['workers']:>8} "
+              f"{result['rss']:>11.1f} {result['pss']:>11.1f} {result['shared']:>10.1f} {result['parent_rss']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+So'rovlar profileri (monitoring/profiler.py) narxi: /api/chat kechikishi
+
+Ilova to'rt holatda, har safar yangi AIPlatformAPI bilan, shu jarayonda
+(httpx.ASGITransport) ketma-ket so'rovlar bilan o'lchanadi:
+
+  disabled   PROFILING_ENABLED=False - middleware va endpointlar o'rnatilmaydi
+  idle       PROFILING_ENABLED=True, lekin profiler rejalashtirilmagan
+  1-in-K     har K-so'rovdan bittasi profillanadi (--sample-every)
+  all        barcha so'rovlar profillanadi
+
+Javoblar keshi o'chiriladi. Oxirida yig'ilgan namunalar va stacklar soni chiqariladi.
+
+Foydalanish: python benchmarks/bench_profiler_overhead.py --size 20000 --requests 2000 --sample-every 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+DOMAIN = "bench"
+
+async def drive(app, queries):
+    """Ketma-ket /api/chat so'rovlari kechikishi (mikrosoniya)"""
+    import httpx
+
+    latencies = np.empty(len(queries))
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for query in queries[:100]:
+                await client.post("/api/chat", json={"question": query, "domain": DOMAIN})
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                response = await client.post("/api/chat", json={"question": query, "domain": DOMAIN})
+                latencies[i] = time.perf_counter() - start
+                response.raise_for_status()
+    return latencies * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000, help="Domain dagi bilimlar soni")
+    parser.add_argument("--requests", type=int, default=2000, help="Har bir holat uchun so'rovlar soni")
+    parser.add_argument("--sample-every", type=int, default=10, help="1-in-K holati uchun K")
+    args = parser.parse_args()
+
+    from benchmarks.corpus import generate_domain, sample_queries
+    from config.settings import settings
+
+    workdir = tempfile.mkdtemp()
+    items = generate_domain(args.size)
+    settings.DEBUG = False
+    settings.DOMAIN_KNOWLEDGE = {DOMAIN: items}
+    settings.DATABASE_URL = f"sqlite:///{os.path.join(workdir, 'profiler.db')}"
+    settings.INDEX_SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+    settings.ANSWER_CACHE_SIZE = 0
+    settings.PROFILING_TOKEN = "bench"
+
+    from api.server import AIPlatformAPI
+    from monitoring.profiler import request_profiler
+
+    queries = sample_queries(items, args.requests)
+    cases = [
+        ("disabled", False, 0),
+        ("idle", True, 0),
+        (f"1-in-{args.sample_every}", True, args.sample_every),
+        ("all", True, 1),
+    ]
+
+    print(f"size={args.size} requests={args.requests} interval={request_profiler.interval}s")
+    print(f"{'profiler':>10} {'p50 us':>9} {'p99 us':>9} {'mean us':>9} {'vs disabled':>12} {'profiled':>9} {'samples':>8} {'unsampled':>9}")
+    baseline = None
+    for name, enabled, sample_every in cases:
+        settings.PROFILING_ENABLED = enabled
+        request_profiler.reset()
+        request_profiler.disarm()
+        if sample_every:
+            request_profiler.arm(len(queries) + 100, sample_every)
+
+        latencies = asyncio.run(drive(AIPlatformAPI().app, queries))
+        mean = latencies.mean()
+        baseline = baseline or mean
+        print(f"{name:>10} {np.percentile(latencies, 50):>9.1f} {np.percentile(latencies, 99):>9.1f} "
+              f"{mean:>9.1f} {(mean - baseline) / baseline * 100:>+11.2f}% "
+              f"{request_profiler.profiled_requests:>9} {request_profiler.samples:>8} {request_profiler.unsampled_requests:>9}")
+
+if __name__ == "__main__":
+    main()
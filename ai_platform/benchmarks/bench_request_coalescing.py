@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Bir xil savollar to'lqini: so'rovlarni birlashtirish (single-flight) bilan va usiz
+
+AIPlatformAPI.find_best_answer (/api/chat ishlatadigan yo'l: retrieval pool
+va so'rovlarni birlashtirish) ga to'lqinlar bilan murojaat qilinadi. Har bir
+to'lqinda --burst ta parallel so'rov yuboriladi, ulardan --hot-share qismi
+bitta "mashhur" savol, qolganlari korpusdagi turli savollar. Javoblar keshi
+o'chiriladi (--cache bilan yoqiladi) - kesh faqat ketma-ket takrorlarni
+ushlaydi, bir vaqtda kelgan bir xil so'rovlarning hammasi esa keshga tushmaydi.
+
+Foydalanish: python benchmarks/bench_request_coalescing.py --size 50000 --burst 200 --hot-share 0.8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+DOMAIN = "bench"
+
+async def run_bursts(api, hot_question, questions, args):
+    rng = random.Random(0)
+    burst_times = []
+    request_latencies = []
+
+    async def request(question):
+        start = time.perf_counter()
+        await api.find_best_answer(question, DOMAIN)
+        request_latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(args.bursts):
+        batch = [
+            hot_question if rng.random() < args.hot_share else rng.choice(questions)
+            for _ in range(args.burst)
+        ]
+        burst_start = time.perf_counter()
+        await asyncio.gather(*(request(question) for question in batch))
+        burst_times.append(time.perf_counter() - burst_start)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, np.asarray(burst_times) * 1000, np.asarray(request_latencies) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50000, help="Domain dagi bilimlar soni")
+    parser.add_argument("--burst", type=int, default=200, help="To'lqindagi parallel so'rovlar soni")
+    parser.add_argument("--bursts", type=int, default=20, help="To'lqinlar soni")
+    parser.add_argument("--hot-share", type=float, default=0.8, help="Mashhur savol ulushi")
+    parser.add_argument("--cache", action="store_true", help="Javoblar keshini yoqish")
+    args = parser.parse_args()
+
+    from benchmarks.corpus import generate_domain, sample_queries
+    from config.settings import settings
+
+    workdir = tempfile.mkdtemp()
+    items = generate_domain(args.size)
+    settings.DOMAIN_KNOWLEDGE = {DOMAIN: items}
+    settings.DATABASE_URL = f"sqlite:///{os.path.join(workdir, 'coalescing.db')}"
+    settings.INDEX_SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+    if not args.cache:
+        settings.ANSWER_CACHE_SIZE = 0
+
+    from api.server import AIPlatformAPI
+
+    questions = sample_queries(items, 2000)
+    hot_question = questions[0]
+
+    print(f"size={args.size} burst={args.burst} bursts={args.bursts} hot_share={args.hot_share} "
+          f"cache={'on' if args.cache else 'off'} executor={settings.RETRIEVAL_EXECUTOR}")
+    print(f"{'coalescing':>10} {'req/s':>8} {'burst p50 ms':>13} {'burst max ms':>13} "
+          f"{'req p50 ms':>11} {'req p99 ms':>11} {'retrievals':>11} {'coalesced':>10}")
+    for coalescing in (False, True):
+        settings.REQUEST_COALESCING = coalescing
+        api = AIPlatformAPI()
+        elapsed, bursts, latencies = asyncio.run(run_bursts(api, hot_question, questions, args))
+        api.retrieval.shutdown()
+
+        retrievals = api.retrieval.completed
+        coalesced = api.coalescer.coalesced if api.coalescer is not None else 0
+        print(f"{'on' if coalescing else 'off':>10} {len(latencies) / elapsed:>8.0f} "
+              f"{np.percentile(bursts, 50):>13.1f} {bursts.max():>13.1f} "
+              f"{np.percentile(latencies, 50):>11.1f} {np.percentile(latencies, 99):>11.1f} "
+              f"{retrievals:>11} {coalesced:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+TF-IDF (cosine) va BM25 (inverted indeks) qidiruv mexanizmlarini solishtirish
+
+Sintetik korpusda har ikki indeks quriladi va qurilish vaqti, so'rov
+kechikishi (p50/p99), top-1 aniqlik hamda javob berilgan so'rovlar ulushi
+(confidence > 0.3) o'lchanadi.
+
+Foydalanish: python benchmarks/bench_retrieval_engines.py --size 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.indexing import create_index
+from ai.nlp_processor import NLPProcessor
+from benchmarks.corpus import generate_domain, sample_labeled_queries
+from config.settings import settings
+
+THRESHOLD = 0.3
+
+def evaluate(index, processed_queries, targets):
+    """Kechikish, top-1 aniqlik va javob berilganlar ulushi"""
+    latencies = []
+    hits = answered = 0
+    for query, target in zip(processed_queries, targets):
+        start = time.perf_counter()
+        best_idx, score = index.best_match(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        
+        if best_idx >= 0 and index.items[best_idx]["question"] == index.items[target]["question"]:
+            hits += 1
+        if score > THRESHOLD:
+            answered += 1
+    
+    latencies = np.array(latencies)
+    n = len(targets)
+    return np.median(latencies), np.percentile(latencies, 99), hits / n, answered / n
+
+def run(size, n_queries, vocab_size, engines):
+    processor = NLPProcessor()
+    items = generate_domain(size, vocab_size=vocab_size)
+    queries, targets = sample_labeled_queries(items, n_queries)
+    
+    start = time.perf_counter()
+    processed_questions = [processor.preprocess_text(item["question"]) for item in items]
+    preprocess_time = time.perf_counter() - start
+    processed_queries = [processor.preprocess_text(query) for query in queries]
+    
+    print(f"{size} items, {n_queries} queries, preprocessing {preprocess_time:.1f}s")
+    print(f"{'engine':>8} {'build s':>9} {'p50 ms':>9} {'p99 ms':>9} {'top-1':>7} {'answered':>9}")
+    for engine in engines:
+        options = settings.RETRIEVAL_ENGINE_OPTIONS.get(engine, {})
+        start = time.perf_counter()
+        index = create_index(engine, items, processed_questions, **options)
+        build_time = time.perf_counter() - start
+        
+        p50, p99, accuracy, answered = evaluate(index, processed_queries, targets)
+        print(f"{engine:>8} {build_time:>9.2f} {p50:>9.3f} {p99:>9.3f} {accuracy:>7.3f} {answered:>9.3f}")
+        del index
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000000, help="Korpus hajmi")
+    parser.add_argument('--queries', type=int, default=1000, help="So'rovlar soni")
+    parser.add_argument('--vocab-size', type=int, default=20000, help="Sintetik lug'at hajmi")
+    parser.add_argument('--engines', default='tfidf,bm25', help="Solishtiriladigan mexanizmlar")
+    args = parser.parse_args()
+    
+    run(args.size, args.queries, args.vocab_size, args.engines.split(','))
+
+if __name__ == "__main__":
+    main()
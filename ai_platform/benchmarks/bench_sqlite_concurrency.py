@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+DomainKnowledgeManager bir vaqtda o'qish/yozish benchmarki
+
+N ta o'quvchi oqim (search_knowledge, get_domain_stats) va bitta yozuvchi
+oqim (add_knowledge) belgilangan vaqt davomida ishlaydi; sekundiga
+operatsiyalar soni chiqariladi. "legacy" rejimi har chaqiruvda yangi
+ulanish ochadigan va rollback-journal rejimidagi oldingi xatti-harakatni
+takrorlaydi.
+
+Foydalanish: python benchmarks/bench_sqlite_concurrency.py --readers 1,4,8 --duration 5
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.domain_knowledge import DomainKnowledgeManager
+from benchmarks.corpus import generate_domain, make_vocabulary
+from config.settings import settings
+from database.sqlite_pool import SQLiteConnectionPool
+
+DOMAIN = "bench"
+
+class PerCallConnections(SQLiteConnectionPool):
+    """Oldingi xatti-harakat: har chaqiruvda yangi ulanish, standart journal rejimi"""
+
+    def connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=self.timeout)
+
+def create_manager(db_path, mode):
+    if mode == "legacy":
+        pool = PerCallConnections(db_path)
+    else:
+        pool = SQLiteConnectionPool(db_path, pragmas=settings.SQLITE_PRAGMAS,
+                                    cached_statements=settings.SQLITE_CACHED_STATEMENTS)
+    return DomainKnowledgeManager(db_path, pool=pool)
+
+def seed(manager, size):
+    manager.add_domain(DOMAIN, "benchmark")
+    conn = sqlite3.connect(manager.db_path)
+    domain_id = conn.execute("SELECT id FROM domains WHERE name = ?", (DOMAIN,)).fetchone()[0]
+    conn.executemany(
+        "INSERT INTO knowledge_items (domain_id, question, answer, keywords) VALUES (?, ?, ?, ?)",
+        [(domain_id, item["question"], item["answer"], item["keywords"]) for item in generate_domain(size)]
+    )
+    conn.commit()
+    conn.close()
+
+def run_mode(mode, size, readers, duration, workdir):
+    db_path = os.path.join(workdir, f"{mode}_{readers}.db")
+    manager = create_manager(db_path, mode)
+    seed(manager, size)
+    words = make_vocabulary(200, seed=5)
+    new_items = generate_domain(100000, seed=9)
+    
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0}
+    lock = threading.Lock()
+    
+    def reader(worker_id):
+        ops = 0
+        i = worker_id
+        while not stop.is_set():
+            if i % 10 == 0:
+                manager.get_domain_stats()
+            else:
+                manager.search_knowledge(words[i % len(words)], DOMAIN, 10)
+            ops += 1
+            i += 1
+        with lock:
+            counts["reads"] += ops
+    
+    def writer():
+        ops = 0
+        while not stop.is_set():
+            item = new_items[ops % len(new_items)]
+            manager.add_knowledge(DOMAIN, item["question"], item["answer"], item["keywords"])
+            ops += 1
+        with lock:
+            counts["writes"] += ops
+    
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    return counts["reads"] / duration, counts["writes"] / duration
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10000, help="Boshlang'ich bilimlar soni")
+    parser.add_argument('--readers', default='1,4,8', help="O'quvchi oqimlar soni (vergul bilan)")
+    parser.add_argument('--duration', type=float, default=5.0, help="Har bir o'lchov davomiyligi (s)")
+    parser.add_argument('--modes', default='legacy,pooled', help="legacy va/yoki pooled")
+    args = parser.parse_args()
+    
+    print(f"{'mode':>8} {'readers':>8} {'reads/s':>10} {'writes/s':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for readers in [int(n) for n in args.readers.split(',')]:
+            for mode in args.modes.split(','):
+                reads, writes = run_mode(mode, args.size, readers, args.duration, workdir)
+                print(f"{mode:>8} {readers:>8} {reads:>10.0f} {writes:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+CLI buyruqlarining ishga tushish vaqti (python -X importtime asosida)
+
+Har bir buyruq alohida jarayonda bir necha marta ishga tushiriladi; eng
+yaxshi wall-clock vaqti, jami import vaqti va eng og'ir modullar JSON ga
+yoziladi (standart: benchmarks/results/startup.json).
+
+Foydalanish: python benchmarks/bench_startup.py [--repeat 5] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(BASE_DIR, "main.py")
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, "benchmarks", "results", "startup.json")
+
+COMMANDS = {
+    "help": ["--help"],
+    "chat": ["chat", "-q", "What is breach of contract?", "-d", "legal"],
+    "api-chat": ["api-chat", "--help"],
+    "voice-mode": ["voice-mode", "--help"],
+    "visual-mode": ["visual-mode", "--help"],
+    "start-api": ["start-api", "--help"],
+}
+
+def parse_importtime(stderr: str):
+    """-X importtime chiqishidan (jami import ms, modullar soni, eng og'ir top-level modullar)"""
+    total_us = 0
+    modules = 0
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        modules += 1
+        if not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative_us) / 1000))
+    
+    top_level.sort(key=lambda entry: entry[1], reverse=True)
+    return total_us / 1000, modules, top_level[:10]
+
+def measure(args, repeat):
+    """Buyruqni bir necha marta ishga tushirib, eng yaxshi natijani olish"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", MAIN] + args,
+            cwd=BASE_DIR, capture_output=True, text=True
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        import_ms, modules, heaviest = parse_importtime(result.stderr)
+        
+        run = {
+            "wall_ms": round(wall_ms, 1),
+            "import_ms": round(import_ms, 1),
+            "modules": modules,
+            "exit_code": result.returncode,
+            "heaviest": [[name, round(ms, 1)] for name, ms in heaviest],
+        }
+        if best is None or run["wall_ms"] < best["wall_ms"]:
+            best = run
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help="Har bir buyruq necha marta ishga tushiriladi")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Natijalar JSON fayli")
+    parser.add_argument('--commands', default=','.join(COMMANDS), help="O'lchanadigan buyruqlar")
+    args = parser.parse_args()
+    
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commands": {}
+    }
+    
+    print(f"{'command':>12} {'wall ms':>9} {'import ms':>10} {'modules':>8}  heaviest")
+    for name in args.commands.split(','):
+        run = measure(COMMANDS[name], args.repeat)
+        results["commands"][name] = run
+        heaviest = ', '.join(f"{module} {ms:.0f}ms" for module, ms in run["heaviest"][:3])
+        status = "" if run["exit_code"] == 0 else f" (exit {run['exit_code']})"
+        print(f"{name:>12} {run['wall_ms']:>9.1f} {run['import_ms']:>10.1f} {run['modules']:>8}  {heaviest}{status}")
+    
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Qidiruv benchmark to'plami: bilimlar bazasi hajmlari bo'yicha
+
+Har bir hajm uchun sintetik domain (benchmarks/corpus.py, sozlanadigan
+hajm va lug'at) yaratiladi va tarmoqsiz o'lchanadi:
+
+  load_domain_knowledge  indeks qurish vaqti va tracemalloc cho'qqi xotirasi
+  find_best_answer       bitta so'rov p50/p99, find_best_answers paket
+                         o'tkazuvchanligi va paketning cho'qqi xotirasi
+  add_knowledge          yangi bilim qo'shish p50/p99 va o'tkazuvchanlik
+  search_knowledge       DomainKnowledgeManager (SQLite, FTS5 yoki LIKE):
+                         import vaqti, p50/p99 va o'tkazuvchanlik
+
+Natijalar JSON ga yoziladi (standart: benchmarks/results/latest.json;
+commit qilingan baseline - benchmarks/results/suite.json). --baseline
+berilsa, natijalar oldingi fayl bilan solishtiriladi va biror metrika
+--tolerance dan ko'proq yomonlashsa yoki baseline dagi metrika natijada
+bo'lmasa, skript 1 kodi bilan chiqadi. Sozlamalar (config) baseline
+bilan mos kelmasa yoki umumiy metrika bo'lmasa - 2 kodi
+(--allow-config-mismatch bilan sozlamalar farqi faqat ogohlantirish).
+--input bilan o'lchovsiz, mavjud natijalar fayli solishtiriladi.
+
+Foydalanish: python benchmarks/bench_suite.py --sizes 1000,10000,50000 --baseline benchmarks/results/suite.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, "benchmarks", "results", "latest.json")
+DOMAIN = "bench"
+# Kattaroq qiymat yaxshi bo'lgan metrikalar (qolganlari - vaqt va xotira)
+HIGHER_IS_BETTER = ("qps", "batch_qps", "ops_per_s")
+
+def percentiles(latencies) -> dict:
+    """Kechikishlar (soniya) dan p50/p99 millisekundlarda"""
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+    }
+
+def time_calls(func, args_list):
+    """Har bir chaqiruv kechikishi (soniya) va jami vaqt"""
+    latencies = []
+    start = time.perf_counter()
+    for args in args_list:
+        call_start = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - call_start)
+    return latencies, time.perf_counter() - start
+
+def peak_memory(func) -> float:
+    """func() bajarilayotgandagi Python/NumPy ajratmalari cho'qqisi (MB, tracemalloc)"""
+    tracemalloc.start()
+    try:
+        func()
+        return round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+    finally:
+        tracemalloc.stop()
+
+def bench_processor(items, queries, args) -> dict:
+    from ai.nlp_processor import NLPProcessor
+
+    processor = NLPProcessor()
+    start = time.perf_counter()
+    processor.load_domain_knowledge({DOMAIN: items})
+    build_s = time.perf_counter() - start
+    # Xotira alohida qurishda o'lchanadi - tracemalloc vaqt o'lchoviga ta'sir qilmasin
+    build_peak = peak_memory(lambda: NLPProcessor().load_domain_knowledge({DOMAIN: items}))
+
+    # Qizdirish (birinchi chaqiruvlardagi import va keshlar)
+    for query in queries[:50]:
+        processor.find_best_answer(query, DOMAIN)
+    latencies, _ = time_calls(processor.find_best_answer, [(query, DOMAIN) for query in queries])
+
+    batches = [queries[i:i + args.batch] for i in range(0, len(queries), args.batch)]
+    _, batch_elapsed = time_calls(processor.find_best_answers, [(batch, DOMAIN) for batch in batches])
+    batch_peak = peak_memory(lambda: processor.find_best_answers(batches[0], DOMAIN))
+
+    # Indeks nusxalanib e'lon qilinadi - add_knowledge narxi domain hajmiga bog'liq
+    new_items = [(DOMAIN, f"{query} extra{i}", f"Added answer {i}") for i, query in enumerate(queries[:args.adds])]
+    add_latencies, add_elapsed = time_calls(processor.add_knowledge, new_items)
+
+    return {
+        "load_domain_knowledge": {
+            "build_s": round(build_s, 4),
+            "peak_mb": build_peak,
+        },
+        "find_best_answer": {
+            **percentiles(latencies),
+            "batch_qps": round(len(queries) / batch_elapsed, 1),
+            "batch_peak_mb": batch_peak,
+        },
+        "add_knowledge": {
+            **percentiles(add_latencies),
+            "ops_per_s": round(len(new_items) / add_elapsed, 1),
+        },
+    }
+
+def bench_search(items, queries, workdir) -> dict:
+    from ai.domain_knowledge import DomainKnowledgeManager
+    from ai.knowledge_io import iter_ndjson_chunks
+
+    export_path = os.path.join(workdir, f"{DOMAIN}.ndjson")
+    with open(export_path, "wb") as f:
+        for chunk in iter_ndjson_chunks({"domain": DOMAIN, **item} for item in items):
+            f.write(chunk)
+
+    manager = DomainKnowledgeManager(os.path.join(workdir, "knowledge.db"))
+    start = time.perf_counter()
+    manager.import_knowledge(export_path)
+    import_s = time.perf_counter() - start
+
+    # Ko'p so'zli qidiruv so'rovlari (savol boshidagi uch so'z)
+    search_queries = [' '.join(query.split()[:3]) for query in queries]
+    latencies, elapsed = time_calls(manager.search_knowledge, [(query, DOMAIN, 10) for query in search_queries])
+
+    return {
+        "import_s": round(import_s, 4),
+        **percentiles(latencies),
+        "qps": round(len(search_queries) / elapsed, 1),
+        "engine": "fts5" if manager.fts_enabled else "like",
+    }
+
+def run(args) -> dict:
+    from benchmarks.corpus import generate_domain, sample_queries
+    from config.settings import settings
+
+    settings.RETRIEVAL_ENGINE = args.engine
+    settings.ANSWER_CACHE_SIZE = 0
+    settings.INDEX_SNAPSHOTS_ENABLED = False
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "engine": args.engine,
+            "vocab": args.vocab,
+            "queries": args.queries,
+            "batch": args.batch,
+            "adds": args.adds,
+        },
+        "sizes": {}
+    }
+
+    # Qizdirish: birinchi qurishdagi kechiktirilgan importlar o'lchovga tushmasin
+    from ai.nlp_processor import NLPProcessor
+    NLPProcessor().load_domain_knowledge({DOMAIN: generate_domain(100, vocab_size=args.vocab)})
+
+    for size in args.sizes:
+        items = generate_domain(size, vocab_size=args.vocab)
+        queries = sample_queries(items, args.queries)
+        with tempfile.TemporaryDirectory() as workdir:
+            settings.INDEX_SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+            result = bench_processor(items, queries, args)
+            result["search_knowledge"] = bench_search(items, queries, workdir)
+        results["sizes"][str(size)] = result
+        print_size(size, result)
+    return results
+
+def print_size(size, result):
+    build = result["load_domain_knowledge"]
+    find = result["find_best_answer"]
+    add = result["add_knowledge"]
+    search = result["search_knowledge"]
+    print(f"{size:>8} build {build['build_s']:.2f}s/{build['peak_mb']:.0f}MB | "
+          f"find p50 {find['p50_ms']:.3f} p99 {find['p99_ms']:.3f} ms, batch {find['batch_qps']:.0f} q/s | "
+          f"add p50 {add['p50_ms']:.2f} ms, {add['ops_per_s']:.0f}/s | "
+          f"search ({search['engine']}) p50 {search['p50_ms']:.2f} ms, {search['qps']:.0f} q/s")
+
+def flatten(results: dict) -> dict:
+    """{"hajm/amal/metrika": qiymat} (faqat sonli metrikalar)"""
+    flat = {}
+    for size, operations in results["sizes"].items():
+        for operation, metrics in operations.items():
+            for metric, value in metrics.items():
+                if isinstance(value, (int, float)):
+                    flat[f"{size}/{operation}/{metric}"] = value
+    return flat
+
+def compare(current: dict, baseline: dict, tolerance: float, ignore=(), allow_config_mismatch: bool = False) -> list:
+    """Natijalarni baseline bilan solishtirish; tolerance dan ko'p yomonlashgan yoki yo'qolgan metrikalar ro'yxati
+
+    Sozlamalar farq qilsa (allow_config_mismatch bo'lmasa) yoki umumiy
+    metrika bo'lmasa ValueError - bunday natijalarni solishtirib bo'lmaydi.
+    """
+    if current.get("config") != baseline.get("config"):
+        message = f"config {current.get('config')} differs from baseline {baseline.get('config')}"
+        if not allow_config_mismatch:
+            raise ValueError(message)
+        print(f"Warning: {message}")
+
+    current_flat = flatten(current)
+    baseline_flat = flatten(baseline)
+    common = current_flat.keys() & baseline_flat.keys()
+    if not common:
+        raise ValueError("no metrics in common with the baseline (different --sizes?)")
+
+    regressions = []
+    print(f"{'metric':<45} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key in sorted(baseline_flat.keys() - common):
+        if key.rsplit("/", 1)[1] in ignore:
+            continue
+        regressions.append(key)
+        print(f"{key:<45} {baseline_flat[key]:>12.4g} {'missing':>12} {'':>8}  MISSING")
+    for key in sorted(common):
+        before, after = baseline_flat[key], current_flat[key]
+        if before == 0:
+            continue
+        metric = key.rsplit("/", 1)[1]
+        change = (after - before) / before
+        # Ijobiy "worse" - yomonlashish ulushi
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        status = ""
+        if worse > tolerance and metric not in ignore:
+            regressions.append(key)
+            status = "  REGRESSION"
+        print(f"{key:<45} {before:>12.4g} {after:>12.4g} {change:>+7.1%}{status}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Domain hajmlari (vergul bilan)")
+    parser.add_argument("--vocab", type=int, default=5000, help="Sintetik lug'at hajmi")
+    parser.add_argument("--queries", type=int, default=1000, help="Har bir hajm uchun so'rovlar soni")
+    parser.add_argument("--batch", type=int, default=100, help="find_best_answers paket hajmi")
+    parser.add_argument("--adds", type=int, default=200, help="add_knowledge chaqiruvlari soni")
+    parser.add_argument("--engine", default="tfidf", choices=["tfidf", "bm25"], help="Qidiruv mexanizmi")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Natijalar JSON fayli")
+    parser.add_argument("--input", help="O'lchamasdan, shu natijalar faylini solishtirish")
+    parser.add_argument("--baseline", help="Solishtiriladigan oldingi natijalar fayli")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Ruxsat etilgan yomonlashish ulushi")
+    parser.add_argument("--ignore", default="", help="Regressiya sifatida hisoblanmaydigan metrikalar (masalan: p99_ms)")
+    parser.add_argument("--allow-config-mismatch", action="store_true",
+                        help="Boshqa sozlamalar bilan o'lchangan baseline bilan solishtirishga ruxsat")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+
+    # Commit qilingan baseline o'lchov natijalari bilan almashtirilmaydi
+    if args.baseline and not args.input and os.path.abspath(args.output) == os.path.abspath(args.baseline):
+        parser.error("--output must differ from --baseline")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            results = json.load(f)
+    else:
+        print(f"engine={args.engine} vocab={args.vocab} queries={args.queries} batch={args.batch} adds={args.adds}")
+        results = run(args)
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        try:
+            regressions = compare(results, baseline, args.tolerance, set(filter(None, args.ignore.split(","))),
+                                  args.allow_config_mismatch)
+        except ValueError as e:
+            print(f"Cannot compare with baseline: {e}")
+            sys.exit(2)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%} or are missing")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Foydalanish hisoblagichlari benchmarki: har bir javob uchun UPDATE + commit
+va xotiradagi bufer (UsageCounterBuffer) orqali paketlab yozish
+
+N ta oqim belgilangan vaqt davomida tasodifiy bilimlarga "foydalanildi"
+yozadi; sekundiga qayd etilgan javoblar va yakunda bazadagi usage_count
+yig'indisi (yo'qolgan hisoblar yo'qligini tekshirish uchun) chiqariladi.
+
+Foydalanish: python benchmarks/bench_usage_counters.py --threads 1,8 --duration 3
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.domain_knowledge import DomainKnowledgeManager
+from benchmarks.bench_import import write_export
+
+def legacy_increment(manager, item_id):
+    """Oldingi xatti-harakat: har bir foydalanish - alohida yozuv tranzaksiyasi"""
+    conn = manager.pool.connection()
+    conn.execute(
+        "UPDATE knowledge_items SET usage_count = usage_count + 1, last_used = ? WHERE id = ?",
+        (datetime.now(), item_id)
+    )
+    conn.commit()
+
+def run(manager, record, item_ids, threads, duration):
+    stop = threading.Event()
+    counts = []
+    
+    def worker(seed):
+        rng = random.Random(seed)
+        ops = 0
+        while not stop.is_set():
+            record(rng.choice(item_ids))
+            ops += 1
+        counts.append(ops)
+    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    return sum(counts)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10000, help="Bilimlar soni")
+    parser.add_argument('--threads', default='1,8', help="Oqimlar soni (vergul bilan)")
+    parser.add_argument('--duration', type=float, default=3.0, help="Har bir o'lchov davomiyligi (s)")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    print(f"{'mode':>9} {'threads':>8} {'hits/s':>10} {'hits':>9} {'in db':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "source.json")
+        write_export(source, args.size)
+        
+        for threads in [int(n) for n in args.threads.split(',')]:
+            for mode in ("legacy", "buffered"):
+                manager = DomainKnowledgeManager(os.path.join(workdir, f"{mode}_{threads}.db"))
+                manager.import_knowledge(source)
+                conn = sqlite3.connect(manager.db_path)
+                item_ids = [row[0] for row in conn.execute("SELECT id FROM knowledge_items")]
+                
+                if mode == "legacy":
+                    hits = run(manager, lambda item_id: legacy_increment(manager, item_id), item_ids, threads, args.duration)
+                else:
+                    hits = run(manager, manager.record_usage, item_ids, threads, args.duration)
+                    manager.usage.stop()
+                
+                in_db = conn.execute("SELECT SUM(usage_count) FROM knowledge_items").fetchone()[0]
+                conn.close()
+                print(f"{mode:>9} {threads:>8} {hits / args.duration:>10.0f} {hits:>9} {in_db:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+/stats/usage benchmarki: conversations jadvalini GROUP BY bilan skanerlash va
+soatlik/kunlik rollup lardan o'qish
+
+Bir necha oylik sintetik suhbatlar add_conversations orqali yoziladi (rollup
+lar shu yo'lda yangilanadi), so'ng ikkala usulning kechikishi o'lchanadi.
+
+Foydalanish: python benchmarks/bench_usage_stats.py --size 1000000 --months 6
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+
+DOMAINS = ["legal", "medical", "education", "technology"]
+
+def legacy_usage_stats(db_path, days):
+    """Oldingi /stats/usage so'rovi"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('''
+            SELECT domain, COUNT(*) as count, AVG(response_time) as avg_time
+            FROM conversations 
+            WHERE created_at >= datetime('now', ?)
+            GROUP BY domain
+        ''', (f'-{days} days',)).fetchall()
+    finally:
+        conn.close()
+
+def timed(func, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000000, help="Suhbatlar soni")
+    parser.add_argument('--months', type=int, default=6, help="Tarix uzunligi (oy)")
+    parser.add_argument('--repeat', type=int, default=5, help="Har bir o'lchov takrorlari")
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    history_seconds = args.months * 30 * 86400
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "usage.db")
+        db = DatabaseManager(f"sqlite:///{db_path}")
+        
+        start = time.perf_counter()
+        batch_size = 5000
+        for offset in range(0, args.size, batch_size):
+            db.add_conversations([{
+                "session_id": "bench",
+                "question": "question",
+                "answer": "answer",
+                "domain": rng.choice(DOMAINS),
+                "response_time": rng.expovariate(10),
+                "created_at": now - timedelta(seconds=rng.randrange(history_seconds))
+            } for _ in range(min(batch_size, args.size - offset))])
+        print(f"Setup: {args.size} conversations in {time.perf_counter() - start:.1f}s")
+        
+        print(f"{'days':>5} {'scan ms':>9} {'rollup ms':>10}")
+        for days in (1, 7, 30, 365):
+            scan = timed(lambda: legacy_usage_stats(db_path, days), args.repeat)
+            rollup = timed(lambda: db.get_usage_stats(now - timedelta(days=days)), args.repeat)
+            print(f"{days:>5} {scan:>9.1f} {rollup:>10.2f}")
+
+if __name__ == "__main__":
+    main()
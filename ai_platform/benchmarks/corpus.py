@@ -0,0 +1,50 @@
+# benchmarks/corpus.py
+import itertools
+import random
+import string
+from typing import List, Dict, Tuple
+
+def make_vocabulary(size: int, seed: int = 0) -> List[str]:
+    """Faqat harflardan iborat sintetik so'zlar lug'ati"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        length = rng.randint(4, 9)
+        words.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return sorted(words)
+
+def generate_domain(n_items: int, vocab_size: int = 5000, words_per_question: int = 8,
+                    seed: int = 0) -> List[Dict[str, str]]:
+    """Sintetik domain bilimlarini yaratish (Zipf taqsimotiga yaqin)"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocab_size, seed)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocab_size)))
+    
+    items = []
+    for i in range(n_items):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=words_per_question)
+        question = ' '.join(words)
+        items.append({
+            "question": question,
+            "answer": f"Answer {i}: {question}",
+            "keywords": ' '.join(words[:3])
+        })
+    return items
+
+def sample_labeled_queries(items: List[Dict[str, str]], n_queries: int,
+                           seed: int = 1) -> Tuple[List[str], List[int]]:
+    """Korpusdagi savollardan so'rovlar va ularning manba indekslari (bir so'zi tashlab yuboriladi)"""
+    rng = random.Random(seed)
+    queries, targets = [], []
+    for _ in range(n_queries):
+        target = rng.randrange(len(items))
+        words = items[target]["question"].split()
+        if len(words) > 1:
+            words.pop(rng.randrange(len(words)))
+        queries.append(' '.join(words))
+        targets.append(target)
+    return queries, targets
+
+def sample_queries(items: List[Dict[str, str]], n_queries: int, seed: int = 1) -> List[str]:
+    """Korpusdagi savollardan so'rovlar tanlash"""
+    return sample_labeled_queries(items, n_queries, seed)[0]
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+API yuklama generatori: /api/chat, /search va /voice/chat
+
+Ilova api/server.py dagi create_app() va unga ulangan api/routes.py
+routeridan yig'iladi (load_app). Nishon (--target):
+
+  asgi               ilova shu jarayonda, httpx.ASGITransport orqali
+                     (tarmoq va uvicorn siz; generator bilan bitta event loop)
+  uvicorn            ilova alohida jarayonda lokal uvicorn serverida
+                     (--workers bilan bir nechta worker)
+  http://host:port   allaqachon ishlayotgan server
+
+--concurrency ta mijoz --duration soniya davomida --mix bo'yicha tasodifiy
+endpointlarga so'rov yuboradi (--warmup soniyalari hisobga olinmaydi).
+Har bir endpoint va jami uchun o'tkazuvchanlik, kechikish p50/p90/p99/max
+va xatolar ulushi chiqariladi; --output bilan JSON ga ham yoziladi.
+
+--size > 0 bo'lsa, sintetik "bench" domain (benchmarks/corpus.py) ikkala
+bilimlar manbasiga (settings.DOMAIN_KNOWLEDGE va DomainKnowledgeManager
+bazasi) yuklanadi; --size 0 - sozlamalardagi domainlar yoki --knowledge-db
+(DomainKnowledgeManager bazasi nusxasi) dagi domainlar ishlatiladi.
+
+Foydalanish: python benchmarks/load_test.py --target asgi --concurrency 50 --duration 20 --mix chat=70,search=20,voice=10
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+DOMAIN = "bench"
+DEFAULT_MIX = "chat=70,search=20,voice=10"
+
+# Endpoint nomi -> (yo'l, so'rov tanasi yasovchi)
+ENDPOINTS = {
+    "chat": ("/api/chat", lambda domain, question: {"question": question, "domain": domain}),
+    "search": ("/search", lambda domain, question: {"query": question, "domain": domain, "limit": 10}),
+    "voice": ("/voice/chat", lambda domain, question: {
+        "audio_data": base64.b64encode(question.encode("utf-8")).decode("ascii"),
+        "domain": domain
+    }),
+}
+
+def configure():
+    """Sozlamalarni muhit o'zgaruvchilaridan o'rnatish (shu jarayon yoki har bir uvicorn worker uchun)"""
+    from config.settings import settings
+
+    workdir = os.environ["LOAD_WORKDIR"]
+    size = int(os.environ.get("LOAD_SIZE", "0"))
+    settings.DEBUG = False
+    settings.INDEX_SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+    settings.DATABASE_URL = f"sqlite:///{os.path.join(workdir, 'ai_platform.db')}"
+    if os.environ.get("LOAD_NO_CACHE") == "1":
+        settings.ANSWER_CACHE_SIZE = 0
+    if size > 0:
+        from benchmarks.corpus import generate_domain
+        settings.DOMAIN_KNOWLEDGE = {DOMAIN: generate_domain(size)}
+    elif os.environ.get("LOAD_KNOWLEDGE_DB") == "1":
+        settings.DOMAIN_KNOWLEDGE = load_knowledge(os.path.join(workdir, "domain_knowledge.db"))
+    # api.routes dagi DomainKnowledgeManager() bazasi joriy katalogda ochiladi
+    os.chdir(workdir)
+
+def seed_knowledge(workdir: str, items):
+    """Sintetik bilimlarni api.routes ishlatadigan DomainKnowledgeManager bazasiga import qilish"""
+    from ai.domain_knowledge import DomainKnowledgeManager
+    from ai.knowledge_io import iter_ndjson_chunks
+
+    export_path = os.path.join(workdir, f"{DOMAIN}.ndjson")
+    with open(export_path, "wb") as f:
+        for chunk in iter_ndjson_chunks({"domain": DOMAIN, **item} for item in items):
+            f.write(chunk)
+    manager = DomainKnowledgeManager(os.path.join(workdir, "domain_knowledge.db"))
+    manager.import_knowledge(export_path)
+    manager.pool.close()
+
+def copy_knowledge_db(source: str, workdir: str):
+    """DomainKnowledgeManager bazasini ishchi katalogga nusxalash (asl baza o'zgarmaydi)"""
+    source_conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    target_conn = sqlite3.connect(os.path.join(workdir, "domain_knowledge.db"))
+    try:
+        source_conn.backup(target_conn)
+    finally:
+        source_conn.close()
+        target_conn.close()
+
+def load_knowledge(db_path: str):
+    """DomainKnowledgeManager bazasidagi barcha domainlar bilimlari"""
+    from ai.domain_knowledge import DomainKnowledgeManager
+
+    manager = DomainKnowledgeManager(db_path)
+    try:
+        return {domain_name: manager.get_knowledge(domain_name) for domain_name in manager.domains}
+    finally:
+        manager.pool.close()
+
+def load_app():
+    """Yuklama ilovasi: create_app() + api.routes routeri (uvicorn --factory uchun ham)"""
+    configure()
+    from api.server import create_app
+    from api import routes
+
+    app = create_app()
+    app.include_router(routes.router)
+    return app
+
+def prepare_workdir(args, workdir: str):
+    """Ishchi katalog va muhit o'zgaruvchilari; sintetik domain bo'lsa bazaga yuklash"""
+    os.environ.update(LOAD_WORKDIR=workdir, LOAD_SIZE=str(args.size),
+                      LOAD_NO_CACHE="1" if args.no_cache else "0",
+                      LOAD_KNOWLEDGE_DB="1" if args.knowledge_db else "0")
+    if args.knowledge_db:
+        copy_knowledge_db(args.knowledge_db, workdir)
+    elif args.size > 0:
+        from benchmarks.corpus import generate_domain
+        seed_knowledge(workdir, generate_domain(args.size))
+
+def request_pool(size: int, knowledge=None, n: int = 2000, seed: int = 1):
+    """(domain, savol) juftliklari: sintetik domain, berilgan bilimlar yoki sozlamalardagi domainlar savollari"""
+    if size > 0:
+        from benchmarks.corpus import generate_domain, sample_queries
+        return [(DOMAIN, question) for question in sample_queries(generate_domain(size), n, seed)]
+
+    if knowledge is None:
+        from config.settings import settings
+        knowledge = settings.DOMAIN_KNOWLEDGE
+    return [(domain, item["question"]) for domain, items in knowledge.items() for item in items]
+
+def parse_mix(mix: str):
+    """"chat=70,search=20" -> ([endpoint nomlari], [og'irliklar])"""
+    names, weights = [], []
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name} (expected one of {', '.join(ENDPOINTS)})")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_ready(client, process=None, timeout: float = 600.0):
+    """Server /api/health ga javob bergunicha kutish"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("Server exited")
+        try:
+            if (await client.get("/api/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("Server did not start")
+
+@contextlib.asynccontextmanager
+async def open_target(target: str, concurrency: int, workers: int = 1):
+    """Nishonga ulangan httpx.AsyncClient (asgi, uvicorn yoki URL)"""
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    if target == "asgi":
+        app = load_app()
+        # ASGITransport lifespan hodisalarini yubormaydi - startup/shutdown ilova lifespan i orqali
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                         base_url="http://loadtest", timeout=120) as client:
+                yield client
+    elif target == "uvicorn":
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port), "--workers", str(workers)],
+            cwd=BASE_DIR
+        )
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+                await wait_ready(client, process)
+                yield client
+        finally:
+            process.terminate()
+            process.wait(30)
+    else:
+        async with httpx.AsyncClient(base_url=target, limits=limits, timeout=120) as client:
+            await wait_ready(client, timeout=30)
+            yield client
+
+async def send(client, name: str, domain: str, question: str):
+    """Bitta so'rov: (endpoint, kechikish soniyada, status yoki istisno nomi)"""
+    path, payload = ENDPOINTS[name]
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json=payload(domain, question))
+        status = response.status_code
+    except Exception as e:
+        status = type(e).__name__
+    return name, time.perf_counter() - start, status
+
+async def run_load(client, mix, pool, concurrency: int, duration: float, warmup: float = 0.0, seed: int = 0):
+    """concurrency ta mijoz bilan yopiq tsiklli yuklama; o'lchangan (endpoint, kechikish, status) ro'yxati"""
+    names, weights = mix
+    rng = random.Random(seed)
+    results = []
+    measure_from = time.monotonic() + warmup
+    deadline = measure_from + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            domain, question = rng.choice(pool)
+            started = time.monotonic()
+            result = await send(client, name, domain, question)
+            if started >= measure_from:
+                results.append(result)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+def summarize(results, elapsed: float):
+    """Endpointlar va jami bo'yicha: so'rovlar, req/s, p50/p90/p99/max ms, xatolar"""
+    groups = {}
+    for name, latency, status in results:
+        groups.setdefault(name, []).append((latency, status))
+    groups["total"] = [(latency, status) for _, latency, status in results]
+
+    summary = {}
+    for name, entries in groups.items():
+        if not entries:
+            continue
+        latencies = np.array([latency for latency, _ in entries]) * 1000
+        errors = {}
+        for _, status in entries:
+            if not isinstance(status, int) or status >= 400:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+        error_count = sum(errors.values())
+        summary[name] = {
+            "requests": len(entries),
+            "rps": round(len(entries) / elapsed, 1),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p90_ms": round(float(np.percentile(latencies, 90)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "max_ms": round(float(latencies.max()), 3),
+            "errors": error_count,
+            "error_rate": round(error_count / len(entries), 4),
+            "error_statuses": errors,
+        }
+    return summary
+
+def print_summary(summary):
+    print(f"{'endpoint':>9} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'errors':>7} {'err %':>6}")
+    for name, row in summary.items():
+        print(f"{name:>9} {row['requests']:>9} {row['rps']:>8.1f} {row['p50_ms']:>8.2f} {row['p90_ms']:>8.2f} "
+              f"{row['p99_ms']:>8.2f} {row['max_ms']:>8.1f} {row['errors']:>7} {row['error_rate'] * 100:>6.2f}")
+        if row["error_statuses"]:
+            print(f"{'':>9} {', '.join(f'{status}: {count}' for status, count in row['error_statuses'].items())}")
+
+def serve(args):
+    """Server jarayoni: workerlar load_app() fabrikasi bilan ishga tushadi"""
+    configure()
+    from api.server import serve_workers
+    serve_workers("127.0.0.1", args.port, args.workers, app="benchmarks.load_test:load_app")
+
+async def main_async(args, workdir: str):
+    mix = parse_mix(args.mix)
+    knowledge = load_knowledge(os.path.join(workdir, "domain_knowledge.db")) if args.knowledge_db else None
+    pool = request_pool(args.size, knowledge)
+    async with open_target(args.target, args.concurrency, args.workers) as client:
+        start = time.monotonic()
+        results = await run_load(client, mix, pool, args.concurrency, args.duration, args.warmup)
+        elapsed = time.monotonic() - start - args.warmup
+    return summarize(results, elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="asgi", help="asgi, uvicorn yoki server URL i")
+    parser.add_argument("--concurrency", type=int, default=50, help="Parallel mijozlar soni")
+    parser.add_argument("--duration", type=float, default=20.0, help="O'lchash davomiyligi (soniya)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Hisobga olinmaydigan boshlang'ich soniyalar")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpointlar ulushi (chat, search, voice)")
+    parser.add_argument("--size", type=int, default=10000, help="Sintetik domain hajmi (0 - sozlamalardagi domainlar)")
+    parser.add_argument("--knowledge-db", help="Bilimlar shu DomainKnowledgeManager bazasidan olinadi (--size o'rniga)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workerlari (--target uvicorn)")
+    parser.add_argument("--no-cache", action="store_true", help="Javoblar keshini o'chirish")
+    parser.add_argument("--output", help="Natijalar JSON fayli")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    if args.knowledge_db:
+        args.size = 0
+    if args.output:
+        # asgi nishoni ishchi katalogga o'tadi - natijalar chaqiruvchining joriy katalogiga yoziladi
+        args.output = os.path.abspath(args.output)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.target in ("asgi", "uvicorn") or args.knowledge_db:
+            prepare_workdir(args, workdir)
+        print(f"target={args.target} concurrency={args.concurrency} duration={args.duration}s "
+              f"mix={args.mix} size={args.size} cache={'off' if args.no_cache else 'on'}")
+        summary = asyncio.run(main_async(args, workdir))
+        # Ishchi katalog o'chirilishidan oldin undan chiqish (asgi rejimida configure() unga o'tgan)
+        os.chdir(BASE_DIR)
+
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": {key: value for key, value in vars(args).items() if key not in ("serve", "port", "output")},
+                       "results": summary}, f, indent=2, ensure_ascii=False)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Suhbatlar jurnalini qayta ijro etish: haqiqiy trafik shaklidagi yuklama
+
+Manba (--source):
+  sqlite:///ai_platform.db (yoki boshqa SQLAlchemy URL)   DatabaseManager suhbatlari
+  domain_knowledge.db                                    DomainKnowledgeManager suhbatlari
+  conversations.ndjson[.gz]                              --export bilan olingan eksport
+SQLite fayli yo'li berilsa, sxema conversations jadvali ustunlariga qarab
+aniqlanadi (domain_id bo'lsa - DomainKnowledgeManager).
+
+Yozuvlar created_at bo'yicha tartiblanib, asl oraliqlar --speedup ga
+bo'lingan holda ochiq tsiklda (oldingi javobni kutmasdan) yuboriladi;
+--max-gap uzun tanaffuslarni qisqartiradi, --speedup 0 - kutishsiz.
+Bir vaqtda kutilayotgan so'rovlar --max-in-flight bilan cheklanadi.
+Rejadan kechikish (lag) ham chiqariladi: u o'ssa, generator yoki nishon
+asl tezlikka ulgurmayapti.
+
+Nishon (--target): engine (NLPProcessor shu jarayonda, RetrievalExecutor
+orqali), asgi, uvicorn yoki server URL i (benchmarks/load_test.py bilan bir xil).
+
+Foydalanish: python benchmarks/replay.py --source sqlite:///ai_platform.db --target asgi --speedup 10
+             python benchmarks/replay.py --source sqlite:///ai_platform.db --export conversations.ndjson.gz
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+# DomainKnowledgeManager suhbatlarida domain_id bo'lmasa
+DEFAULT_DOMAIN = "general"
+
+def parse_time(value) -> datetime:
+    """created_at qiymati (datetime yoki ISO satr) -> UTC naive datetime"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def read_database(url: str):
+    """DatabaseManager.conversations jadvali (created_at bo'yicha, oqimli)"""
+    from sqlalchemy import create_engine, select
+    from database.models import Conversation
+
+    engine = create_engine(url)
+    query = select(Conversation.domain, Conversation.question, Conversation.session_id, Conversation.created_at)
+    query = query.order_by(Conversation.created_at, Conversation.id).execution_options(yield_per=1000)
+    try:
+        with engine.connect() as conn:
+            for domain, question, session_id, created_at in conn.execute(query):
+                yield {"domain": domain, "question": question, "session_id": session_id, "created_at": created_at}
+    finally:
+        engine.dispose()
+
+def read_knowledge_db(path: str):
+    """DomainKnowledgeManager conversations jadvali (faqat o'qish rejimida)"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute('''
+            SELECT d.name, c.question, c.created_at
+            FROM conversations c
+            LEFT JOIN domains d ON d.id = c.domain_id
+            ORDER BY c.created_at, c.id
+        ''')
+        for domain, question, created_at in cursor:
+            yield {"domain": domain or DEFAULT_DOMAIN, "question": question, "session_id": None,
+                   "created_at": created_at}
+    finally:
+        conn.close()
+
+def read_export(path: str):
+    """--export bilan yozilgan NDJSON (.gz bo'lishi mumkin) fayli"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def sqlite_schema(path: str) -> str:
+    """SQLite faylidagi conversations jadvali qaysi menejerga tegishli"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(conversations)")}
+    finally:
+        conn.close()
+    if not columns:
+        raise ValueError(f"No conversations table in {path}")
+    return "knowledge" if "domain_id" in columns else "database"
+
+def absolute_source(source: str) -> str:
+    """Nisbiy fayl yo'li yoki sqlite URL ini joriy katalogga nisbatan absolyutga aylantirish
+
+    Nishon ishchi katalogga o'tadi (load_test.configure), manba esa
+    yozuvlar o'qilayotganda ochiladi - shuning uchun oldindan hal qilinadi.
+    """
+    if "://" not in source:
+        return os.path.abspath(source)
+
+    from sqlalchemy.engine import make_url
+
+    url = make_url(source)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:" \
+            and not os.path.isabs(url.database):
+        url = url.set(database=os.path.abspath(url.database))
+    return url.render_as_string(hide_password=False)
+
+def read_source(source: str):
+    """Manbadan yozuvlar oqimi (created_at bo'yicha tartiblangan)"""
+    from ai.knowledge_io import NDJSON_SUFFIXES
+
+    if "://" in source:
+        return read_database(source)
+    name = source[:-3] if source.endswith(".gz") else source
+    if name.endswith(NDJSON_SUFFIXES):
+        return read_export(source)
+    if sqlite_schema(source) == "knowledge":
+        return read_knowledge_db(source)
+    return read_database(f"sqlite:///{os.path.abspath(source)}")
+
+def select_records(records, args):
+    """Filtrlar (--domain, --since, --until, --limit) va created_at ni datetime ga keltirish"""
+    since = parse_time(args.since) if args.since else None
+    until = parse_time(args.until) if args.until else None
+    domains = set(args.domain.split(",")) if args.domain else None
+    count = 0
+    for record in records:
+        if not record.get("question"):
+            continue
+        created_at = parse_time(record["created_at"])
+        if (domains and record["domain"] not in domains) or (since and created_at < since):
+            continue
+        if until and created_at >= until:
+            break
+        yield {**record, "created_at": created_at}
+        count += 1
+        if args.limit and count >= args.limit:
+            break
+
+def export(records, path: str) -> int:
+    """Yozuvlarni NDJSON ga yozish (.gz - siqilgan)"""
+    from ai.knowledge_io import iter_ndjson_chunks
+
+    count = 0
+
+    def serialise():
+        nonlocal count
+        for record in records:
+            count += 1
+            yield {**record, "created_at": record["created_at"].isoformat()}
+
+    with open(path, "wb") as f:
+        for chunk in iter_ndjson_chunks(serialise(), compress=path.endswith(".gz")):
+            f.write(chunk)
+    return count
+
+async def replay(records, send, speedup: float, max_gap, max_in_flight: int):
+    """Yozuvlarni asl vaqt oraliqlari bilan ochiq tsiklda yuborish; (natijalar, lag lar, vaqt, asl davomiylik)"""
+    semaphore = asyncio.Semaphore(max_in_flight)
+    results, lags = [], []
+    pending = set()
+    start = time.monotonic()
+    offset = 0.0
+    previous = None
+
+    async def fire(record):
+        try:
+            results.append(await send(record))
+        finally:
+            semaphore.release()
+
+    for record in records:
+        if previous is not None:
+            gap = (record["created_at"] - previous).total_seconds()
+            offset += min(gap, max_gap) if max_gap is not None else gap
+        previous = record["created_at"]
+
+        await semaphore.acquire()
+        if speedup > 0:
+            due = start + offset / speedup
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lags.append(max(0.0, time.monotonic() - due))
+
+        task = asyncio.ensure_future(fire(record))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+    return results, lags, time.monotonic() - start, offset
+
+async def replay_engine(records, args, workdir: str):
+    """NLPProcessor ga to'g'ridan-to'g'ri (HTTP siz) qayta ijro"""
+    from ai.nlp_processor import NLPProcessor
+    from api.retrieval_executor import PROCESS, THREAD, RetrievalExecutor
+    from benchmarks.load_test import load_knowledge
+    from config.settings import settings
+
+    settings.INDEX_SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+    if args.no_cache:
+        settings.ANSWER_CACHE_SIZE = 0
+    knowledge = load_knowledge(os.path.join(workdir, "domain_knowledge.db")) if args.knowledge_db else settings.DOMAIN_KNOWLEDGE
+
+    processor = NLPProcessor()
+    processor.load_domain_knowledge(knowledge)
+    # Jarayon workerlari bilimlarni alohida yuklaydi - bu yerda oqimlar ishlatiladi
+    retrieval = RetrievalExecutor(
+        THREAD if settings.RETRIEVAL_EXECUTOR == PROCESS else settings.RETRIEVAL_EXECUTOR,
+        max_workers=settings.RETRIEVAL_WORKERS,
+        max_concurrency=settings.RETRIEVAL_MAX_CONCURRENCY
+    )
+
+    async def send(record):
+        start = time.perf_counter()
+        try:
+            await retrieval.run(processor.find_best_answer, record["question"], record["domain"])
+            status = 200
+        except Exception as e:
+            status = type(e).__name__
+        return "engine", time.perf_counter() - start, status
+
+    try:
+        return await replay(records, send, args.speedup, args.max_gap, args.max_in_flight)
+    finally:
+        retrieval.shutdown()
+
+async def replay_http(records, args):
+    """asgi, uvicorn yoki URL nishoniga --endpoint orqali qayta ijro"""
+    from benchmarks import load_test
+
+    async with load_test.open_target(args.target, args.max_in_flight, args.workers) as client:
+        async def send(record):
+            return await load_test.send(client, args.endpoint, record["domain"], record["question"])
+
+        return await replay(records, send, args.speedup, args.max_gap, args.max_in_flight)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=None, help="SQLAlchemy URL, SQLite fayli yoki NDJSON eksport (standart: settings.DATABASE_URL)")
+    parser.add_argument("--export", help="Qayta ijro o'rniga tanlangan yozuvlarni shu NDJSON faylga yozish")
+    parser.add_argument("--target", default="engine", help="engine, asgi, uvicorn yoki server URL i")
+    parser.add_argument("--endpoint", default="chat", choices=["chat", "search", "voice"], help="HTTP nishonlar uchun endpoint")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Vaqt tezlatish koeffitsienti (0 - kutishsiz)")
+    parser.add_argument("--max-gap", type=float, default=None, help="Asl oraliqlarning yuqori chegarasi (soniya)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Bir vaqtda kutilayotgan so'rovlar chegarasi")
+    parser.add_argument("--domain", help="Faqat shu domainlar (vergul bilan)")
+    parser.add_argument("--since", help="Shu vaqtdan (ISO, UTC)")
+    parser.add_argument("--until", help="Shu vaqtgacha (ISO, UTC)")
+    parser.add_argument("--limit", type=int, default=0, help="Yozuvlar soni chegarasi (0 - hammasi)")
+    parser.add_argument("--knowledge-db", help="Nishon bilimlari shu DomainKnowledgeManager bazasi nusxasidan olinadi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workerlari (--target uvicorn)")
+    parser.add_argument("--no-cache", action="store_true", help="Javoblar keshini o'chirish")
+    parser.add_argument("--output", help="Natijalar JSON fayli")
+    args = parser.parse_args()
+
+    from config.settings import settings
+    source = absolute_source(args.source or settings.DATABASE_URL)
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    records = select_records(read_source(source), args)
+
+    if args.export:
+        print(f"Exported {export(records, args.export)} conversations to {args.export}")
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Nishon ilovasi sozlamalari load_test bilan bir xil (sintetik domainsiz)
+        from benchmarks.load_test import prepare_workdir
+        prepare_workdir(SimpleNamespace(size=0, no_cache=args.no_cache, knowledge_db=args.knowledge_db), workdir)
+
+        print(f"source={source} target={args.target} speedup={args.speedup} max_gap={args.max_gap} "
+              f"max_in_flight={args.max_in_flight}")
+        if args.target == "engine":
+            outcome = asyncio.run(replay_engine(records, args, workdir))
+        else:
+            outcome = asyncio.run(replay_http(records, args))
+        os.chdir(BASE_DIR)
+
+    results, lags, elapsed, original = outcome
+    if not results:
+        sys.exit("No conversations to replay")
+
+    from benchmarks.load_test import print_summary, summarize
+    summary = summarize(results, elapsed)
+    lag = {}
+    if lags:
+        lag_ms = np.asarray(lags) * 1000
+        lag = {"p50_ms": round(float(np.percentile(lag_ms, 50)), 3),
+               "p99_ms": round(float(np.percentile(lag_ms, 99)), 3),
+               "max_ms": round(float(lag_ms.max()), 3)}
+
+    print(f"replayed {len(results)} conversations: original span {original:.1f}s, replay {elapsed:.1f}s")
+    print_summary(summary)
+    if lag:
+        print(f"schedule lag: p50 {lag['p50_ms']:.2f} ms, p99 {lag['p99_ms']:.2f} ms, max {lag['max_ms']:.1f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": {**vars(args), "source": source},
+                       "original_span_s": round(original, 3), "replay_s": round(elapsed, 3),
+                       "schedule_lag": lag, "results": summary}, f, indent=2, ensure_ascii=False)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
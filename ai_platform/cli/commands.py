@@ -1,14 +1,12 @@
 # cli/commands.py
 import click
-import requests
-import json
-import sys
 from typing import Optional
 
-from ai.nlp_processor import NLPProcessor
-from voice.speech_recognition import VoiceAssistant
 from config.settings import settings
 
+# Eslatma: og'ir modullar (NLTK, scikit-learn, FastAPI, PyAudio, pygame) har
+# bir buyruq ichida import qilinadi, shunda CLI faqat ishlatilganini yuklaydi
+
 @click.group()
 def cli():
     """AI Platform CLI - Mukammal AI Yordamchi"""
@@ -19,6 +17,8 @@ def cli():
 @click.option('--domain', '-d', default='general', help='Domain tanlang')
 def chat(question, domain):
     """Chat rejimi"""
+    from ai.nlp_processor import NLPProcessor
+    
     ai_processor = NLPProcessor()
     ai_processor.load_domain_knowledge(settings.DOMAIN_KNOWLEDGE)
     
@@ -51,6 +51,8 @@ def chat(question, domain):
 @click.option('--api-url', default='http://localhost:8000', help='API URL')
 def api_chat(api_url):
     """API orqali chat"""
+    import requests
+    
     click.echo("🌐 API Chat rejimi")
     session_id = None
     
@@ -89,6 +91,9 @@ def voice_mode():
     click.echo("🎤 Ovozli rejim ishga tushdi...")
     click.echo("🎧 Mikrofonga gapiring (Chiqish uchun 'stop' deying)")
     
+    from ai.nlp_processor import NLPProcessor
+    from voice.speech_recognition import VoiceAssistant
+    
     ai_processor = NLPProcessor()
     ai_processor.load_domain_knowledge(settings.DOMAIN_KNOWLEDGE)
     voice_assistant = VoiceAssistant()
@@ -134,12 +139,20 @@ def visual_mode():
         click.echo("🔧 O'rnatish: pip install pygame PyOpenGL")
 
 @cli.command()
-def start_api():
+@click.option('--workers', '-w', default=None, type=int, help='Worker jarayonlar soni')
+def start_api(workers):
     """API serverni ishga tushirish"""
     click.echo("🚀 FastAPI server ishga tushmoqda...")
     
-    from api.server import api_server
-    api_server.run()
+    workers = workers or settings.API_WORKERS
+    if workers > 1:
+        # Ota jarayon faqat indekslarni quradi - ilova nusxasi workerlarda yaratiladi
+        from api.server import serve_workers
+        serve_workers(workers=workers)
+        return
+    
+    from api.server import AIPlatformAPI
+    AIPlatformAPI().run()
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -3,6 +3,9 @@ import os
 from pathlib import Path
 
 class Settings:
+    BASE_DIR = Path(__file__).resolve().parent.parent
+    DATA_DIR = BASE_DIR / "data"  # Ilova yaratadigan fayllar (joriy katalogga bog'liq emas)
+    
     # Asosiy sozlamalar
     APP_NAME = "AI Platform"
     VERSION = "1.0.0"
@@ -12,10 +15,47 @@ class Settings:
     API_HOST = "0.0.0.0"
     API_PORT = 8000
     API_DOCS_URL = "/docs"
+    API_WORKERS = 1  # >1 bo'lsa workerlar indeks snapshotlarini mmap orqali bo'lishadi
+    
+    # Qidiruvni event loop dan tashqarida bajarish: "inline", "thread" yoki "process"
+    RETRIEVAL_EXECUTOR = "thread"
+    RETRIEVAL_WORKERS = 4
+    RETRIEVAL_MAX_CONCURRENCY = 16  # Bir vaqtda bajariladigan qidiruvlar, qolganlari navbatda kutadi
+    REQUEST_COALESCING = True  # Bir vaqtdagi bir xil (domain, savol) so'rovlari bitta qidiruvni bo'lishadi
+    
+    # Bosqichlar kechikishi gistogrammalari (/metrics, Prometheus formati)
+    METRICS_ENABLED = True
+    METRICS_MAX_DOMAINS = 100  # Shundan keyingi domainlar "other" yorlig'i ostida yig'iladi
+    
+    # So'rovlarni namuna olib profillash (/admin/profile, X-Profile sarlavhasi)
+    PROFILING_ENABLED = False  # O'chirilganda middleware va endpointlar umuman o'rnatilmaydi
+    PROFILING_TOKEN = ""  # Majburiy: X-Profile sarlavhasi va /admin/profile shu tokenni talab qiladi (bo'sh - profiler o'rnatilmaydi)
+    PROFILING_INTERVAL = 0.005  # Namuna olish oralig'i (soniya)
+    PROFILING_MAX_STACKS = 10000  # Turli stacklar soni chegarasi
     
     # Database sozlamalari
     DATABASE_URL = "sqlite:///./ai_platform.db"
     
+    # Domain bilimlari SQLite bazasi: har bir oqimga doimiy ulanish va pragmalar
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "cache_size": -20000,
+        "mmap_size": 268435456,
+        "busy_timeout": 5000
+    }
+    SQLITE_CACHED_STATEMENTS = 256
+    IMPORT_BATCH_SIZE = 50000  # Bitta tranzaksiyadagi bilimlar soni
+    USAGE_FLUSH_INTERVAL = 5.0  # soniya: foydalanish hisoblagichlari shu oraliqda yoziladi
+    USAGE_MAX_PENDING_ITEMS = 10000  # Shuncha turli bilim yig'ilsa, muddatidan oldin yoziladi
+    
+    # Suhbatlarni fon rejimida paketlab yozish
+    CONVERSATION_LOG_QUEUE_SIZE = 10000
+    CONVERSATION_LOG_BATCH_SIZE = 500
+    CONVERSATION_LOG_FLUSH_INTERVAL = 1.0  # soniya
+    CONVERSATION_LOG_DROP_POLICY = "drop_newest"  # "drop_newest", "drop_oldest" yoki "block"
+    
     # AI Model sozlamalari
     AI_MODELS = {
         "legal": "legal_model.pkl",
@@ -24,6 +64,29 @@ class Settings:
         "general": "general_model.pkl"
     }
     
+    # Qidiruv mexanizmi: "tfidf" (cosine) yoki "bm25" (inverted indeks)
+    RETRIEVAL_ENGINE = "tfidf"
+    DOMAIN_RETRIEVAL_ENGINES = {
+        # "legal": "bm25"
+    }
+    RETRIEVAL_ENGINE_OPTIONS = {
+        "tfidf": {"max_features": 1000},
+        "bm25": {"k1": 1.5, "b": 0.75}
+    }
+    
+    # Matnni qayta ishlash keshi (normallashtirilgan matnlar soni)
+    PREPROCESS_CACHE_SIZE = 10000
+    ANSWER_CACHE_SIZE = 10000  # (domain, savol) javoblar keshi; 0 - o'chirilgan
+    ANSWER_CACHE_TTL = 300.0  # soniya
+    SEARCH_MIN_SCORE = 0.1  # /search: indeks natijalari uchun minimal baho (0..1)
+    
+    # Indekslash sozlamalari
+    INCREMENTAL_INDEXING = True
+    INDEX_DRIFT_THRESHOLD = 0.1  # IDF chetlanishi shundan oshsa, fon rejimida qayta fit qilinadi
+    INDEX_MAX_PENDING_ITEMS = 10000  # Qayta fit qilinmagan hujjatlarning maksimal soni
+    INDEX_SNAPSHOTS_ENABLED = True
+    INDEX_SNAPSHOT_DIR = str(DATA_DIR / "index_snapshots")
+    
     # Ovoz sozlamalari
     VOICE_TIMEOUT = 5
     VOICE_LANGUAGE = "en-US"
@@ -0,0 +1,199 @@
+# database/conversation_log.py
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+import logging
+
+from monitoring.metrics import stage_metrics
+
+logger = logging.getLogger(__name__)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+# stop() navbatga qo'yadigan belgi: paket yig'ayotgan oqimni flush_interval tugashini kutmasdan uyg'otadi
+_WAKEUP = object()
+
+class ConversationLogWriter:
+    """Suhbatlarni fon oqimida paketlab yozish (write-behind)
+
+    So'rovlar yozuvni chegaralangan navbatga qo'yadi va darhol qaytadi;
+    fon oqimi navbatni batch_size yoki flush_interval bo'yicha bitta
+    tranzaksiyada bazaga yozadi. Navbat to'lganda drop_policy qo'llanadi,
+    stop() esa qolgan yozuvlarni yozib bo'lguncha kutadi.
+    """
+
+    def __init__(self, db_manager, max_queue_size: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, drop_policy: str = DROP_NEWEST,
+                 block_timeout: float = 0.05):
+        if drop_policy not in (DROP_NEWEST, DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._atexit_registered = False
+
+        # Metrikalar
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self):
+        """Fon yozuvchi oqimini ishga tushirish"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="conversation-log-writer", daemon=True)
+            self._thread.start()
+
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def stop(self, timeout: float = 10.0):
+        """Oqimni to'xtatish va navbatdagi barcha yozuvlarni yozish"""
+        self._stop_event.set()
+        try:
+            self.queue.put_nowait(_WAKEUP)
+        except queue.Full:
+            # To'la navbatda get() baribir darhol qaytadi
+            pass
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._flush_pending()
+
+    def log(self, **record: Any) -> bool:
+        """Suhbat yozuvini navbatga qo'yish (bloklamaydi, block siyosatidan tashqari)"""
+        if self._thread is None:
+            self.start()
+
+        record.setdefault("created_at", datetime.utcnow())
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if not self._handle_full(record):
+                self.dropped += 1
+                return False
+
+        self.enqueued += 1
+        return True
+
+    def _handle_full(self, record: Dict[str, Any]) -> bool:
+        """Navbat to'lganda drop_policy bo'yicha harakat"""
+        if self.drop_policy == BLOCK:
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                return False
+
+        if self.drop_policy == DROP_OLDEST:
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+                return True
+            except queue.Full:
+                return False
+
+        return False
+
+    def _run(self):
+        """Navbatni hajm yoki vaqt bo'yicha paketlab yozish"""
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write(batch)
+
+    def _collect_batch(self) -> List[Dict[str, Any]]:
+        """batch_size ga yetguncha yoki flush_interval tugaguncha yozuvlarni yig'ish"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop_event.is_set():
+                break
+            try:
+                record = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if record is _WAKEUP:
+                break
+            batch.append(record)
+        return batch
+
+    def _flush_pending(self):
+        """Navbatda qolgan yozuvlarni darhol yozish"""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is not _WAKEUP:
+                    batch.append(record)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        """Paketni bitta tranzaksiyada yozish"""
+        start = time.perf_counter()
+        with self._flush_lock:
+            try:
+                self.db_manager.add_conversations(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Error writing {len(batch)} conversations: {e}")
+
+        elapsed = time.perf_counter() - start
+        # Paketda turli domainlar aralash - umumiy yorliq bilan
+        stage_metrics.observe("db_flush", "all", elapsed)
+
+        elapsed_ms = elapsed * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        """Navbat chuqurligi va yozish kechikishi metrikalari"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 3)
+        }
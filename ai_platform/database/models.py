@@ -1,10 +1,14 @@
 # database/models.py
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import create_engine, inspect, insert, select, Column, Integer, String, Text, DateTime, Float
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from datetime import datetime, timedelta
+import itertools
 import json
 
+from database.usage_rollups import SUM_COLUMNS, aggregate, day_start, hour_start, summarise
+
 Base = declarative_base()
 
 class User(Base):
@@ -40,11 +44,43 @@ class DomainKnowledge(Base):
     usage_count = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class UsageRollupMixin:
+    """Davr (soat/kun) va domain bo'yicha oldindan yig'ilgan suhbat statistikasi"""
+    bucket_start = Column(DateTime, primary_key=True)
+    domain = Column(String(50), primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    response_time_sum = Column(Float, nullable=False, default=0.0)
+    response_time_sum_sq = Column(Float, nullable=False, default=0.0)
+    # Javob vaqti gistogrammasi (usage_rollups.LATENCY_BUCKETS)
+    le_10ms = Column(Integer, nullable=False, default=0)
+    le_50ms = Column(Integer, nullable=False, default=0)
+    le_100ms = Column(Integer, nullable=False, default=0)
+    le_250ms = Column(Integer, nullable=False, default=0)
+    le_500ms = Column(Integer, nullable=False, default=0)
+    le_1s = Column(Integer, nullable=False, default=0)
+    le_2_5s = Column(Integer, nullable=False, default=0)
+    le_5s = Column(Integer, nullable=False, default=0)
+    le_inf = Column(Integer, nullable=False, default=0)
+
+class UsageStatsHourly(UsageRollupMixin, Base):
+    __tablename__ = "usage_stats_hourly"
+
+class UsageStatsDaily(UsageRollupMixin, Base):
+    __tablename__ = "usage_stats_daily"
+
+# Rollup jadvali va uning davr boshini hisoblash funksiyasi
+ROLLUPS = ((UsageStatsHourly, hour_start), (UsageStatsDaily, day_start))
+
 class DatabaseManager:
     def __init__(self, database_url):
         self.engine = create_engine(database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        rollups_exist = inspect(self.engine).has_table(UsageStatsDaily.__tablename__)
         Base.metadata.create_all(bind=self.engine)
+        
+        # Migratsiya: rollup jadvallari birinchi marta yaratilganda mavjud suhbatlardan to'ldiriladi
+        if not rollups_exist:
+            self.backfill_usage_rollups()
     
     def get_session(self):
         return self.SessionLocal()
@@ -61,7 +97,97 @@ class DatabaseManager:
                 response_time=response_time
             )
             session.add(conversation)
+            session.flush()
+            self._apply_rollups(session, [{
+                "domain": domain,
+                "response_time": response_time,
+                "created_at": conversation.created_at
+            }])
             session.commit()
             return conversation.id
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+    
+    def add_conversations(self, records):
+        """Ko'p suhbatni bitta tranzaksiyada yozish"""
+        if not records:
+            return
+        
+        session = self.get_session()
+        try:
+            session.execute(insert(Conversation), records)
+            # Rollup lar suhbatlar bilan bitta tranzaksiyada yangilanadi
+            self._apply_rollups(session, records)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _upsert(self, model):
+        """Dialektga mos INSERT ... ON CONFLICT konstruktori"""
+        if self.engine.dialect.name == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
+    
+    def _apply_rollups(self, session, records):
+        """Yozuvlarni soatlik va kunlik rollup larga qo'shish (hisoblagichlar atomar oshiriladi)"""
+        for model, truncate in ROLLUPS:
+            rollups = aggregate(records, truncate)
+            if not rollups:
+                continue
+            
+            rows = [dict(totals, bucket_start=bucket_start, domain=domain)
+                    for (bucket_start, domain), totals in rollups.items()]
+            stmt = self._upsert(model)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[model.bucket_start, model.domain],
+                set_={column: getattr(model, column) + getattr(stmt.excluded, column) for column in SUM_COLUMNS}
+            )
+            session.execute(stmt, rows)
+    
+    def backfill_usage_rollups(self, batch_size: int = 10000):
+        """Rollup larni mavjud suhbatlar jadvalidan to'ldirish (oqimli o'qiladi)"""
+        session = self.get_session()
+        try:
+            query = select(Conversation.domain, Conversation.response_time, Conversation.created_at)
+            batch = []
+            for domain, response_time, created_at in session.execute(query.execution_options(yield_per=batch_size)):
+                batch.append({"domain": domain, "response_time": response_time, "created_at": created_at})
+                if len(batch) >= batch_size:
+                    self._apply_rollups(session, batch)
+                    batch = []
+            self._apply_rollups(session, batch)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def get_usage_stats(self, since: datetime):
+        """since dan beri domain bo'yicha statistika (suhbatlar jadvali skanerlanmaydi)
+
+        To'liq kunlar kunlik rollup lardan, boshidagi qisman kun esa soatlik
+        rollup lardan olinadi - o'qiladigan qatorlar soni tarix hajmiga bog'liq emas.
+        """
+        first_full_day = day_start(since)
+        if first_full_day < since:
+            first_full_day += timedelta(days=1)
+        
+        def rollup_columns(model):
+            return select(model.domain, *[getattr(model, column) for column in SUM_COLUMNS])
+        
+        session = self.get_session()
+        try:
+            hourly = session.execute(rollup_columns(UsageStatsHourly).where(
+                UsageStatsHourly.bucket_start >= hour_start(since),
+                UsageStatsHourly.bucket_start < first_full_day
+            )).all()
+            daily = session.execute(rollup_columns(UsageStatsDaily).where(
+                UsageStatsDaily.bucket_start >= first_full_day
+            )).all()
+            return summarise(row._asdict() for row in itertools.chain(hourly, daily))
+        finally:
+            session.close()
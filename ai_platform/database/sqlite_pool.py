@@ -0,0 +1,95 @@
+# database/sqlite_pool.py
+import sqlite3
+import threading
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",        # o'quvchilar yozuvchini kutmaydi
+    "synchronous": "NORMAL",      # WAL bilan xavfsiz, har commitda fsync qilinmaydi
+    "temp_store": "MEMORY",
+    "cache_size": -20000,         # ~20 MB sahifa keshi
+    "mmap_size": 268435456,       # 256 MB
+    "busy_timeout": 5000,         # ms
+}
+
+class SQLiteConnectionPool:
+    """Har bir oqim uchun bitta doimiy SQLite ulanishi
+
+    Ulanishlar oqim bo'yicha qayta ishlatiladi, shuning uchun sqlite3
+    modulining tayyorlangan so'rovlar keshi (cached_statements) amalda
+    ishlaydi. Birinchi ulanishda WAL rejimi va sozlangan pragmalar
+    o'rnatiladi. Tugagan oqimlarning ulanishlari keyingi ulanish
+    ochilganda (boshqa oqimdan) yopiladi - shuning uchun pul ulanishlari
+    check_same_thread=False bilan ochiladi; har bir ulanishni baribir faqat
+    uni yaratgan oqim ishlatadi.
+    """
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict[str, object]] = None,
+                 cached_statements: int = 256, timeout: float = 30.0):
+        self.db_path = db_path
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []  # (thread, connection)
+
+    def connection(self) -> sqlite3.Connection:
+        """Joriy oqimning ulanishi (kerak bo'lsa yaratiladi)"""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.connection = conn
+        return conn
+
+    def open_dedicated(self) -> sqlite3.Connection:
+        """Puldan tashqari alohida ulanish (uzoq o'qishlar uchun, chaqiruvchi yopadi)
+
+        Oqimlar orasida ketma-ket ishlatilishi mumkin (masalan, threadpool da
+        iteratsiya qilinadigan generator), shuning uchun check_same_thread=False.
+        """
+        return self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        # Pul ulanishlari ham boshqa oqimdan yopiladi (_close_dead_threads)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = self._open()
+        with self._lock:
+            self._close_dead_threads()
+            self._connections.append((threading.current_thread(), conn))
+        return conn
+
+    def _close_dead_threads(self):
+        """Tugagan oqimlarga tegishli ulanishlarni yopish"""
+        alive = []
+        for thread, conn in self._connections:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._connections = alive
+
+    def close(self):
+        """Joriy oqim ulanishini yopish"""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            return
+
+        self._local.connection = None
+        with self._lock:
+            self._connections = [(t, c) for t, c in self._connections if c is not conn]
+        conn.close()
@@ -0,0 +1,151 @@
+# database/usage_counter.py
+import atexit
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UsageCounterBuffer:
+    """Bilimlardan foydalanish hisoblagichlarini xotirada yig'ish va paketlab yozish
+
+    Har bir javob bazaga alohida UPDATE/commit o'rniga bilim id si bo'yicha
+    xotiradagi hisoblagichni oshiradi. Fon oqimi har flush_interval da (yoki
+    max_pending ta turli bilim yig'ilganda) barcha o'zgarishlarni bitta
+    executemany UPDATE tranzaksiyasida yozadi.
+    """
+
+    def __init__(self, pool, flush_interval: float = 5.0, max_pending: int = 10000):
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: Dict[int, list] = {}  # item_id -> [hits, last_used]
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._flush_event = threading.Event()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._atexit_registered = False
+
+        # Metrikalar
+        self.recorded = 0
+        self.written = 0
+        self.failed_flushes = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def start(self):
+        """Fon yozuvchi oqimini ishga tushirish"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="usage-counter-flusher", daemon=True)
+            self._thread.start()
+
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def stop(self, timeout: float = 10.0):
+        """Oqimni to'xtatish va yig'ilgan hisoblagichlarni yozish"""
+        self._stop_event.set()
+        self._flush_event.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def record(self, item_id: int, used_at: Optional[datetime] = None):
+        """Bilimdan bir marta foydalanilganini qayd etish (bazaga yozmaydi)"""
+        if self._thread is None:
+            self.start()
+
+        used_at = used_at or datetime.now()
+        with self._lock:
+            entry = self._pending.get(item_id)
+            if entry is None:
+                self._pending[item_id] = [1, used_at]
+            else:
+                entry[0] += 1
+                if used_at > entry[1]:
+                    entry[1] = used_at
+            pending = len(self._pending)
+            self.recorded += 1
+
+        if pending >= self.max_pending:
+            self._flush_event.set()
+
+    def _run(self):
+        """Hisoblagichlarni vaqt yoki hajm bo'yicha yozish"""
+        while not self._stop_event.is_set():
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Yig'ilgan hisoblagichlarni bitta tranzaksiyada yozish (yozilgan bilimlar soni)"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            start = time.perf_counter()
+            conn = self.pool.connection()
+            try:
+                conn.executemany('''
+                    UPDATE knowledge_items
+                    SET usage_count = usage_count + ?,
+                        last_used = MAX(COALESCE(last_used, ?), ?)
+                    WHERE id = ?
+                ''', [(hits, last_used, last_used, item_id) for item_id, (hits, last_used) in pending.items()])
+                conn.commit()
+                self.written += sum(hits for hits, _ in pending.values())
+            except sqlite3.Error as e:
+                # Hisoblagichlar yo'qolmaydi - keyingi flush da qayta uriniladi
+                logger.error(f"Error flushing usage counters for {len(pending)} items: {e}")
+                conn.rollback()
+                self.failed_flushes += 1
+                self._merge_back(pending)
+                return 0
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            return len(pending)
+
+    def _merge_back(self, pending: Dict[int, list]):
+        """Yozilmagan hisoblagichlarni buferga qaytarish"""
+        with self._lock:
+            for item_id, (hits, last_used) in pending.items():
+                entry = self._pending.get(item_id)
+                if entry is None:
+                    self._pending[item_id] = [hits, last_used]
+                else:
+                    entry[0] += hits
+                    entry[1] = max(entry[1], last_used)
+
+    def stats(self) -> Dict[str, Any]:
+        """Bufer hajmi va yozish metrikalari"""
+        with self._lock:
+            pending_items = len(self._pending)
+            pending_hits = sum(hits for hits, _ in self._pending.values())
+        return {
+            "pending_items": pending_items,
+            "pending_hits": pending_hits,
+            "recorded": self.recorded,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3)
+        }
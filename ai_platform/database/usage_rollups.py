@@ -0,0 +1,89 @@
+# database/usage_rollups.py
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Javob vaqti gistogrammasi: (yuqori chegara soniyada, ustun nomi), har bir bucket alohida (kumulyativ emas)
+LATENCY_BUCKETS = (
+    (0.01, "le_10ms"),
+    (0.05, "le_50ms"),
+    (0.1, "le_100ms"),
+    (0.25, "le_250ms"),
+    (0.5, "le_500ms"),
+    (1.0, "le_1s"),
+    (2.5, "le_2_5s"),
+    (5.0, "le_5s"),
+    (math.inf, "le_inf"),
+)
+HISTOGRAM_COLUMNS = tuple(name for _, name in LATENCY_BUCKETS)
+SUM_COLUMNS = ("request_count", "response_time_sum", "response_time_sum_sq") + HISTOGRAM_COLUMNS
+UNKNOWN_DOMAIN = "unknown"
+
+def hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def latency_bucket(response_time: float) -> str:
+    """Javob vaqti tushadigan gistogramma ustuni"""
+    for upper_bound, name in LATENCY_BUCKETS:
+        if response_time <= upper_bound:
+            return name
+    return HISTOGRAM_COLUMNS[-1]
+
+def aggregate(records: Iterable[Dict[str, Any]], truncate) -> Dict[Tuple[datetime, str], Dict[str, float]]:
+    """Suhbat yozuvlarini (davr boshi, domain) bo'yicha yig'indilarga aylantirish"""
+    rollups = {}
+    for record in records:
+        created_at = record.get("created_at") or datetime.utcnow()
+        key = (truncate(created_at), record.get("domain") or UNKNOWN_DOMAIN)
+        totals = rollups.get(key)
+        if totals is None:
+            totals = rollups[key] = dict.fromkeys(SUM_COLUMNS, 0)
+
+        response_time = record.get("response_time") or 0.0
+        totals["request_count"] += 1
+        totals["response_time_sum"] += response_time
+        totals["response_time_sum_sq"] += response_time * response_time
+        totals[latency_bucket(response_time)] += 1
+    return rollups
+
+def histogram_quantile(histogram: List[int], count: int, quantile: float) -> Optional[float]:
+    """Gistogrammadan taxminiy kvantil (bucket yuqori chegarasi)"""
+    if not count:
+        return None
+
+    target = quantile * count
+    cumulative = 0
+    for (upper_bound, _), bucket_count in zip(LATENCY_BUCKETS, histogram):
+        cumulative += bucket_count
+        if cumulative >= target:
+            # +Inf bucket uchun oxirgi chekli chegara qaytariladi
+            return upper_bound if math.isfinite(upper_bound) else LATENCY_BUCKETS[-2][0]
+    return LATENCY_BUCKETS[-2][0]
+
+def summarise(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rollup qatorlarini domain bo'yicha birlashtirib, o'rtacha, og'ish va kvantillarni hisoblash"""
+    totals = {}
+    for row in rows:
+        domain_totals = totals.setdefault(row["domain"], dict.fromkeys(SUM_COLUMNS, 0))
+        for column in SUM_COLUMNS:
+            domain_totals[column] += row[column] or 0
+
+    stats = []
+    for domain, domain_totals in sorted(totals.items()):
+        count = domain_totals["request_count"]
+        mean = domain_totals["response_time_sum"] / count if count else 0.0
+        variance = domain_totals["response_time_sum_sq"] / count - mean * mean if count else 0.0
+        histogram = [domain_totals[column] for column in HISTOGRAM_COLUMNS]
+        stats.append({
+            "domain": domain,
+            "request_count": count,
+            "average_response_time": mean,
+            "stddev_response_time": math.sqrt(max(variance, 0.0)),
+            "p50_response_time": histogram_quantile(histogram, count, 0.5),
+            "p95_response_time": histogram_quantile(histogram, count, 0.95),
+            "latency_histogram": dict(zip(HISTOGRAM_COLUMNS, histogram))
+        })
+    return stats
@@ -11,11 +11,8 @@ import os
 # Path ni sozlash
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Og'ir quyi tizimlar (API, ovoz, 3D, NLP) faqat kerakli buyruq ichida yuklanadi
 from cli.commands import cli
-from api.server import AIPlatformAPI
-from visual.avatar import Avatar3D
-from voice.speech_recognition import VoiceAssistant
-from ai.nlp_processor import NLPProcessor
 from config.settings import settings
 
 def main():
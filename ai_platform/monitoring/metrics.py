@@ -0,0 +1,120 @@
+# monitoring/metrics.py
+import bisect
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+# Bosqich kechikishi bucketlari (soniya): mikrosoniyali preprocess dan soniyali DB yozuvigacha
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+# Chegaradan ortiq domainlar shu yorliq ostida yig'iladi (foydalanuvchi kiritgan domain nomlari cheksiz bo'lishi mumkin)
+OVERFLOW_DOMAIN = "other"
+# Prometheus matn formati (Starlette text/ turlariga "; charset=utf-8" ni o'zi qo'shadi)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+class StageMetrics:
+    """(bosqich, domain) bo'yicha kechikish gistogrammalari va Prometheus matn formati
+
+    observe() bitta bisect, lug'at murojaati va qulf ostidagi ikki qo'shishdan
+    iborat, shuning uchun issiq yo'lda doimiy yoqilgan holda qoldirish mumkin.
+    enabled=False bo'lsa, observe() darhol qaytadi.
+    """
+
+    def __init__(self, name: str = "ai_platform_stage_duration_seconds",
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, max_domains: int = 100,
+                 enabled: bool = True):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self.max_domains = max_domains
+        self.enabled = enabled
+
+        # (stage, domain) -> [bucket hisoblagichlari..., +Inf], yig'indi esa alohida
+        self._counts: Dict[Tuple[str, str], List[int]] = {}
+        self._sums: Dict[Tuple[str, str], float] = {}
+        self._domains = set()
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, domain: str, seconds: float):
+        """Bosqich davomiyligini qayd etish"""
+        if not self.enabled:
+            return
+
+        bucket = bisect.bisect_left(self.buckets, seconds)
+        key = (stage, domain)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                domain = self._label_domain(domain)
+                key = (stage, domain)
+                counts = self._counts.get(key)
+                if counts is None:
+                    counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                    self._sums[key] = 0.0
+            counts[bucket] += 1
+            self._sums[key] += seconds
+
+    def _label_domain(self, domain: str) -> str:
+        """Domain yorlig'i (max_domains dan keyingi yangi domainlar OVERFLOW_DOMAIN ga tushadi)"""
+        if domain in self._domains:
+            return domain
+        if len(self._domains) < self.max_domains:
+            self._domains.add(domain)
+            return domain
+        return OVERFLOW_DOMAIN
+
+    def snapshot(self) -> Dict[Tuple[str, str], Tuple[List[int], float]]:
+        """Joriy hisoblagichlar nusxasi: (stage, domain) -> (bucketlar, yig'indi)"""
+        with self._lock:
+            return {key: (list(counts), self._sums[key]) for key, counts in self._counts.items()}
+
+    def quantile(self, stage: str, domain: str, quantile: float) -> Optional[float]:
+        """Gistogrammadan taxminiy kvantil (bucket yuqori chegarasi)"""
+        entry = self.snapshot().get((stage, domain))
+        if entry is None:
+            return None
+
+        counts, _ = entry
+        target = quantile * sum(counts)
+        cumulative = 0
+        for upper_bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            if cumulative >= target:
+                return upper_bound if math.isfinite(upper_bound) else self.buckets[-1]
+        return self.buckets[-1]
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+            self._domains.clear()
+
+    def render(self) -> str:
+        """Prometheus matn formati (kumulyativ bucketlar, _sum va _count)"""
+        lines = [
+            f"# HELP {self.name} Duration of request processing stages in seconds",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [format_float(bound) for bound in self.buckets] + ["+Inf"]
+        for (stage, domain), (counts, total) in sorted(self.snapshot().items()):
+            labels = f'stage="{escape_label(stage)}",domain="{escape_label(domain)}"'
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {format_float(total)}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+def format_float(value: float) -> str:
+    return repr(float(value))
+
+def escape_label(value: str) -> str:
+    """Prometheus yorliq qiymatini ekranlash"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+# Ilova bo'ylab umumiy registr (NLPProcessor, API va fon yozuvchilari shu yerga yozadi)
+stage_metrics = StageMetrics(enabled=settings.METRICS_ENABLED, max_domains=settings.METRICS_MAX_DOMAINS)
@@ -0,0 +1,178 @@
+# monitoring/profiler.py
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+# Bo'sh turgan oqimlar (navbat/hodisa kutish, event loop selektori, pool workeri vazifa kutishi) - bunday stacklar yozilmaydi
+IDLE_FRAMES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"), ("thread.py", "_worker"),
+}
+# Oqim nomlaridagi tartib raqamlari (ThreadPoolExecutor-0_3 -> ThreadPoolExecutor)
+THREAD_NUMBER = re.compile(r"[-_]\d+")
+
+class RequestProfiler:
+    """Tanlangan so'rovlar davomida oqimlar stacklaridan namuna oluvchi profiler
+
+    Profillanayotgan so'rov bajarilayotganda fon oqimi har interval soniyada
+    sys._current_frames() dan barcha band oqimlar stacklarini oladi va ularni
+    collapsed formatda ("oqim;modul:funksiya;... soni", flamegraph.pl va
+    speedscope o'qiydi) yig'adi. Namunalar jarayon bo'yicha olinadi: bir vaqtda
+    bajarilayotgan boshqa so'rovlar ishi ham profilga tushadi.
+
+    So'rovlar arm() bilan yoqiladi (keyingi N ta so'rov, har K tadan bittasi)
+    yoki alohida so'rov sarlavha orqali tanlanadi. Namuna oluvchi oqim birinchi
+    profillangan so'rovda ishga tushadi va faol so'rov yo'q paytda kutadi.
+    Interval dan qisqa so'rov birorta namunaga tushmasligi mumkin - bunday
+    so'rovlar unsampled_requests da hisoblanadi.
+    """
+
+    def __init__(self, interval: float = 0.005, max_stacks: int = 10000, max_depth: int = 128):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+
+        # Rejalashtirish (event loop oqimida o'zgaradi)
+        self.remaining = 0
+        self.sample_every = 1
+        self._seen = 0
+
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self.profiled_requests = 0
+        self.unsampled_requests = 0
+        # Namuna olish raundlari (faqat namuna oluvchi oqim oshiradi)
+        self._rounds_started = 0
+        self._rounds_completed = 0
+
+        self._stacks_lock = threading.Lock()
+        self._active = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def arm(self, requests: int, sample_every: int = 1):
+        """Keyingi so'rovlardan har sample_every tadan bittasini, jami requests tasini profillash"""
+        self.remaining = max(0, requests)
+        self.sample_every = max(1, sample_every)
+        self._seen = 0
+
+    def disarm(self):
+        self.remaining = 0
+
+    def should_profile(self) -> bool:
+        """Joriy so'rov profillanadimi (arm() bilan rejalashtirilgan)"""
+        if self.remaining <= 0:
+            return False
+        self._seen += 1
+        if self._seen % self.sample_every:
+            return False
+        self.remaining -= 1
+        return True
+
+    @contextmanager
+    def profiling(self):
+        """Blok bajarilayotganda namuna olish"""
+        with self._condition:
+            self._active += 1
+            self.profiled_requests += 1
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            # Shundan keyin boshlangan raund tugagan bo'lsa, so'rov namunaga tushgan
+            first_round = self._rounds_started
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                if self._rounds_completed <= first_round:
+                    self.unsampled_requests += 1
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._condition:
+                while self._active == 0 and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                self._rounds_started += 1
+            self._sample(own_id)
+            with self._condition:
+                self._rounds_completed += 1
+            time.sleep(self.interval)
+
+    def _sample(self, own_id: int):
+        names = {thread.ident: THREAD_NUMBER.sub("", thread.name) for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                continue
+
+            frames = []
+            while frame is not None and len(frames) < self.max_depth:
+                code = frame.f_code
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                frames.append(f"{module}:{code.co_name}".replace(";", ":").replace(" ", "_"))
+                frame = frame.f_back
+            frames.append(names.get(thread_id, "thread").replace(";", ":").replace(" ", "_"))
+            stack = ";".join(reversed(frames))
+
+            with self._stacks_lock:
+                self.samples += 1
+                if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                    self.stacks[stack] += 1
+                else:
+                    self.dropped += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacklar (har qatorda "stack soni", ko'pdan kamga)"""
+        with self._stacks_lock:
+            stacks = self.stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def reset(self):
+        with self._stacks_lock:
+            self.stacks = Counter()
+            self.samples = 0
+            self.dropped = 0
+        self.profiled_requests = 0
+        self.unsampled_requests = 0
+
+    def stop(self):
+        """Namuna oluvchi oqimni to'xtatish"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "remaining": self.remaining,
+            "sample_every": self.sample_every,
+            "active": self._active,
+            "profiled_requests": self.profiled_requests,
+            "unsampled_requests": self.unsampled_requests,
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "dropped_samples": self.dropped,
+            "interval": self.interval
+        }
+
+# Ilova bo'ylab umumiy profiler (faqat PROFILING_ENABLED bo'lsa API ga ulanadi)
+request_profiler = RequestProfiler(interval=settings.PROFILING_INTERVAL, max_stacks=settings.PROFILING_MAX_STACKS)
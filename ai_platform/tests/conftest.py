@@ -0,0 +1,34 @@
+# tests/conftest.py
+import importlib
+import sys
+
+import pytest
+
+from config.settings import settings
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Nisbiy baza fayllari vaqtinchalik katalogda yaratiladi, indeks snapshotlari o'chirilgan"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "INDEX_SNAPSHOTS_ENABLED", False)
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'ai_platform.db'}")
+    return tmp_path
+
+@pytest.fixture
+def domain_manager(workdir):
+    from ai.domain_knowledge import DomainKnowledgeManager
+
+    manager = DomainKnowledgeManager(str(workdir / "domain_knowledge.db"))
+    yield manager
+    manager.usage.stop()
+    manager.pool.close()
+
+@pytest.fixture
+def routes(workdir):
+    """api.routes moduli yangi global instancelar bilan (har bir test uchun qayta import qilinadi)"""
+    sys.modules.pop("api.routes", None)
+    module = importlib.import_module("api.routes")
+    yield module
+    module.domain_manager.usage.stop()
+    module.domain_manager.pool.close()
+    sys.modules.pop("api.routes", None)
@@ -0,0 +1,59 @@
+# tests/test_answer_cache.py
+import time
+
+from ai.answer_cache import MISS, AnswerCache
+from ai.nlp_processor import NLPProcessor
+
+def test_entry_expires_after_ttl():
+    cache = AnswerCache(ttl=0.05)
+    cache.put("legal", "contract", "answer", cache.generation("legal"))
+    assert cache.get("legal", "contract") == "answer"
+
+    time.sleep(0.1)
+
+    assert cache.get("legal", "contract") is None
+    assert cache.stats()["expirations"] == 1 and cache.stats()["size"] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(max_size=2)
+    for key in ("a", "b"):
+        cache.put("legal", key, key.upper(), 0)
+    # "a" ishlatildi - eng eski foydalanilgan "b"
+    assert cache.get("legal", "a") == "A"
+
+    cache.put("legal", "c", "C", 0)
+
+    assert cache.get("legal", "b") is None
+    assert cache.get("legal", "a") == "A" and cache.get("legal", "c") == "C"
+    assert cache.stats()["evictions"] == 1
+
+def test_invalidate_drops_only_that_domain():
+    cache = AnswerCache()
+    cache.put("legal", "q", "legal answer", cache.generation("legal"))
+    cache.put("medical", "q", MISS, cache.generation("medical"))
+    stale_generation = cache.generation("legal")
+
+    cache.invalidate("legal")
+
+    assert cache.get("legal", "q") is None
+    assert cache.get("medical", "q") is MISS
+    # Invalidatsiyadan oldin boshlangan hisoblash natijasi keshga yozilmaydi
+    cache.put("legal", "q", "stale answer", stale_generation)
+    assert cache.get("legal", "q") is None
+
+def test_processor_drops_cached_answer_when_knowledge_is_added(workdir):
+    processor = NLPProcessor()
+    processor.load_domain_knowledge({"legal": [
+        {"question": "What is a breach of contract?", "answer": "Failure to meet obligations."}
+    ]})
+    question = "What is a breach of contract?"
+
+    processor.find_best_match(question, "legal")
+    processor.find_best_match(question, "legal")
+    assert processor.answer_cache_info()["hits"] == 1
+
+    processor.add_knowledge("legal", question, "A failure to perform a contractual duty.")
+
+    _, answer, _ = processor.find_best_match(question, "legal")
+    assert answer == "A failure to perform a contractual duty."
+    assert processor.answer_cache_info()["hits"] == 1
@@ -0,0 +1,79 @@
+# tests/test_bench_suite.py
+import json
+import sys
+
+import pytest
+
+from benchmarks import bench_suite
+
+CONFIG = {"engine": "tfidf", "vocab": 5000, "queries": 1000, "batch": 100, "adds": 200}
+
+def make_results(sizes=("1000",), p50_ms=1.0, qps=1000.0):
+    return {
+        "config": dict(CONFIG),
+        "sizes": {
+            size: {"find_best_answer": {"p50_ms": p50_ms, "batch_qps": qps}}
+            for size in sizes
+        }
+    }
+
+def test_compare_passes_within_tolerance():
+    assert bench_suite.compare(make_results(p50_ms=1.1), make_results(), 0.25) == []
+
+def test_compare_reports_regressions_in_both_directions():
+    regressions = bench_suite.compare(make_results(p50_ms=2.0, qps=500.0), make_results(), 0.25)
+    assert regressions == ["1000/find_best_answer/batch_qps", "1000/find_best_answer/p50_ms"]
+
+def test_compare_fails_without_common_metrics():
+    with pytest.raises(ValueError, match="no metrics in common"):
+        bench_suite.compare(make_results(sizes=("5000",)), make_results(sizes=("1000",)), 0.25)
+
+def test_compare_reports_metrics_missing_from_current_run():
+    current = make_results(sizes=("1000",))
+    del current["sizes"]["1000"]["find_best_answer"]["batch_qps"]
+    baseline = make_results(sizes=("1000", "10000"))
+
+    regressions = bench_suite.compare(current, baseline, 0.25)
+
+    assert regressions == [
+        "1000/find_best_answer/batch_qps",
+        "10000/find_best_answer/batch_qps",
+        "10000/find_best_answer/p50_ms",
+    ]
+
+def test_compare_rejects_config_mismatch():
+    current = make_results()
+    current["config"]["engine"] = "bm25"
+
+    with pytest.raises(ValueError, match="differs from baseline"):
+        bench_suite.compare(current, make_results(), 0.25)
+    assert bench_suite.compare(current, make_results(), 0.25, allow_config_mismatch=True) == []
+
+def test_main_refuses_to_overwrite_baseline(tmp_path, monkeypatch):
+    baseline = tmp_path / "suite.json"
+    baseline.write_text("{}", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["bench_suite.py", "--baseline", str(baseline), "--output", str(baseline)])
+
+    with pytest.raises(SystemExit) as excinfo:
+        bench_suite.main()
+
+    assert excinfo.value.code == 2
+    assert baseline.read_text(encoding="utf-8") == "{}"
+
+def test_default_output_is_not_the_committed_baseline():
+    assert not bench_suite.DEFAULT_OUTPUT.endswith("suite.json")
+
+def test_main_exits_on_config_mismatch(tmp_path, monkeypatch):
+    current = make_results()
+    current["config"]["vocab"] = 100
+    paths = {}
+    for name, results in (("current", current), ("baseline", make_results())):
+        paths[name] = tmp_path / f"{name}.json"
+        paths[name].write_text(json.dumps(results), encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["bench_suite.py", "--input", str(paths["current"]),
+                                      "--baseline", str(paths["baseline"])])
+
+    with pytest.raises(SystemExit) as excinfo:
+        bench_suite.main()
+
+    assert excinfo.value.code == 2
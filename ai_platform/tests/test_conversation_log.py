@@ -0,0 +1,76 @@
+# tests/test_conversation_log.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from config.settings import settings
+from database.conversation_log import BLOCK, DROP_NEWEST, DROP_OLDEST, ConversationLogWriter
+from database.models import DatabaseManager
+
+class GatedDatabase:
+    """Birinchi paketni yozishda release() gacha kutadigan db_manager"""
+
+    def __init__(self):
+        self.batches = []
+        self.writing = threading.Event()
+        self.released = threading.Event()
+
+    def add_conversations(self, records):
+        self.writing.set()
+        self.released.wait(10)
+        self.batches.append([record["question"] for record in records])
+
+    def release(self):
+        self.released.set()
+
+def fill_queue(writer, db):
+    """Fon oqimi birinchi yozuvda to'xtab turadi, navbat esa to'ladi"""
+    assert writer.log(question="0")
+    assert db.writing.wait(10)
+    assert writer.log(question="1")
+    assert writer.log(question="2")
+
+@pytest.mark.parametrize("drop_policy, accepted, written", [
+    (DROP_NEWEST, False, ["0", "1", "2"]),
+    (DROP_OLDEST, True, ["0", "2", "3"]),
+    (BLOCK, False, ["0", "1", "2"]),
+])
+def test_full_queue_applies_drop_policy(drop_policy, accepted, written):
+    db = GatedDatabase()
+    writer = ConversationLogWriter(db, max_queue_size=2, batch_size=1, flush_interval=0.01,
+                                   drop_policy=drop_policy, block_timeout=0.01)
+    fill_queue(writer, db)
+
+    assert writer.log(question="3") is accepted
+    assert writer.stats()["dropped"] == 1
+
+    db.release()
+    writer.stop()
+    assert [question for batch in db.batches for question in batch] == written
+    assert writer.stats()["written"] == 3
+
+def test_unknown_drop_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ConversationLogWriter(GatedDatabase(), drop_policy="drop_random")
+
+def test_stop_flushes_queued_conversations(workdir):
+    db_manager = DatabaseManager(settings.DATABASE_URL)
+    # Intervalli va hajmli flush ishga tushmaydi - yozuvlar faqat stop() da yoziladi
+    writer = ConversationLogWriter(db_manager, batch_size=100, flush_interval=60)
+    for i in range(5):
+        writer.log(user_id=1, session_id="s", question=f"q{i}", answer="a", domain="legal", response_time=0.02)
+    # Fon oqimi yozuvlarni navbatdan olib, flush_interval tugashini kutayotgan paketga yig'adi
+    deadline = time.monotonic() + 10
+    while writer.queue.qsize() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    start = time.monotonic()
+    writer.stop()
+    assert time.monotonic() - start < 5
+
+    stats = writer.stats()
+    assert stats["written"] == 5 and stats["queue_depth"] == 0 and stats["dropped"] == 0
+    usage = db_manager.get_usage_stats(datetime.utcnow() - timedelta(days=1))
+    assert [(row["domain"], row["request_count"]) for row in usage] == [("legal", 5)]
@@ -0,0 +1,122 @@
+# tests/test_domain_knowledge.py
+import json
+import time
+
+import pytest
+
+def write_json(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+def test_import_creates_empty_domains(domain_manager, workdir):
+    file_path = write_json(workdir / "import.json", {
+        "finance": [],
+        "legal": [{"question": "What is a tort?", "answer": "A civil wrong."}]
+    })
+
+    result = domain_manager.import_knowledge(file_path)
+
+    assert result["domains"] == ["finance", "legal"]
+    assert result["items"] == 1
+    stats = domain_manager.get_domain_stats()
+    assert stats["finance"]["knowledge_count"] == 0
+    assert domain_manager.get_knowledge("finance") == []
+
+def test_import_skips_records_without_question_or_answer(domain_manager, workdir):
+    file_path = write_json(workdir / "import.json", {
+        "science": [
+            {"question": "What is an atom?", "answer": "The smallest unit of matter."},
+            {"question": None, "answer": "Orphan answer."},
+            {"question": "What is a cell?", "answer": None},
+            {"answer": "Missing question."},
+            None,
+            "not a record",
+            {"question": "What is energy?", "answer": "The capacity to do work."}
+        ]
+    })
+    progress = []
+
+    result = domain_manager.import_knowledge(file_path, batch_size=1, progress_callback=progress.append)
+
+    assert result["items"] == 2
+    assert result["skipped"] == 5
+    assert progress[-1]["skipped"] == 5
+    questions = {item["question"] for item in domain_manager.get_knowledge("science")}
+    assert questions == {"What is an atom?", "What is energy?"}
+
+def test_import_ndjson_skips_null_fields(domain_manager, workdir):
+    file_path = workdir / "import.ndjson"
+    file_path.write_text(
+        json.dumps({"domain": "science", "question": "What is an atom?", "answer": "Matter."}) + "\n" +
+        json.dumps({"domain": "science", "question": "What is a cell?", "answer": None}) + "\n",
+        encoding="utf-8"
+    )
+
+    result = domain_manager.import_knowledge(str(file_path))
+
+    assert (result["items"], result["skipped"]) == (1, 1)
+
+def test_add_knowledge_returns_row_id(domain_manager):
+    item_id = domain_manager.add_knowledge("legal", "What is a tort?", "A civil wrong.")
+    assert isinstance(item_id, int)
+
+    # Mavjud savol yangilanadi - id o'zgarmaydi
+    assert domain_manager.add_knowledge("legal", "What is a tort?", "A wrongful act.") == item_id
+    assert domain_manager.add_knowledge("missing", "What is a tort?", "A civil wrong.") is None
+
+def test_fts_scores_are_normalised_to_best_match(domain_manager):
+    assert domain_manager.fts_enabled
+    domain_manager.add_knowledge("legal", "What is a contract?", "An agreement between parties.")
+
+    results = domain_manager.search_knowledge("contract", None, 10)
+
+    assert len(results) >= 2
+    assert all(result["engine"] == "fts5" for result in results)
+    assert results[0]["score"] == 1.0
+    assert all(0.0 < result["score"] <= 1.0 for result in results)
+    # Tartib xom bm25 bo'yicha, baho esa unga proporsional
+    for result in results:
+        assert result["score"] * results[0]["bm25"] == pytest.approx(result["bm25"])
+
+def usage_counts(domain_manager, domain_name):
+    return {item["question"]: item["usage_count"] for item in domain_manager.get_knowledge(domain_name)}
+
+def test_usage_counters_are_written_in_one_batch(domain_manager):
+    domain_manager.add_domain("finance")
+    first = domain_manager.add_knowledge("finance", "What is a bond?", "A debt security.")
+    second = domain_manager.add_knowledge("finance", "What is a stock?", "A share of ownership.")
+    for item_id in (first, second, first, first):
+        domain_manager.usage.record(item_id)
+
+    # Hisoblagichlar flush gacha faqat xotirada
+    assert usage_counts(domain_manager, "finance") == {"What is a bond?": 0, "What is a stock?": 0}
+
+    assert domain_manager.usage.flush() == 2
+    assert usage_counts(domain_manager, "finance") == {"What is a bond?": 3, "What is a stock?": 1}
+    assert domain_manager.get_domain_stats()["finance"]["total_usage"] == 4
+    stats = domain_manager.usage.stats()
+    assert stats["recorded"] == 4 and stats["written"] == 4 and stats["flushes"] == 1
+
+def test_usage_flusher_delivers_when_max_pending_is_reached(domain_manager):
+    domain_manager.usage.flush_interval = 60
+    domain_manager.usage.max_pending = 2
+    domain_manager.add_domain("finance")
+    first = domain_manager.add_knowledge("finance", "What is a bond?", "A debt security.")
+    second = domain_manager.add_knowledge("finance", "What is a stock?", "A share of ownership.")
+
+    domain_manager.usage.record(first)
+    domain_manager.usage.record(second)
+
+    deadline = time.monotonic() + 10
+    while domain_manager.usage.written < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert usage_counts(domain_manager, "finance") == {"What is a bond?": 1, "What is a stock?": 1}
+
+def test_usage_stop_flushes_pending_counters(domain_manager):
+    domain_manager.add_domain("finance")
+    item_id = domain_manager.add_knowledge("finance", "What is a bond?", "A debt security.")
+    domain_manager.usage.record(item_id)
+
+    domain_manager.usage.stop()
+
+    assert usage_counts(domain_manager, "finance") == {"What is a bond?": 1}
@@ -0,0 +1,110 @@
+# tests/test_indexing.py
+import math
+
+import pytest
+
+from ai.indexing import BM25Index, TfidfIndex
+from ai.nlp_processor import NLPProcessor
+from config.settings import settings
+
+LEGAL = [
+    {"question": "What is a breach of contract?", "answer": "Failure to meet obligations."},
+    {"question": "What should be included in a contract?", "answer": "Parties, terms and payment."},
+    {"question": "How do I register a trademark?", "answer": "File an application."}
+]
+APPENDED = {"question": "What should be included in a contract breach notice?", "answer": "The breached terms."}
+QUERIES = ["contract breach", "included in a contract", "register trademark", "breach notice"]
+
+def ranked(processor, query):
+    return [(result["question"], round(result["score"], 6)) for result in processor.find_top_answers(query, "legal")]
+
+def test_tfidf_append_scores_with_fitted_vocabulary(workdir):
+    processor = NLPProcessor()
+    processed = [processor.preprocess_text(item["question"]) for item in LEGAL]
+    index = TfidfIndex.build(LEGAL, processed)
+
+    appended = index.appended(APPENDED, processor.preprocess_text(APPENDED["question"]))
+
+    # E'lon qilingan indeks o'zgarmaydi, yangi hujjat delta matritsada
+    assert len(index) == 3 and index.delta.shape[0] == 0
+    assert len(appended) == 4 and appended.pending == 1 and appended.delta.shape[0] == 1
+    assert appended.n_docs == 4 and appended.drift() > 0
+
+    position, score = appended.best_match(processor.preprocess_text(APPENDED["question"]))
+    assert position == 3
+    assert score == pytest.approx(1.0)
+
+def test_drift_triggers_compaction_matching_full_refit(workdir, monkeypatch):
+    monkeypatch.setattr(settings, "INDEX_DRIFT_THRESHOLD", 0.0)
+    processor = NLPProcessor()
+    processor.load_domain_knowledge({"legal": LEGAL})
+    lineage = processor.indexes["legal"].lineage
+
+    processor.add_knowledge("legal", APPENDED["question"], APPENDED["answer"])
+    compaction = processor._compactions.get("legal")
+    if compaction is not None:
+        compaction.join(timeout=10)
+
+    compacted = processor.indexes["legal"]
+    assert compacted.pending == 0 and len(compacted) == 4
+    assert compacted.lineage != lineage
+
+    refit = NLPProcessor()
+    refit.load_domain_knowledge({"legal": LEGAL + [APPENDED]})
+    for query in QUERIES:
+        assert ranked(processor, query) == ranked(refit, query)
+
+def bm25_raw(query, doc, docs, avgdl, k1=1.5, b=0.75):
+    """Qo'lda hisoblangan BM25 bahosi: sum(idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)))"""
+    n_docs = len(docs)
+    score = 0.0
+    for term in set(query):
+        tf = doc.count(term)
+        if not tf:
+            continue
+        doc_freq = sum(1 for tokens in docs if term in tokens)
+        idf = math.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avgdl))
+    return score
+
+BM25_DOCS = ["contract breach", "contract payment terms", "trademark register"]
+
+def test_bm25_scores_match_hand_computed_values(workdir):
+    docs = [text.split() for text in BM25_DOCS]
+    index = BM25Index.build([{"question": text} for text in BM25_DOCS], BM25_DOCS)
+    avgdl = sum(map(len, docs)) / len(docs)
+
+    query = "breach contract".split()
+    results = index.search(" ".join(query), 3)
+
+    assert [position for position, _ in results] == [0, 1]
+    for position, score in results:
+        expected = bm25_raw(query, docs[position], docs, avgdl) / bm25_raw(query, query, docs, avgdl)
+        assert score == pytest.approx(expected, rel=1e-5)
+    # So'rovning o'ziga teng hujjat 1.0 oladi
+    assert results[0][1] == pytest.approx(1.0)
+
+def test_bm25_delta_postings_use_current_statistics(workdir):
+    docs = [text.split() for text in BM25_DOCS]
+    index = BM25Index.build([{"question": text} for text in BM25_DOCS], BM25_DOCS)
+    fitted_avgdl = sum(map(len, docs)) / len(docs)
+
+    appended_text = "breach notice breach contract"
+    appended = index.appended({"question": appended_text}, appended_text)
+    all_docs = docs + [appended_text.split()]
+    current_avgdl = sum(map(len, all_docs)) / len(all_docs)
+
+    assert appended.pending == 1 and len(index) == 3
+    assert appended.find_question(appended_text) == 3
+
+    query = "breach notice".split()
+    results = dict(appended.search(" ".join(query), 4))
+    assert set(results) == {0, 3}
+    assert max(results, key=results.get) == 3
+
+    # Qurilishdagi postinglar fit qilingan avgdl bilan, delta postinglar va
+    # IDF esa joriy hujjatlar soni va uzunliklari bilan baholanadi
+    query_self_score = bm25_raw(query, query, all_docs, current_avgdl)
+    for position, avgdl in ((0, fitted_avgdl), (3, current_avgdl)):
+        expected = bm25_raw(query, all_docs[position], all_docs, avgdl) / query_self_score
+        assert results[position] == pytest.approx(min(expected, 1.0), rel=1e-5)
@@ -0,0 +1,38 @@
+# tests/test_metrics.py
+from monitoring.metrics import OVERFLOW_DOMAIN, StageMetrics
+
+def test_render_writes_cumulative_prometheus_histogram():
+    metrics = StageMetrics(name="stage_seconds", buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 2.0):
+        metrics.observe("similarity", "legal", seconds)
+    metrics.observe("db_write", 'le"gal\n', 0.01)
+
+    assert metrics.render().splitlines() == [
+        "# HELP stage_seconds Duration of request processing stages in seconds",
+        "# TYPE stage_seconds histogram",
+        'stage_seconds_bucket{stage="db_write",domain="le\\"gal\\n",le="0.1"} 1',
+        'stage_seconds_bucket{stage="db_write",domain="le\\"gal\\n",le="1.0"} 1',
+        'stage_seconds_bucket{stage="db_write",domain="le\\"gal\\n",le="+Inf"} 1',
+        'stage_seconds_sum{stage="db_write",domain="le\\"gal\\n"} 0.01',
+        'stage_seconds_count{stage="db_write",domain="le\\"gal\\n"} 1',
+        'stage_seconds_bucket{stage="similarity",domain="legal",le="0.1"} 1',
+        'stage_seconds_bucket{stage="similarity",domain="legal",le="1.0"} 3',
+        'stage_seconds_bucket{stage="similarity",domain="legal",le="+Inf"} 4',
+        'stage_seconds_sum{stage="similarity",domain="legal"} 3.05',
+        'stage_seconds_count{stage="similarity",domain="legal"} 4',
+    ]
+
+def test_domains_over_limit_share_overflow_label():
+    metrics = StageMetrics(max_domains=1)
+    metrics.observe("request", "legal", 0.01)
+    metrics.observe("request", "medical", 0.01)
+    metrics.observe("request", "education", 0.01)
+
+    assert set(metrics.snapshot()) == {("request", "legal"), ("request", OVERFLOW_DOMAIN)}
+    assert metrics.snapshot()[("request", OVERFLOW_DOMAIN)][0][-1] == 0
+    assert sum(metrics.snapshot()[("request", OVERFLOW_DOMAIN)][0]) == 2
+
+def test_disabled_metrics_record_nothing():
+    metrics = StageMetrics(enabled=False)
+    metrics.observe("request", "legal", 0.01)
+    assert metrics.snapshot() == {}
@@ -0,0 +1,53 @@
+# tests/test_nlp_processor.py
+from ai.nlp_processor import NLPProcessor
+
+def make_processor():
+    processor = NLPProcessor()
+    processor.load_domain_knowledge({
+        "legal": [
+            {"question": "What is a breach of contract?", "answer": "Failure to meet obligations."},
+            {"question": "What should be included in a contract?", "answer": "Parties, terms and payment."}
+        ]
+    })
+    return processor
+
+def test_find_best_answers_empty_batch(workdir, caplog):
+    processor = make_processor()
+    assert processor.find_best_answers([], "legal") == []
+    assert processor.find_best_answers([], "missing") == []
+    assert not [record for record in caplog.records if record.levelname == "ERROR"]
+
+def test_find_best_answers_batch(workdir):
+    processor = make_processor()
+    results = processor.find_best_answers(["What is a breach of contract?", "zzz"], "legal", top_k=2)
+    assert len(results) == 2
+    answer, score = results[0][0]
+    assert answer == "Failure to meet obligations."
+    assert score > processor.CONFIDENCE_THRESHOLD
+    # Mos bilim yo'q - bitta fallback javob
+    assert len(results[1]) == 1 and results[1][0][1] == 0.0
+
+def test_reload_publishes_new_index_without_mutating_the_old_one(workdir):
+    processor = make_processor()
+    old_index = processor.indexes["legal"]
+    old_items = list(old_index.items)
+
+    processor.load_domain_knowledge({"legal": [
+        {"question": "What is a tort?", "answer": "A civil wrong."}
+    ]})
+
+    new_index = processor.indexes["legal"]
+    assert new_index is not old_index
+    assert new_index.generation > old_index.generation
+    # Eski havolani olgan o'quvchi izchil, o'zgarmagan nusxani ko'radi
+    assert old_index.items == old_items
+    assert processor.knowledge_base["legal"] is new_index.items
+
+def test_empty_domain_unpublishes_index(workdir):
+    processor = make_processor()
+    processor.load_domain_knowledge({"legal": []})
+
+    assert "legal" not in processor.indexes
+    assert processor.knowledge_base["legal"] == []
+    answer, confidence = processor.find_best_answer("What is a breach of contract?", "legal")
+    assert (answer, confidence) == ("No knowledge available for this domain.", 0.0)
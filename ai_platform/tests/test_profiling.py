@@ -0,0 +1,66 @@
+# tests/test_profiling.py
+import asyncio
+import time
+
+from api.profiling import ProfilingMiddleware, authorized
+from config.settings import settings
+from monitoring.profiler import RequestProfiler
+
+async def call(app, headers=()):
+    scope = {"type": "http", "path": "/api/chat", "headers": [(k.encode(), v.encode()) for k, v in headers]}
+    await app(scope, None, None)
+
+def test_empty_token_never_authorizes():
+    assert not authorized("", "")
+    assert not authorized("anything", "")
+    assert not authorized("wrong", "secret")
+    assert authorized("secret", "secret")
+
+def test_header_requires_configured_token():
+    profiler = RequestProfiler(interval=0.001)
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+
+    async def scenario():
+        await call(ProfilingMiddleware(app, profiler, token=""), [("x-profile", "1")])
+        await call(ProfilingMiddleware(app, profiler, token="secret"), [("x-profile", "1")])
+        await call(ProfilingMiddleware(app, profiler, token="secret"), [("x-profile", "secret")])
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        profiler.stop()
+    assert len(calls) == 3
+    assert profiler.profiled_requests == 1
+
+def test_short_requests_are_reported_as_unsampled():
+    profiler = RequestProfiler(interval=1.0)
+    try:
+        # Namuna oluvchi oqim birinchi raunddan keyin 1 s uxlaydi - keyingi so'rovlar namunaga tushmaydi
+        with profiler.profiling():
+            time.sleep(0.2)
+        for _ in range(2):
+            with profiler.profiling():
+                pass
+    finally:
+        profiler.stop()
+
+    stats = profiler.stats()
+    assert stats["profiled_requests"] == 3
+    assert stats["unsampled_requests"] == 2
+    assert stats["samples"] > 0
+
+def test_profiling_not_installed_without_token(workdir, monkeypatch):
+    from api.server import AIPlatformAPI
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "")
+    api = AIPlatformAPI()
+    assert not any(middleware.cls is ProfilingMiddleware for middleware in api.app.user_middleware)
+    assert not any(getattr(route, "path", "").startswith("/admin/profile") for route in api.app.routes)
+
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    api = AIPlatformAPI()
+    assert any(middleware.cls is ProfilingMiddleware for middleware in api.app.user_middleware)
@@ -0,0 +1,29 @@
+# tests/test_replay.py
+import json
+import os
+
+from benchmarks.replay import absolute_source, read_source
+
+def test_absolute_source_resolves_relative_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert absolute_source("conversations.ndjson") == str(tmp_path / "conversations.ndjson")
+    assert absolute_source("sqlite:///./ai_platform.db") == f"sqlite:///{tmp_path / 'ai_platform.db'}"
+    assert absolute_source("sqlite:////var/data/app.db") == "sqlite:////var/data/app.db"
+    assert absolute_source("sqlite://") == "sqlite://"
+    assert absolute_source("postgresql://user:secret@db/app") == "postgresql://user:secret@db/app"
+
+def test_resolved_source_is_readable_after_chdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    record = {"domain": "legal", "question": "What is a tort?", "session_id": "s1",
+              "created_at": "2026-01-01T00:00:00"}
+    (tmp_path / "conversations.ndjson").write_text(json.dumps(record) + "\n", encoding="utf-8")
+
+    source = absolute_source("conversations.ndjson")
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    # Nishon ishchi katalogga o'tgandan keyin yozuvlar o'qiladi (lazy generator)
+    records = read_source(source)
+    os.chdir(workdir)
+
+    assert list(records) == [record]
@@ -0,0 +1,57 @@
+# tests/test_request_coalescer.py
+import asyncio
+
+from api.request_coalescer import RequestCoalescer, question_key
+
+def test_concurrent_identical_requests_share_one_call():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def scenario():
+        same = await asyncio.gather(*(coalescer.run("a", compute, 1) for _ in range(5)))
+        other = await coalescer.run("b", compute, 2)
+        again = await coalescer.run("a", compute, 3)
+        return same, other, again
+
+    same, other, again = asyncio.run(scenario())
+
+    assert same == [2] * 5
+    # Natijalar keshlanmaydi - tugagan kalit qayta hisoblanadi
+    assert (other, again) == (4, 6)
+    assert calls == [1, 2, 3]
+    assert coalescer.stats()["coalesced"] == 4
+    assert coalescer.stats()["in_flight"] == 0
+
+def test_error_is_shared_and_cancelled_waiter_does_not_cancel_others():
+    coalescer = RequestCoalescer()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        results = await asyncio.gather(coalescer.run("e", fail), coalescer.run("e", fail), return_exceptions=True)
+        first = asyncio.ensure_future(coalescer.run("s", slow))
+        second = asyncio.ensure_future(coalescer.run("s", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return results, await second, first
+
+    results, second, first = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert second == "done"
+    assert first.cancelled()
+
+def test_question_key_normalises_case_and_whitespace():
+    assert question_key("legal", "  What is a  Contract?\n") == ("legal", "what is a contract?")
+    assert question_key("legal", "What is a contract?") != question_key("medical", "What is a contract?")
@@ -0,0 +1,81 @@
+# tests/test_retrieval_executor.py
+import asyncio
+import os
+
+from api.retrieval_executor import PROCESS, RetrievalExecutor, init_worker, worker_find_best_match
+
+KNOWLEDGE = {
+    "legal": [
+        {"question": "What is a breach of contract?", "answer": "Failure to meet obligations."},
+        {"question": "What should be included in a contract?", "answer": "Parties, terms and payment."}
+    ]
+}
+NEW_QUESTION = "What should be included in a contract breach notice?"
+
+def worker_pid():
+    return os.getpid()
+
+def test_process_workers_receive_added_knowledge_without_restart(workdir):
+    executor = RetrievalExecutor(PROCESS, max_workers=2, initializer=init_worker, initargs=(KNOWLEDGE,))
+
+    async def scenario():
+        await executor.run(worker_find_best_match, NEW_QUESTION, "legal")
+        pids = set(await asyncio.gather(*(executor.run(worker_pid) for _ in range(8))))
+
+        executor.add_knowledge("legal", NEW_QUESTION, "The breached terms and a deadline to cure.")
+        matches = await asyncio.gather(*(executor.run(worker_find_best_match, NEW_QUESTION, "legal")
+                                         for _ in range(8)))
+        pids_after = set(await asyncio.gather(*(executor.run(worker_pid) for _ in range(8))))
+        return pids, matches, pids_after
+
+    try:
+        pids, matches, pids_after = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    # Pool qayta ishga tushirilmagan - yangi worker jarayonlari yaratilmagan
+    assert len(pids | pids_after) <= 2
+    # Qo'shilish barcha workerlar qo'llaganidan keyin logdan o'chiriladi
+    applied = executor._worker_generations
+    all_applied = len(applied) == 2 and min(applied.values()) == 1
+    assert executor.stats()["knowledge_updates"] == (0 if all_applied else 1)
+    for _, answer, _ in matches:
+        assert answer == "The breached terms and a deadline to cure."
+
+def test_pending_updates_skip_what_every_worker_applied(workdir):
+    executor = RetrievalExecutor(PROCESS, max_workers=2)
+    executor.add_knowledge("legal", "Q1", "A1")
+    executor.add_knowledge("legal", "Q2", "A2")
+    assert len(executor._pending_updates()) == 2
+
+    executor._worker_generations = {101: 1, 102: 2}
+    assert [update[2] for update in executor._pending_updates()] == ["Q2"]
+
+    executor.restart(({},))
+    assert executor._pending_updates() == []
+
+def test_update_log_is_trimmed_once_every_worker_applied_it(workdir):
+    executor = RetrievalExecutor(PROCESS, max_workers=2)
+    for i in range(1, 4):
+        executor.add_knowledge("legal", f"Q{i}", f"A{i}")
+
+    # Ikkinchi worker hali vazifa olmagan - log to'liq saqlanadi
+    executor._worker_generations = {101: 2}
+    executor._trim_updates()
+    assert len(executor._updates) == 3
+
+    executor._worker_generations = {101: 2, 102: 1}
+    executor._trim_updates()
+    assert [update[2] for update in executor._updates] == ["Q2", "Q3"]
+    assert [update[2] for update in executor._pending_updates()] == ["Q2", "Q3"]
+
+    executor._worker_generations[102] = 3
+    executor._trim_updates()
+    executor.add_knowledge("legal", "Q4", "A4")
+    assert [update[:3] for update in executor._pending_updates()] == [(3, "legal", "Q3"), (4, "legal", "Q4")]
+    assert executor.stats()["knowledge_updates"] == 2
+
+    # Yangi workerlar faqat qayta ishga tushirilgandan keyingi qo'shilishlarni oladi
+    executor.restart(({},))
+    executor.add_knowledge("legal", "Q5", "A5")
+    assert [update[:3] for update in executor._pending_updates()] == [(5, "legal", "Q5")]
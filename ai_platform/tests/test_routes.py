@@ -0,0 +1,132 @@
+# tests/test_routes.py
+import asyncio
+
+import pytest
+
+def test_add_knowledge_to_unloaded_domain_keeps_existing_knowledge(routes):
+    # Processorga yuklanmagan domain (masalan, startup dan keyin yaratilgan) - "medical" indeksi yo'q
+    routes.load_processor_domains(["legal", "education"])
+    assert "medical" not in routes.ai_processor.indexes
+
+    item = routes.KnowledgeItem(question="What is a fever?", answer="A body temperature above normal.")
+    asyncio.run(routes.add_knowledge_item("medical", item))
+
+    index = routes.ai_processor.indexes["medical"]
+    questions = {knowledge["question"] for knowledge in index.items}
+    assert questions == {"What are vital signs?", "What is a fever?"}
+
+    answer, confidence = routes.ai_processor.find_best_answer("What are vital signs?", "medical")
+    assert confidence > routes.ai_processor.CONFIDENCE_THRESHOLD
+    assert answer.startswith("Vital signs include")
+
+def test_add_knowledge_to_loaded_domain_appends_to_index(routes):
+    routes.load_processor_domains(["legal"])
+    generation = routes.ai_processor.indexes["legal"].generation
+
+    # Savoldagi so'zlar domain lug'atida bor - qayta fit qilinmagan indeksda ham topiladi
+    item = routes.KnowledgeItem(question="What should be included in a contract breach notice?",
+                                answer="The breached terms and a deadline to cure.")
+    asyncio.run(routes.add_knowledge_item("legal", item))
+
+    index = routes.ai_processor.indexes["legal"]
+    assert index.generation > generation
+    assert len(index) == 3
+    answer, _ = routes.ai_processor.find_best_answer("What should be included in a contract breach notice?", "legal")
+    assert answer == "The breached terms and a deadline to cure."
+
+def usage_count(routes, domain_name, question):
+    routes.domain_manager.usage.flush()
+    for knowledge in routes.domain_manager.get_knowledge(domain_name):
+        if knowledge["question"] == question:
+            return knowledge["usage_count"]
+    raise AssertionError(f"{question} not found in {domain_name}")
+
+def test_usage_is_counted_for_added_knowledge(routes):
+    routes.load_processor_domains(["legal"])
+    question = "What should be included in a contract breach notice?"
+
+    item = routes.KnowledgeItem(question=question, answer="The breached terms and a deadline to cure.")
+    asyncio.run(routes.add_knowledge_item("legal", item))
+    indexed = next(knowledge for knowledge in routes.ai_processor.indexes["legal"].items
+                   if knowledge["question"] == question)
+    assert "id" in indexed
+
+    routes.ai_processor.find_best_answer(question, "legal")
+    routes.ai_processor.find_best_answer(question, "legal")
+
+    assert usage_count(routes, "legal", question) == 2
+
+def test_search_ranks_every_database_domain(routes):
+    asyncio.run(routes.startup_event())
+    try:
+        results = asyncio.run(routes.search_knowledge(routes.SearchRequest(query="contract signs")))
+    finally:
+        asyncio.run(routes.shutdown_event())
+
+    by_question = {result["question"]: result for result in results}
+    # "legal" dagi kuchsiz moslik boshqa domainlardagi yaxshiroq natijalarni yashirmaydi
+    assert by_question["What are vital signs?"]["domain"] == "medical"
+    assert by_question["What is a breach of contract?"]["domain"] == "legal"
+    assert all(result["engine"] == "tfidf" for result in results)
+    assert all(result["score"] >= routes.settings.SEARCH_MIN_SCORE for result in results)
+    assert [result["score"] for result in results] == sorted((result["score"] for result in results), reverse=True)
+
+def test_search_merges_full_text_matches(routes):
+    routes.load_processor_domains(routes.domain_manager.get_domain_stats().keys())
+
+    # Savollar indeksida yo'q, lekin javob va kalit so'zlarda bor - FTS5 topadi
+    results = asyncio.run(routes.search_knowledge(routes.SearchRequest(query="blood pressure")))
+    assert [(result["question"], result["engine"], result["score"]) for result in results] == [
+        ("What are vital signs?", "fts5", 1.0)
+    ]
+
+    # Ikkala mexanizm topgan bilim bir marta qaytariladi
+    results = asyncio.run(routes.search_knowledge(routes.SearchRequest(query="vital signs")))
+    questions = [result["question"] for result in results]
+    assert questions.count("What are vital signs?") == 1
+    assert all(0.0 <= result["score"] <= 1.0 for result in results)
+
+@pytest.fixture
+def client(routes):
+    from fastapi.testclient import TestClient
+    from api.server import AIPlatformAPI
+
+    app = AIPlatformAPI().app
+    app.include_router(routes.router)
+    with TestClient(app) as client:
+        yield client
+
+def response_schema(spec, path):
+    return spec["paths"][path]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+def test_preserialised_responses_keep_declared_schema(client, routes):
+    from api.server import ChatResponse
+
+    chat = client.post("/api/chat", json={"question": "What is breach of contract?", "domain": "legal"})
+    voice = client.post("/voice/chat", json={"audio_data": "", "domain": "legal"})
+
+    for response, model in ((chat, ChatResponse), (voice, routes.VoiceResponse)):
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert set(response.json()) == set(model.model_fields)
+        model.model_validate_json(response.content)
+    assert chat.json()["domain"] == "legal" and chat.json()["confidence"] > 0
+
+    spec = client.get("/openapi.json").json()
+    assert response_schema(spec, "/api/chat") == {"$ref": "#/components/schemas/ChatResponse"}
+    assert response_schema(spec, "/voice/chat") == {"$ref": "#/components/schemas/VoiceResponse"}
+
+def test_metrics_endpoint_exposes_stage_histograms(client):
+    client.post("/api/chat", json={"question": "What is breach of contract?", "domain": "legal"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert "# TYPE ai_platform_stage_duration_seconds histogram" in lines
+    for stage in ("preprocess", "db_write", "serialise", "request"):
+        labels = f'stage="{stage}",domain="legal"'
+        assert any(line.startswith(f"ai_platform_stage_duration_seconds_count{{{labels}}} ") for line in lines)
+        assert any(line.startswith(f'ai_platform_stage_duration_seconds_bucket{{{labels},le="+Inf"}} ')
+                   for line in lines)
@@ -0,0 +1,33 @@
+# tests/test_snapshots.py
+from ai.nlp_processor import NLPProcessor
+from ai.snapshots import IndexSnapshotStore, content_version
+from config.settings import settings
+
+ITEMS = [
+    {"id": 1, "question": "What is a breach of contract?", "answer": "Failure to meet obligations."},
+    {"id": 2, "question": "What should be included in a contract?", "answer": "Parties, terms and payment."}
+]
+
+def test_snapshot_path_depends_on_source(tmp_path):
+    store = IndexSnapshotStore(str(tmp_path))
+    settings_path = store.path("general", content_version(ITEMS))
+    database_path = store.path("general", "0123456789abcdef:7")
+
+    assert settings_path != database_path
+    assert store.path("general", "0123456789abcdef:8") == database_path
+
+def test_sources_do_not_overwrite_each_other(workdir, monkeypatch):
+    monkeypatch.setattr(settings, "INDEX_SNAPSHOTS_ENABLED", True)
+    monkeypatch.setattr(settings, "INDEX_SNAPSHOT_DIR", str(workdir / "snapshots"))
+
+    NLPProcessor().load_domain_knowledge({"general": ITEMS[:1]})
+    NLPProcessor().load_domain_knowledge({"general": ITEMS}, {"general": "store:1"})
+
+    store = IndexSnapshotStore(settings.INDEX_SNAPSHOT_DIR)
+    assert store.load("general", content_version(ITEMS[:1]), "tfidf", ITEMS[:1],
+                      settings.RETRIEVAL_ENGINE_OPTIONS["tfidf"]) is not None
+    assert store.load("general", "store:1", "tfidf", ITEMS,
+                      settings.RETRIEVAL_ENGINE_OPTIONS["tfidf"]) is not None
+
+def test_default_snapshot_dir_is_not_relative():
+    assert settings.INDEX_SNAPSHOT_DIR.startswith(str(settings.DATA_DIR))
@@ -0,0 +1,21 @@
+# tests/test_sqlite_pool.py
+import sqlite3
+import threading
+
+import pytest
+
+from database.sqlite_pool import SQLiteConnectionPool
+
+def test_connections_of_finished_threads_are_closed(workdir):
+    pool = SQLiteConnectionPool(str(workdir / "pool.db"))
+    opened = []
+    worker = threading.Thread(target=lambda: opened.append(pool.connection()))
+    worker.start()
+    worker.join()
+
+    # Keyingi ulanish ochilganda tugagan oqim ulanishi yopiladi
+    pool.connection()
+    assert [conn for _, conn in pool._connections] == [pool.connection()]
+    with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+        opened[0].execute("SELECT 1")
+    pool.close()
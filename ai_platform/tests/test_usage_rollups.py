@@ -0,0 +1,104 @@
+# tests/test_usage_rollups.py
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from config.settings import settings
+from database.models import DatabaseManager
+from database.usage_rollups import HISTOGRAM_COLUMNS
+
+NOW = datetime(2026, 10, 17, 12, 30)
+DOMAINS = ["legal", "medical", "education"]
+
+def conversations(count, seed=0):
+    rng = random.Random(seed)
+    return [{
+        "session_id": "test",
+        "question": "question",
+        "answer": "answer",
+        "domain": rng.choice(DOMAINS),
+        "response_time": rng.expovariate(10),
+        "created_at": NOW - timedelta(seconds=rng.randrange(4 * 86400))
+    } for _ in range(count)]
+
+def db_path():
+    return settings.DATABASE_URL[len("sqlite:///"):]
+
+def query(sql, params=()):
+    conn = sqlite3.connect(db_path())
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def baseline_hourly():
+    """Suhbatlar jadvalidan to'g'ridan-to'g'ri hisoblangan soatlik yig'indilar"""
+    return query('''
+        SELECT strftime('%Y-%m-%d %H:00:00', created_at), domain, COUNT(*), SUM(response_time)
+        FROM conversations
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+    ''')
+
+def rollup_hourly():
+    rows = query(f'''
+        SELECT strftime('%Y-%m-%d %H:00:00', bucket_start), domain, request_count, response_time_sum,
+               {" + ".join(HISTOGRAM_COLUMNS)}
+        FROM usage_stats_hourly
+        ORDER BY 1, 2
+    ''')
+    # Gistogramma ustunlari yig'indisi so'rovlar soniga teng
+    assert all(row[2] == row[4] for row in rows)
+    return [row[:4] for row in rows]
+
+def assert_same_totals(actual, expected):
+    assert [row[:3] for row in actual] == [row[:3] for row in expected]
+    assert [row[3] for row in actual] == pytest.approx([row[3] for row in expected])
+
+def test_rollups_match_baseline_aggregate_after_upserts(workdir):
+    db_manager = DatabaseManager(settings.DATABASE_URL)
+    db_manager.add_conversations(conversations(300, seed=1))
+    rows_after_first_batch = len(rollup_hourly())
+
+    # Xuddi shu davrlarga qo'shilgan yozuvlar mavjud qatorlarni oshiradi
+    db_manager.add_conversations(conversations(300, seed=1))
+    db_manager.add_conversation(1, "test", "question", "answer", "legal", 0.02)
+
+    assert len(rollup_hourly()) <= rows_after_first_batch + 1
+    assert_same_totals(rollup_hourly(), baseline_hourly())
+    daily = query("SELECT SUM(request_count) FROM usage_stats_daily")
+    assert daily == [(601,)]
+
+def test_backfill_rebuilds_rollups_from_conversations(workdir):
+    db_manager = DatabaseManager(settings.DATABASE_URL)
+    db_manager.add_conversations(conversations(200, seed=2))
+    expected = rollup_hourly()
+    db_manager.engine.dispose()
+
+    conn = sqlite3.connect(db_path())
+    conn.executescript("DROP TABLE usage_stats_hourly; DROP TABLE usage_stats_daily;")
+    conn.close()
+
+    DatabaseManager(settings.DATABASE_URL)
+    assert_same_totals(rollup_hourly(), expected)
+
+@pytest.mark.parametrize("days", [1, 2, 7])
+def test_usage_stats_match_legacy_query(workdir, days):
+    db_manager = DatabaseManager(settings.DATABASE_URL)
+    db_manager.add_conversations(conversations(500, seed=3))
+    # Soat boshidan olingan davr rollup lar bilan aniq mos keladi
+    since = (NOW - timedelta(days=days)).replace(minute=0)
+
+    legacy = query('''
+        SELECT domain, COUNT(*) as count, AVG(response_time) as avg_time
+        FROM conversations
+        WHERE created_at >= ?
+        GROUP BY domain
+        ORDER BY domain
+    ''', (since.isoformat(" "),))
+
+    stats = db_manager.get_usage_stats(since)
+    assert [(row["domain"], row["request_count"]) for row in stats] == [row[:2] for row in legacy]
+    assert [row["average_response_time"] for row in stats] == pytest.approx([row[2] for row in legacy])